@@ -0,0 +1,401 @@
+"""
+Módulo de agregados precalculados para el análisis del Titanic.
+
+Este módulo contiene un cubo de agregados con conteos, supervivientes,
+sumas y sumas de cuadrados de desviaciones (Welford) de edad y tarifa por
+celda (Pclass, Sex, AgeBand, FareBin, FamilySize, Embarked). Las
+visualizaciones y las estadísticas del reporte se calculan sobre el cubo,
+cuyo tamaño depende del número de celdas y no del número de pasajeros.
+Para los gráficos de distribución y los cuantiles guarda además
+histogramas de edad con cortes fijos y sketches de cuantiles de la tarifa,
+también de tamaño acotado. Los cubos se pueden
+combinar, de modo que un lote nuevo de pasajeros se incorpora en O(lote)
+sin volver a leer los anteriores.
+"""
+
+import hashlib
+import pickle
+from pathlib import Path
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+from data_loader import _cuantil_desde_conteos
+from sketches import KLLSketch, contar_en_bins
+
+DIMENSIONES = ['Pclass', 'Sex', 'AgeBand', 'FareBin', 'FamilySize', 'Embarked']
+
+# Bandas de edad del reporte (intervalos cerrados por la derecha)
+BANDAS_EDAD = [0, 12, 18, 35, 50, 100]
+
+# Cortes del histograma de la pirámide de edad
+BINS_PIRAMIDE = list(range(0, 81, 10))
+
+# Dimensiones con un sketch de cuantiles de la tarifa por valor
+DIMENSIONES_TARIFA = ['Survived', 'Pclass']
+
+# Medidas aditivas de cada celda
+MEDIDAS = ['count', 'survived', 'age_count', 'age_sum', 'fare_count', 'fare_sum']
+
+# Suma de cuadrados de desviaciones respecto de la media de la celda; se
+# combinan con la fórmula de Chan y no sumando
+MEDIDAS_M2 = ['age_m2', 'fare_m2']
+
+def _combinar_m2(count_a, sum_a, m2_a, count_b, sum_b, m2_b):
+    """
+    Combina sumas de cuadrados de desviaciones de dos particiones con la
+    fórmula de Chan et al. (Welford en paralelo).
+
+    Args:
+        count_a, sum_a, m2_a: Conteo, suma y M2 de la primera partición
+        count_b, sum_b, m2_b: Conteo, suma y M2 de la segunda partición
+
+    Returns:
+        M2 de la unión (mismo tipo que las entradas)
+    """
+    count = count_a + count_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = sum_b / count_b - sum_a / count_a
+        correction = delta ** 2 * count_a * count_b / count
+    # Si alguna partición está vacía no hay corrección
+    return m2_a + m2_b + np.where((count_a > 0) & (count_b > 0), correction, 0.0)
+
+class SurvivalCube:
+    """
+    Clase con el cubo de agregados de supervivencia.
+    Cada celda guarda el número de pasajeros, de supervivientes, las sumas
+    de edad y tarifa y sus M2 de Welford; además se guarda el histograma de
+    edad por sexo y supervivencia y un sketch KLL de la tarifa por cada
+    valor de `DIMENSIONES_TARIFA`, del que salen los cuantiles y el rango de
+    la tarifa. Todas las medidas se pueden combinar entre cubos (`merge`).
+    """
+    
+    def __init__(self, cells: pd.DataFrame, age_hist: pd.DataFrame, fare_sketches: dict):
+        """
+        Args:
+            cells (pd.DataFrame): Medidas por celda, indexadas por `DIMENSIONES`
+            age_hist (pd.DataFrame): Conteos de edad en `BINS_PIRAMIDE`,
+                indexados por (Sex, Survived)
+            fare_sketches (dict): KLLSketch de la tarifa por (dimensión, valor)
+        """
+        self.cells = cells
+        self.age_hist = age_hist
+        self.fare_sketches = fare_sketches
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SurvivalCube':
+        """
+        Construye el cubo con una sola agrupación sobre el DataFrame.
+
+        Args:
+            df (pd.DataFrame): DataFrame preparado con `preparar_datos`
+
+        Returns:
+            SurvivalCube: Cubo de agregados
+        """
+        age = df['Age'].astype('float64')
+        fare = df['Fare'].astype('float64')
+        measures = pd.DataFrame({
+            'count': 1,
+            'survived': df['Survived'].astype('int64'),
+            'age_count': age.notna().astype('int64'),
+            'age_sum': age.fillna(0),
+            'fare_count': fare.notna().astype('int64'),
+            'fare_sum': fare.fillna(0)
+        }, index=df.index)
+        keys = [df[dim] for dim in DIMENSIONES if dim != 'AgeBand']
+        keys.insert(DIMENSIONES.index('AgeBand'), pd.cut(age, bins=BANDAS_EDAD).rename('AgeBand'))
+        
+        groups = measures.groupby(keys, observed=True, dropna=False)
+        cells = groups.sum()
+        # M2 de cada celda respecto de su propia media (estable numéricamente)
+        for prefix, values in [('age', age), ('fare', fare)]:
+            deviations = values - values.groupby(keys, observed=True, dropna=False).transform('mean')
+            cells[f'{prefix}_m2'] = (deviations ** 2).groupby(keys, observed=True, dropna=False).sum()
+        
+        age_hist = pd.DataFrame({
+            group: contar_en_bins(values, BINS_PIRAMIDE)
+            for group, values in age.groupby([df['Sex'], df['Survived']], observed=True)
+        }, index=BINS_PIRAMIDE[:-1]).T.rename_axis(['Sex', 'Survived'])
+        fare_sketches = {
+            (dim, value): KLLSketch().update(values.to_numpy())
+            for dim in DIMENSIONES_TARIFA
+            for value, values in fare.groupby(df[dim], observed=True)
+        }
+        return cls(cells, age_hist, fare_sketches)
+    
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> 'SurvivalCube':
+        """
+        Construye el cubo en una sola pasada por bloques, con memoria
+        acotada por el tamaño de un bloque y del cubo.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Bloques preparados, por ejemplo
+                de `cargar_datos_por_chunks`
+
+        Returns:
+            SurvivalCube: Cubo de agregados de todos los bloques
+        """
+        cube = None
+        for chunk in chunks:
+            cube = cls.from_frame(chunk) if cube is None else cube.update(chunk)
+        return cube
+    
+    def merge(self, other: 'SurvivalCube') -> 'SurvivalCube':
+        """
+        Combina este cubo con otro construido sobre pasajeros distintos. El
+        resultado es el mismo que `from_frame` sobre la unión de ambos.
+
+        Args:
+            other (SurvivalCube): Cubo a combinar
+
+        Returns:
+            SurvivalCube: Cubo combinado
+        """
+        a, b = self.cells.align(other.cells, join='outer', fill_value=0)
+        cells = (a[MEDIDAS] + b[MEDIDAS]).astype(self.cells[MEDIDAS].dtypes.to_dict())
+        for prefix in ['age', 'fare']:
+            cells[f'{prefix}_m2'] = _combinar_m2(
+                a[f'{prefix}_count'], a[f'{prefix}_sum'], a[f'{prefix}_m2'],
+                b[f'{prefix}_count'], b[f'{prefix}_sum'], b[f'{prefix}_m2'])
+        age_hist = self.age_hist.add(other.age_hist, fill_value=0).astype('int64')
+        fare_sketches = dict(self.fare_sketches)
+        for key, sketch in other.fare_sketches.items():
+            fare_sketches[key] = fare_sketches[key].merge(sketch) if key in fare_sketches else sketch
+        return SurvivalCube(cells.sort_index(), age_hist, fare_sketches)
+    
+    def update(self, df: pd.DataFrame) -> 'SurvivalCube':
+        """
+        Incorpora un lote nuevo de pasajeros. El costo es proporcional al
+        tamaño del lote y al número de celdas, no al de pasajeros anteriores.
+
+        Args:
+            df (pd.DataFrame): Lote preparado con `preparar_datos`
+
+        Returns:
+            SurvivalCube: Cubo actualizado
+        """
+        return self.merge(SurvivalCube.from_frame(df))
+    
+    def save(self, path) -> None:
+        """
+        Guarda el cubo en un archivo pickle.
+
+        Args:
+            path (str o Path): Ruta de destino
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle(self._state(), path)
+    
+    @classmethod
+    def load(cls, path) -> 'SurvivalCube':
+        """
+        Carga un cubo guardado con `save`.
+
+        Args:
+            path (str o Path): Ruta del archivo
+
+        Returns:
+            SurvivalCube: Cubo cargado
+        """
+        return cls(**pd.read_pickle(path))
+    
+    def _state(self) -> dict:
+        """Devuelve el contenido del cubo como argumentos del constructor."""
+        return {
+            'cells': self.cells,
+            'age_hist': self.age_hist,
+            'fare_sketches': self.fare_sketches
+        }
+    
+    def digest(self) -> str:
+        """
+        Calcula un hash del contenido del cubo, por ejemplo para la caché
+        de figuras.
+
+        Returns:
+            str: Hash hexadecimal
+        """
+        sha = hashlib.sha256()
+        for frame in [self.cells.reset_index(), self.age_hist.reset_index()]:
+            sha.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        for key in sorted(self.fare_sketches):
+            sketch = self.fare_sketches[key]
+            sha.update(pickle.dumps((key, sketch.n, sketch.min, sketch.max)))
+            for items in sketch.levels:
+                sha.update(np.sort(items).tobytes() + b'|')
+        return sha.hexdigest()
+    
+    def rollup(self, by=None) -> pd.DataFrame:
+        """
+        Agrega las medidas del cubo por un subconjunto de dimensiones.
+
+        Args:
+            by (str o list, opcional): Dimensiones que se conservan; si no se
+                indican, se devuelve el total
+
+        Returns:
+            pd.DataFrame: Medidas agregadas (una fila si `by` es None)
+        """
+        if by is None:
+            totals = self.cells.sum().to_frame().T
+        else:
+            totals = self.cells.groupby(level=by, observed=True).sum()
+        
+        # M2 del grupo: M2 de las celdas más la dispersión de sus medias
+        for prefix in ['age', 'fare']:
+            count = self.cells[f'{prefix}_count']
+            total = self.cells[f'{prefix}_sum']
+            if by is None:
+                group_mean = totals[f'{prefix}_sum'].iloc[0] / totals[f'{prefix}_count'].iloc[0]
+            else:
+                group_mean = (total.groupby(level=by, observed=True).transform('sum')
+                              / count.groupby(level=by, observed=True).transform('sum'))
+            with np.errstate(invalid='ignore'):
+                spread = (count * (total / count - group_mean) ** 2).fillna(0)
+            m2 = self.cells[f'{prefix}_m2'] + spread
+            totals[f'{prefix}_m2'] = m2.sum() if by is None else m2.groupby(level=by, observed=True).sum()
+        return totals
+    
+    def survival(self, by=None) -> pd.DataFrame:
+        """
+        Calcula el número de pasajeros y la tasa de supervivencia.
+
+        Args:
+            by (str o list, opcional): Dimensiones de agrupación
+
+        Returns:
+            pd.DataFrame: Columnas count, survived y rate (entre 0 y 1)
+        """
+        totals = self.rollup(by)[['count', 'survived']]
+        return totals.assign(rate=totals['survived'] / totals['count'])
+    
+    def mean(self, column: str, by=None):
+        """
+        Calcula la media de Age o Fare, ignorando faltantes.
+
+        Args:
+            column (str): 'Age' o 'Fare'
+            by (str o list, opcional): Dimensiones de agrupación
+
+        Returns:
+            float o pd.Series: Media total o por grupo
+        """
+        prefix = column.lower()
+        totals = self.rollup(by)
+        means = totals[f'{prefix}_sum'] / totals[f'{prefix}_count']
+        return means.iloc[0] if by is None else means
+    
+    def var(self, column: str, by=None, ddof: int = 1):
+        """
+        Calcula la varianza de Age o Fare a partir de los M2 de Welford.
+
+        Args:
+            column (str): 'Age' o 'Fare'
+            by (str o list, opcional): Dimensiones de agrupación
+            ddof (int): Grados de libertad descontados, como en pandas
+
+        Returns:
+            float o pd.Series: Varianza total o por grupo
+        """
+        prefix = column.lower()
+        totals = self.rollup(by)
+        variances = totals[f'{prefix}_m2'] / (totals[f'{prefix}_count'] - ddof)
+        return variances.iloc[0] if by is None else variances
+    
+    def std(self, column: str, by=None, ddof: int = 1):
+        """
+        Calcula la desviación estándar de Age o Fare.
+
+        Args:
+            column (str): 'Age' o 'Fare'
+            by (str o list, opcional): Dimensiones de agrupación
+            ddof (int): Grados de libertad descontados, como en pandas
+
+        Returns:
+            float o pd.Series: Desviación estándar total o por grupo
+        """
+        return np.sqrt(self.var(column, by, ddof))
+    
+    def fare_sketch(self) -> KLLSketch:
+        """
+        Combina los sketches de la tarifa por el primer valor de
+        `DIMENSIONES_TARIFA`, que reparte a todos los pasajeros.
+
+        Returns:
+            KLLSketch: Sketch de la tarifa de todo el cubo
+        """
+        sketch = KLLSketch()
+        for (dim, _), group_sketch in sorted(self.fare_sketches.items()):
+            if dim == DIMENSIONES_TARIFA[0]:
+                sketch = sketch.merge(group_sketch)
+        return sketch
+    
+    def fare_quantile(self, q: float) -> float:
+        """
+        Calcula un cuantil de la tarifa desde los sketches; es exacto
+        mientras haya menos tarifas que la capacidad del sketch.
+
+        Args:
+            q (float): Cuantil, entre 0 y 1
+
+        Returns:
+            float: Valor del cuantil
+        """
+        return self.fare_sketch().quantile(q)
+    
+    def fare_range(self) -> tuple:
+        """
+        Devuelve la tarifa mínima y máxima, que los sketches mantienen
+        exactas.
+
+        Returns:
+            tuple: (mínima, máxima)
+        """
+        sketch = self.fare_sketch()
+        return float(sketch.min), float(sketch.max)
+    
+    def fare_box_stats(self, by: str, whis: float = 1.5) -> dict:
+        """
+        Calcula las estadísticas de los diagramas de caja de la tarifa desde
+        los sketches, con un número de atípicos acotado.
+
+        Args:
+            by (str): Dimensión de `DIMENSIONES_TARIFA`
+            whis (float): Longitud de los bigotes en rangos intercuartílicos
+
+        Returns:
+            dict: Estadísticas para `Axes.bxp` por valor de la dimensión
+        """
+        return {value: sketch.box_stats(whis)
+                for (dim, value), sketch in sorted(self.fare_sketches.items()) if dim == by}
+    
+    def box_stats(self, column: str, by: str, whis: float = 1.5) -> dict:
+        """
+        Calcula las estadísticas de un diagrama de caja de una dimensión
+        numérica del cubo (por ejemplo, FamilySize) a partir de sus conteos,
+        con la misma interpolación que `matplotlib.pyplot.boxplot`.
+
+        Args:
+            column (str): Dimensión numérica cuyos valores se resumen
+            by (str): Dimensión de agrupación
+            whis (float): Longitud de los bigotes en rangos intercuartílicos
+
+        Returns:
+            dict: Estadísticas para `Axes.bxp` por grupo
+        """
+        counts = self.rollup([by, column])['count']
+        stats = {}
+        for group, group_counts in counts.groupby(level=by, observed=True):
+            group_counts = group_counts.droplevel(by)
+            q1, med, q3 = (_cuantil_desde_conteos(group_counts, q) for q in [0.25, 0.5, 0.75])
+            values = group_counts.index.to_numpy(dtype=float)
+            inside = values[(values >= q1 - whis * (q3 - q1)) & (values <= q3 + whis * (q3 - q1))]
+            stats[group] = {
+                'med': med, 'q1': q1, 'q3': q3,
+                'whislo': inside.min(), 'whishi': inside.max(),
+                'fliers': values[(values < inside.min()) | (values > inside.max())]
+            }
+        return stats
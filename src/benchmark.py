@@ -0,0 +1,593 @@
+"""
+Módulo de benchmarks de rendimiento para el proyecto Titanic.
+
+Contiene funciones que comparan implementaciones alternativas de las
+transformaciones más costosas sobre versiones escaladas del dataset.
+"""
+
+import sys
+import json
+import time
+import os
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+# Resultados de `benchmark_etapas`, uno por commit
+RESULTS_DIR = Path(__file__).parent.parent / 'output' / 'benchmarks'
+
+def _medir(func, repeticiones=3):
+    """
+    Mide el mejor tiempo de ejecución de una función.
+
+    Args:
+        func (callable): Función sin argumentos a medir
+        repeticiones (int): Número de ejecuciones
+
+    Returns:
+        float: Mejor tiempo en segundos
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+def _escalar(df, factor):
+    """
+    Replica un DataFrame `factor` veces.
+
+    Args:
+        df (pd.DataFrame): DataFrame original
+        factor (int): Número de réplicas
+
+    Returns:
+        pd.DataFrame: DataFrame escalado
+    """
+    return pd.concat([df] * factor, ignore_index=True)
+
+def benchmark_titulos(factor=1000, repeticiones=3):
+    """
+    Compara la extracción de títulos fila a fila (`apply`) con la versión
+    vectorizada de `TitanicFeatureEngineering`.
+
+    Args:
+        factor (int): Veces que se replica train.csv
+        repeticiones (int): Número de ejecuciones por variante
+
+    Returns:
+        pandas.DataFrame: Tiempo y filas por segundo de cada variante
+    """
+    from feature_engineering import TitanicFeatureEngineering
+
+    fe = TitanicFeatureEngineering()
+    nombres = _escalar(pd.read_csv(DATA_DIR / 'train.csv'), factor)['Name']
+    nombres_cat = nombres.astype('category')
+
+    variantes = {
+        'apply': lambda: nombres.apply(fe.extract_title),
+        'str.extract': lambda: fe.extract_titles(nombres),
+        'str.extract (category)': lambda: fe.extract_titles(nombres_cat)
+    }
+
+    resultados = {}
+    for nombre, func in variantes.items():
+        segundos = _medir(func, repeticiones)
+        resultados[nombre] = {
+            'segundos': segundos,
+            'filas_por_segundo': len(nombres) / segundos
+        }
+
+    return pd.DataFrame(resultados).T
+
+def benchmark_imputacion(factores=(1, 20), fraccion_oculta=0.2, max_filas_knn=200_000,
+                         random_state=42):
+    """
+    Compara precisión y tiempo de los imputadores de `TitanicPreprocessor`.
+
+    Se replica train.csv con un pequeño ruido en Age y Fare (para no tener
+    filas idénticas), se oculta una fracción de las edades conocidas y se
+    mide el error absoluto medio de la edad imputada frente a la real.
+
+    Args:
+        factores (tuple): Veces que se replica train.csv
+        fraccion_oculta (float): Fracción de edades conocidas a ocultar
+        max_filas_knn (int): Tamaño máximo para probar el KNNImputer
+            por fuerza bruta
+        random_state (int): Semilla del ruido y de las edades ocultas
+
+    Returns:
+        pandas.DataFrame: Filas, segundos y MAE de la edad por imputador
+    """
+    from feature_engineering import TitanicFeatureEngineering
+    from preprocessor import TitanicPreprocessor, IMPUTERS
+
+    rng = np.random.RandomState(random_state)
+    base = pd.read_csv(DATA_DIR / 'train.csv')
+    base['Title'] = TitanicFeatureEngineering().extract_titles(base['Name'])
+    base['FamilySize'] = base['SibSp'] + base['Parch'] + 1
+
+    resultados = []
+    for factor in factores:
+        df = _escalar(base, factor)
+        df['Age'] = (df['Age'] + rng.normal(0, 1, len(df))).clip(lower=0.1)
+        df['Fare'] = df['Fare'] * rng.lognormal(0, 0.05, len(df))
+
+        conocidas = np.flatnonzero(df['Age'].notna().to_numpy())
+        ocultas = rng.choice(conocidas, int(len(conocidas) * fraccion_oculta), replace=False)
+        edad_real = df['Age'].to_numpy()[ocultas]
+        df.loc[ocultas, 'Age'] = np.nan
+
+        for imputador in IMPUTERS:
+            if imputador == 'knn' and len(df) > max_filas_knn:
+                continue
+            preprocessor = TitanicPreprocessor(imputer=imputador)
+            columnas = preprocessor.numerical_features
+            entrada = df[columnas].to_numpy(dtype=float)
+            if imputador == 'group_median':
+                entrada = df[columnas + preprocessor.group_features]
+
+            inicio = time.perf_counter()
+            imputado = preprocessor.create_imputer().fit_transform(entrada)
+            segundos = time.perf_counter() - inicio
+
+            resultados.append({
+                'filas': len(df),
+                'imputador': imputador,
+                'segundos': segundos,
+                'mae_edad': np.abs(imputado[ocultas, columnas.index('Age')] - edad_real).mean()
+            })
+
+    return pd.DataFrame(resultados)
+
+def _bytes_matriz(X):
+    """
+    Calcula los bytes ocupados por una matriz densa o dispersa.
+
+    Args:
+        X: np.ndarray o matriz dispersa de scipy
+
+    Returns:
+        int: Bytes de los arrays que componen la matriz
+    """
+    if hasattr(X, 'indptr'):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+def benchmark_one_hot_disperso(factor=100, alta_cardinalidad=True):
+    """
+    Compara memoria y velocidad de `TitanicPreprocessor` con salida densa y
+    dispersa, y el tiempo de entrenar una regresión logística sobre cada una.
+
+    Args:
+        factor (int): Veces que se replica train.csv
+        alta_cardinalidad (bool): Añadir Surname y TicketPrefix como
+            variables categóricas de alta cardinalidad
+
+    Returns:
+        pandas.DataFrame: Columnas, MB, segundos de transformación y de
+        entrenamiento para cada modo de salida
+    """
+    from sklearn.linear_model import LogisticRegression
+    from feature_engineering import TitanicFeatureEngineering
+    from preprocessor import TitanicPreprocessor
+
+    df = _escalar(pd.read_csv(DATA_DIR / 'train.csv'), factor)
+    df = TitanicFeatureEngineering().fit_transform(df)
+    extra = []
+    if alta_cardinalidad:
+        df['Surname'] = df['Name'].str.split(',').str[0]
+        df['TicketPrefix'] = df['Ticket'].str.extract(r'^(\D+)', expand=False).fillna('NONE')
+        extra = ['Surname', 'TicketPrefix']
+
+    resultados = {}
+    for sparse in [False, True]:
+        preprocessor = TitanicPreprocessor(imputer='group_median', sparse=sparse)
+        preprocessor.categorical_features = preprocessor.categorical_features + extra
+
+        inicio = time.perf_counter()
+        X = preprocessor.fit_transform(df)
+        segundos_transformacion = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        LogisticRegression(solver='liblinear').fit(X, df['Survived'])
+        segundos_entrenamiento = time.perf_counter() - inicio
+
+        resultados['dispersa' if sparse else 'densa'] = {
+            'filas': X.shape[0],
+            'columnas': X.shape[1],
+            'MB': _bytes_matriz(X) / 1e6,
+            'segundos_transformacion': segundos_transformacion,
+            'segundos_entrenamiento': segundos_entrenamiento,
+            'filas_por_segundo': X.shape[0] / segundos_transformacion
+        }
+
+    return pd.DataFrame(resultados).T
+
+def benchmark_servidor(directorio_modelo=None, peticiones=2000, concurrencia=8, filas=200):
+    """
+    Mide la latencia del servicio en línea: un pasajero por la ruta de
+    pandas de `TitanicPredictor` frente a la ruta rápida, y la carga HTTP
+    concurrente con y sin micro-lotes.
+
+    Args:
+        directorio_modelo (str o Path, opcional): Predictor guardado con
+            `TitanicPredictor.save`; si no se indica, se ajusta una
+            regresión logística sobre train.csv
+        peticiones (int): Peticiones HTTP por configuración
+        concurrencia (int): Clientes HTTP simultáneos
+        filas (int): Pasajeros a puntuar uno a uno en cada ruta
+
+    Returns:
+        pandas.DataFrame: Latencias p50/p99 en ms y peticiones por segundo
+    """
+    import threading
+    from sklearn.linear_model import LogisticRegression
+    from data_loader import aplicar_esquema
+    from feature_engineering import TitanicFeatureEngineering
+    from preprocessor import TitanicPreprocessor
+    from inference import TitanicPredictor
+    from serving import ScoringService, crear_servidor, prueba_de_carga
+
+    if directorio_modelo is not None:
+        predictor = TitanicPredictor.load(directorio_modelo)
+    else:
+        train = aplicar_esquema(pd.read_csv(DATA_DIR / 'train.csv'))
+        fe = TitanicFeatureEngineering().fit(train)
+        preprocessor = TitanicPreprocessor(imputer='group_median')
+        X = preprocessor.fit_transform(fe.transform(train))
+        modelo = LogisticRegression(solver='liblinear').fit(X, train['Survived'])
+        predictor = TitanicPredictor(fe, preprocessor, modelo, 'logistic')
+
+    test = pd.read_csv(DATA_DIR / 'test.csv')
+    registros = test.astype(object).where(test.notna(), None).to_dict('records')
+
+    def latencias(func):
+        tiempos = []
+        for i in range(filas):
+            inicio = time.perf_counter()
+            func(i % len(test))
+            tiempos.append(time.perf_counter() - inicio)
+        return np.array(tiempos) * 1000
+
+    resultados = {}
+    servicio = ScoringService(predictor)
+    for nombre, func in {
+        'pandas (1 fila)': lambda i: predictor.predict_proba_frame(test.iloc[[i]]),
+        'ruta rápida (1 fila)': lambda i: servicio.score(registros[i])
+    }.items():
+        ms = latencias(func)
+        resultados[nombre] = {'p50_ms': np.percentile(ms, 50), 'p99_ms': np.percentile(ms, 99),
+                              'peticiones_por_segundo': 1000 / ms.mean()}
+    servicio.close()
+
+    for nombre, max_batch_size in [('HTTP sin micro-lotes', 1), ('HTTP con micro-lotes', 64)]:
+        servicio = ScoringService(predictor, max_batch_size=max_batch_size)
+        servidor = crear_servidor(servicio, puerto=0)
+        hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+        hilo.start()
+        try:
+            carga = prueba_de_carga('127.0.0.1', servidor.server_address[1], registros,
+                                    peticiones, concurrencia)
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+            servicio.close()
+        resultados[nombre] = {key: carga[key] for key in ['p50_ms', 'p99_ms', 'peticiones_por_segundo']}
+
+    return pd.DataFrame(resultados).T
+
+def benchmark_arboles_compilados(tamanos=(1, 10, 100, 1000), repeticiones=20, random_state=42):
+    """
+    Compara la latencia de `predict_proba` de cada librería con la de
+    `CompiledTreeEnsemble` para distintos tamaños de lote, y comprueba que
+    las probabilidades coinciden.
+
+    Args:
+        tamanos (tuple): Filas por lote
+        repeticiones (int): Llamadas por tamaño y variante
+        random_state (int): Semilla de los modelos y del ruido
+
+    Returns:
+        pandas.DataFrame: Milisegundos por llamada de cada variante, su
+        cociente y la diferencia máxima de probabilidad
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from xgboost import XGBClassifier
+    import lightgbm as lgb
+    from feature_engineering import TitanicFeatureEngineering
+    from preprocessor import TitanicPreprocessor
+    from compiled_trees import CompiledTreeEnsemble
+
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    X = TitanicPreprocessor().fit_transform(TitanicFeatureEngineering().fit_transform(train))
+    y = train['Survived']
+    # Lotes con ruido para no puntuar solo filas vistas en el entrenamiento
+    rng = np.random.RandomState(random_state)
+    lotes = X[rng.choice(len(X), max(tamanos))] + rng.normal(0, 0.1, (max(tamanos), X.shape[1]))
+
+    modelos = {
+        'random_forest': RandomForestClassifier(n_estimators=200, random_state=random_state),
+        'xgboost': XGBClassifier(n_estimators=200, max_depth=5, random_state=random_state),
+        'lightgbm': lgb.LGBMClassifier(n_estimators=200, max_depth=5, random_state=random_state,
+                                       verbose=-1)
+    }
+
+    resultados = []
+    for nombre, modelo in modelos.items():
+        modelo.fit(X, y)
+        compilado = CompiledTreeEnsemble.from_model(modelo)
+        for tamano in tamanos:
+            lote = lotes[:tamano]
+            ms_libreria = _medir(lambda: modelo.predict_proba(lote), repeticiones) * 1000
+            ms_compilado = _medir(lambda: compilado.predict_proba(lote), repeticiones) * 1000
+            resultados.append({
+                'modelo': nombre,
+                'filas': tamano,
+                'ms_libreria': ms_libreria,
+                'ms_compilado': ms_compilado,
+                'aceleracion': ms_libreria / ms_compilado,
+                'diferencia_maxima': np.abs(compilado.predict_proba(lote) - modelo.predict_proba(lote)).max()
+            })
+
+    return pd.DataFrame(resultados)
+
+def _medir_etapa(func, repeticiones=1):
+    """
+    Mide una etapa: el mejor tiempo de `repeticiones` ejecuciones y el pico
+    de memoria residente por encima de la de partida, con
+    `profiling.peak_rss_window`. En Linux el pico se reinicia antes de cada
+    ejecución (/proc/self/clear_refs), lo que incluye la memoria de las
+    librerías nativas sin coste añadido; la memoria que el proceso ya tenía
+    reservada y reutiliza no cuenta como pico. En otras plataformas se
+    informa el pico de todo el proceso.
+
+    Args:
+        func (callable): Función sin argumentos de la etapa
+        repeticiones (int): Número de ejecuciones
+
+    Returns:
+        tuple: (resultado de la etapa, segundos, pico de memoria en MB o None)
+    """
+    from profiling import peak_rss_window
+
+    tiempos, picos = [], []
+    for _ in range(repeticiones):
+        with peak_rss_window() as ventana:
+            inicio = time.perf_counter()
+            resultado = func()
+            tiempos.append(time.perf_counter() - inicio)
+        if ventana['peak_rss_mb'] is not None:
+            picos.append(ventana['peak_rss_mb'] - (ventana['start_rss_mb'] or 0))
+    return resultado, min(tiempos), max(picos) if picos else None
+
+def _commit_actual():
+    """Devuelve el hash corto del commit actual, o None fuera de git."""
+    import subprocess
+
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.stdout.strip()
+
+def benchmark_etapas(factores=(1, 100, 10_000), repeticiones=1, max_filas_memoria=1_000_000,
+                     max_filas_modelado=2_000, opciones_modelado=None, ruta_salida=None):
+    """
+    Mide tiempo y pico de memoria de cada etapa del proyecto sobre
+    manifiestos sintéticos del tamaño de train.csv escalado (generados con
+    `TitanicSyntheticGenerator`): carga, preparación, feature engineering,
+    preprocesador, modelado y reporte.
+
+    Las etapas que trabajan con el DataFrame completo en memoria usan como
+    máximo `max_filas_memoria` filas, y el modelado `max_filas_modelado`;
+    el reporte (`TitanicAnalyzer.run_analysis`) recorre el manifiesto
+    completo por bloques. Cada resultado indica las filas realmente usadas.
+    El feature engineering y el preprocesador parten del CSV crudo, con
+    imputación 'group_median' (O(n)) para que escale al millón de filas.
+
+    Args:
+        factores (tuple): Factores de escala de train.csv
+        repeticiones (int): Ejecuciones cronometradas por etapa
+        max_filas_memoria (int): Filas máximas de las etapas en memoria
+        max_filas_modelado (int): Filas máximas de `train_and_evaluate`
+        opciones_modelado (dict, opcional): Argumentos de `train_and_evaluate`;
+            por defecto, cv=3 y n_jobs=1
+        ruta_salida (str o Path, opcional): JSON de resultados; por defecto,
+            output/benchmarks/etapas-<commit>.json
+
+    Returns:
+        pandas.DataFrame: Segundos, pico de memoria y filas por etapa y factor
+    """
+    import io
+    import warnings
+    import contextlib
+    from data_loader import ESQUEMA_DTYPES, cargar_datos, preparar_datos
+    from feature_engineering import TitanicFeatureEngineering
+    from preprocessor import TitanicPreprocessor
+    from modeling import TitanicModeling
+    from generate_report import TitanicAnalyzer
+    from synthetic import TitanicSyntheticGenerator
+
+    if opciones_modelado is None:
+        opciones_modelado = {'cv': 3, 'n_jobs': 1}
+
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    generador = TitanicSyntheticGenerator().fit(train)
+    filas = []
+    with tempfile.TemporaryDirectory(prefix='titanic_bench_') as tmp:
+        tmp = Path(tmp)
+        for factor in factores:
+            def registrar(etapa, func, n_filas):
+                resultado, segundos, pico_mb = _medir_etapa(func, repeticiones)
+                filas.append({'factor': factor, 'etapa': etapa, 'filas': n_filas,
+                              'segundos': segundos, 'pico_memoria_mb': pico_mb})
+                return resultado
+
+            completo = tmp / f'train_x{factor}.csv'
+            n_completo = len(train) * factor
+            generador.write(completo, n_completo)
+            if n_completo > max_filas_memoria:
+                en_memoria = tmp / f'train_x{factor}_memoria.csv'
+                n_memoria = max_filas_memoria
+                generador.write(en_memoria, n_memoria)
+            else:
+                en_memoria, n_memoria = completo, n_completo
+
+            registrar('cargar_datos', lambda: cargar_datos(usar_cache=False, file_path=en_memoria),
+                      n_memoria)
+            crudo = pd.read_csv(en_memoria, dtype=ESQUEMA_DTYPES)
+            registrar('preparar_datos', lambda: preparar_datos(crudo), n_memoria)
+
+            fe = TitanicFeatureEngineering().fit(crudo)
+            features = registrar('feature_engineering', lambda: fe.transform(crudo), n_memoria)
+            preprocessor = registrar('preprocesador_fit',
+                                     lambda: TitanicPreprocessor(imputer='group_median').fit(features),
+                                     n_memoria)
+            X = registrar('preprocesador_transform', lambda: preprocessor.transform(features), n_memoria)
+
+            n_modelado = min(len(crudo), max_filas_modelado)
+            X_modelado, y_modelado = X[:n_modelado], crudo['Survived'].to_numpy()[:n_modelado]
+            del crudo, features, X
+            # train_and_evaluate imprime los resultados de cada modelo
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                registrar('modelado', lambda: TitanicModeling().train_and_evaluate(
+                    X_modelado, y_modelado, **opciones_modelado), n_modelado)
+
+            analyzer = TitanicAnalyzer(output_dir=tmp / 'output', aggregates_dir=tmp / 'agregados',
+                                       use_figure_cache=False)
+            with contextlib.redirect_stdout(io.StringIO()):
+                registrar('reporte', lambda: analyzer.run_analysis(train_path=completo), n_completo)
+
+            completo.unlink()
+            if en_memoria != completo:
+                en_memoria.unlink()
+
+    resultados = pd.DataFrame(filas)
+    commit = _commit_actual()
+    if ruta_salida is None:
+        ruta_salida = RESULTS_DIR / f'etapas-{commit or "local"}.json'
+    ruta_salida = Path(ruta_salida)
+    ruta_salida.parent.mkdir(parents=True, exist_ok=True)
+    contenido = {
+        'commit': commit,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parametros': {'repeticiones': repeticiones, 'max_filas_memoria': max_filas_memoria,
+                       'max_filas_modelado': max_filas_modelado,
+                       'opciones_modelado': opciones_modelado},
+        'resultados': resultados.to_dict(orient='records')
+    }
+    ruta_salida.write_text(json.dumps(contenido, indent=2), encoding='utf-8')
+    return resultados
+
+def comparar_benchmarks(ruta_base, ruta_nueva):
+    """
+    Compara dos resultados de `benchmark_etapas`, por ejemplo de dos commits.
+
+    Args:
+        ruta_base (str o Path): JSON de referencia
+        ruta_nueva (str o Path): JSON a comparar
+
+    Returns:
+        pandas.DataFrame: Segundos y memoria de ambos y su cociente
+            (nuevo / base) por etapa y factor
+    """
+    def leer(ruta):
+        contenido = json.loads(Path(ruta).read_text(encoding='utf-8'))
+        return pd.DataFrame(contenido['resultados']).set_index(['factor', 'etapa'])
+
+    base, nueva = leer(ruta_base), leer(ruta_nueva)
+    comparacion = base[['segundos', 'pico_memoria_mb']].join(
+        nueva[['segundos', 'pico_memoria_mb']], lsuffix='_base', rsuffix='_nuevo', how='inner')
+    comparacion['cociente_segundos'] = comparacion['segundos_nuevo'] / comparacion['segundos_base']
+    comparacion['cociente_memoria'] = comparacion['pico_memoria_mb_nuevo'] / comparacion['pico_memoria_mb_base']
+    return comparacion
+
+# Dependencias cuya importación se difiere hasta el primer uso
+DEPENDENCIAS_PESADAS = ['matplotlib', 'seaborn', 'IPython', 'sklearn', 'xgboost', 'lightgbm', 'pkg_resources']
+
+def _tiempos_importacion(modulo):
+    """
+    Importa un módulo en un intérprete nuevo con `-X importtime`.
+
+    Args:
+        modulo (str): Módulo de src a importar
+
+    Returns:
+        dict: Tiempo acumulado (µs) de cada módulo importado
+    """
+    import subprocess
+
+    salida = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                            cwd=Path(__file__).parent, capture_output=True, text=True, check=True)
+    tiempos = {}
+    for linea in salida.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        tiempos[nombre.strip()] = int(acumulado)
+    return tiempos
+
+def benchmark_importaciones(modulos=None, repeticiones=3):
+    """
+    Mide el tiempo de importación de cada módulo del proyecto con
+    `python -X importtime`, cada vez en un proceso nuevo, e indica qué
+    dependencias pesadas arrastra.
+
+    Args:
+        modulos (list, opcional): Módulos a medir; por defecto, todos los de src
+            salvo las pruebas
+        repeticiones (int): Procesos por módulo; se toma el mejor tiempo
+
+    Returns:
+        pandas.DataFrame: Tiempo de importación en ms y dependencias pesadas
+            cargadas por módulo
+    """
+    if modulos is None:
+        modulos = sorted(ruta.stem for ruta in Path(__file__).parent.glob('*.py')
+                         if not ruta.stem.startswith('test_'))
+
+    filas = []
+    for modulo in modulos:
+        mediciones = [_tiempos_importacion(modulo) for _ in range(repeticiones)]
+        mejor = min(mediciones, key=lambda tiempos: tiempos[modulo])
+        pesadas = [paquete for paquete in DEPENDENCIAS_PESADAS
+                   if any(nombre.split('.')[0] == paquete for nombre in mejor)]
+        filas.append({
+            'modulo': modulo,
+            'importacion_ms': mejor[modulo] / 1000,
+            'dependencias_pesadas': ', '.join(pesadas)
+        })
+    return pd.DataFrame(filas).set_index('modulo')
+
+if __name__ == "__main__":
+    src_path = Path(__file__).parent.absolute()
+    if str(src_path) not in sys.path:
+        sys.path.append(str(src_path))
+
+    print("⏱️ Extracción de títulos:")
+    print(benchmark_titulos())
+    print("\n⏱️ Imputación de variables numéricas:")
+    print(benchmark_imputacion())
+    print("\n💾 One-hot denso frente a disperso:")
+    print(benchmark_one_hot_disperso())
+    print("\n🚀 Servicio en línea de un pasajero:")
+    print(benchmark_servidor())
+    print("\n🌲 Ensembles de árboles compilados:")
+    print(benchmark_arboles_compilados())
+    print("\n📦 Tiempo de importación de los módulos:")
+    print(benchmark_importaciones())
+    print("\n📈 Etapas del proyecto a escala 1x, 100x y 10.000x:")
+    print(benchmark_etapas())
@@ -0,0 +1,384 @@
+"""
+Módulo de compilación de ensembles de árboles para el problema del Titanic.
+
+Este módulo contiene la clase que aplana un random forest, XGBoost o
+LightGBM entrenado en arrays empaquetados de NumPy, y los recorre de forma
+vectorizada para todos los árboles y filas a la vez, sin la sobrecarga por
+llamada de `predict_proba` de cada librería.
+"""
+
+import re
+import json
+from pathlib import Path
+import numpy as np
+
+from utils import es_instancia_de
+
+# Versión del formato del artefacto serializado
+ARTIFACT_VERSION = 1
+
+class _TreeArrays:
+    """Acumula los nodos de varios árboles en listas planas."""
+    
+    def __init__(self):
+        """Inicializa las listas de nodos y de raíces"""
+        self.feature, self.threshold, self.left, self.right = [], [], [], []
+        self.missing_left, self.value, self.roots, self.depths = [], [], [], []
+    
+    def add_tree(self, feature, threshold, left, right, missing_left, value) -> None:
+        """
+        Añade un árbol descrito con índices locales; las hojas tienen hijo
+        izquierdo -1. Los índices se desplazan a posiciones globales y cada
+        hoja apunta a sí misma, para que el recorrido pueda dar siempre el
+        mismo número de pasos.
+
+        Args:
+            feature, threshold, left, right, missing_left, value (list):
+                Arrays del árbol, indexados por nodo local
+        """
+        offset = len(self.feature)
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        nodes = np.arange(len(left))
+        leaf = left < 0
+        
+        self.feature.extend(np.where(leaf, 0, feature))
+        self.threshold.extend(np.where(leaf, np.inf, threshold))
+        self.left.extend(np.where(leaf, nodes, left) + offset)
+        self.right.extend(np.where(leaf, nodes, right) + offset)
+        self.missing_left.extend(np.where(leaf, True, missing_left))
+        self.value.extend(np.where(leaf, value, 0.0))
+        self.roots.append(offset)
+        
+        depth = np.zeros(len(left), dtype=np.int64)
+        for node in nodes:
+            if not leaf[node]:
+                depth[left[node]] = depth[right[node]] = depth[node] + 1
+        self.depths.append(int(depth.max()))
+
+class CompiledTreeEnsemble:
+    """
+    Clase para predecir con un ensemble de árboles compilado a arrays de
+    NumPy. Todos los nodos de todos los árboles se guardan en arrays
+    paralelos (variable, umbral, hijos, dirección de los faltantes y valor
+    de hoja), y la predicción avanza a la vez una posición por fila y árbol
+    durante `max_depth` pasos.
+    """
+    
+    def __init__(self, feature, threshold, children, missing_left, value, roots,
+                 max_depth: int, n_features: int, kind: str, base_score: float = 0.0,
+                 sigmoid: float = 1.0, strict: bool = False, dtype: str = 'float64'):
+        """
+        Args:
+            feature (np.ndarray): Variable de cada nodo
+            threshold (np.ndarray): Umbral de cada nodo (+inf en las hojas)
+            children (np.ndarray): Hijos izquierdo y derecho intercalados
+            missing_left (np.ndarray): Si un NaN va al hijo izquierdo
+            value (np.ndarray): Valor de cada hoja
+            roots (np.ndarray): Nodo raíz de cada árbol
+            max_depth (int): Profundidad máxima de los árboles
+            n_features (int): Número de variables de entrada
+            kind (str): 'mean' (media de probabilidades) o 'sigmoid' (suma
+                de márgenes y sigmoide)
+            base_score (float): Margen inicial, en 'sigmoid'
+            sigmoid (float): Escala de la sigmoide, en 'sigmoid'
+            strict (bool): Comparar con `<` en lugar de `<=`
+            dtype (str): Tipo al que la librería convierte la entrada
+        """
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children = np.asarray(children, dtype=np.intp)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.kind = kind
+        self.base_score = float(base_score)
+        self.sigmoid = float(sigmoid)
+        self.strict = bool(strict)
+        self.dtype = np.dtype(dtype)
+        
+        # Muchos nodos repiten la misma condición (variable, umbral y
+        # dirección de los faltantes): se evalúan una sola vez por fila y
+        # cada nodo guarda el índice de su condición. Las hojas usan una
+        # condición extra que siempre va a la izquierda, es decir, a sí mismas.
+        self.is_leaf = self.children[0::2] == np.arange(len(self.feature))
+        internal = ~self.is_leaf
+        keys = np.column_stack([self.feature[internal], self.threshold[internal],
+                                self.missing_left[internal]])
+        conditions, inverse = np.unique(keys, axis=0, return_inverse=True)
+        self.condition_feature = conditions[:, 0].astype(np.intp)
+        self.condition_threshold = conditions[:, 1]
+        self.condition_missing_left = conditions[:, 2].astype(bool)
+        self.condition = np.full(len(self.feature), len(conditions), dtype=np.intp)
+        self.condition[internal] = inverse.ravel()
+        self.classes_ = np.array([0, 1])
+    
+    @classmethod
+    def _from_arrays(cls, arrays: _TreeArrays, n_features: int, **kwargs) -> 'CompiledTreeEnsemble':
+        """
+        Empaqueta los nodos acumulados en un ensemble compilado.
+
+        Args:
+            arrays (_TreeArrays): Nodos de todos los árboles
+            n_features (int): Número de variables de entrada
+            **kwargs: Parámetros de agregación de `CompiledTreeEnsemble`
+
+        Returns:
+            CompiledTreeEnsemble: Ensemble listo para predecir
+        """
+        children = np.column_stack([arrays.left, arrays.right]).ravel()
+        return cls(arrays.feature, arrays.threshold, children, arrays.missing_left,
+                   arrays.value, arrays.roots, max(arrays.depths), n_features, **kwargs)
+    
+    @classmethod
+    def from_random_forest(cls, model: 'RandomForestClassifier') -> 'CompiledTreeEnsemble':
+        """
+        Compila un `RandomForestClassifier` binario: cada hoja guarda la
+        fracción de la clase positiva y la probabilidad es la media.
+
+        Args:
+            model (RandomForestClassifier): Modelo entrenado
+
+        Returns:
+            CompiledTreeEnsemble: Ensemble compilado
+        """
+        arrays = _TreeArrays()
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            counts = tree.value[:, 0, :]
+            missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool))
+            arrays.add_tree(tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                            missing_left.astype(bool), counts[:, 1] / counts.sum(axis=1))
+        # scikit-learn compara la entrada convertida a float32
+        return cls._from_arrays(arrays, model.n_features_in_, kind='mean', dtype='float32')
+    
+    @classmethod
+    def from_xgboost(cls, model: 'XGBClassifier') -> 'CompiledTreeEnsemble':
+        """
+        Compila un `XGBClassifier` binario a partir de su volcado JSON. Con parada temprana solo se
+        usan los árboles hasta `best_iteration`, como en `predict_proba`.
+
+        Args:
+            model (XGBClassifier): Modelo entrenado
+
+        Returns:
+            CompiledTreeEnsemble: Ensemble compilado
+        """
+        learner = json.loads(model.get_booster().save_raw(raw_format='json'))['learner']
+        params = learner['learner_model_param']
+        if int(params['num_class']) > 1:
+            raise ValueError("Solo se compilan clasificadores binarios")
+        trees = learner['gradient_booster']['model']['trees']
+        best_iteration = getattr(model, 'best_iteration', None)
+        if best_iteration is not None:
+            trees = trees[:best_iteration + 1]
+        
+        arrays = _TreeArrays()
+        for tree in trees:
+            # El JSON abrevia los umbrales float32; se redondean de vuelta
+            # para que los empates con la entrada se resuelvan igual
+            threshold = np.asarray(tree['split_conditions'], dtype=np.float32)
+            arrays.add_tree(tree['split_indices'], threshold, tree['left_children'],
+                            tree['right_children'], np.asarray(tree['default_left'], dtype=bool),
+                            tree['split_conditions'])
+        # base_score se guarda como probabilidad ("0.5" o "[5E-1]")
+        base_score = float(params['base_score'].strip('[]'))
+        return cls._from_arrays(arrays, int(params['num_feature']), kind='sigmoid',
+                                base_score=np.log(base_score / (1 - base_score)),
+                                strict=True, dtype='float32')
+    
+    @classmethod
+    def from_lightgbm(cls, model: 'LGBMClassifier') -> 'CompiledTreeEnsemble':
+        """
+        Compila un `LGBMClassifier` binario a partir de `dump_model`, que ya
+        respeta `best_iteration_` y lleva el margen inicial en las hojas.
+
+        Args:
+            model (LGBMClassifier): Modelo entrenado
+
+        Returns:
+            CompiledTreeEnsemble: Ensemble compilado
+        """
+        dump = model.booster_.dump_model()
+        if dump['num_class'] > 1:
+            raise ValueError("Solo se compilan clasificadores binarios")
+        
+        arrays = _TreeArrays()
+        for info in dump['tree_info']:
+            nodes = []
+            stack = [(info['tree_structure'], None, None)]
+            while stack:
+                node, parent, side = stack.pop()
+                index = len(nodes)
+                nodes.append([0, np.inf, -1, -1, True, node.get('leaf_value', 0.0)])
+                if parent is not None:
+                    nodes[parent][2 if side == 'left' else 3] = index
+                if 'split_feature' in node:
+                    if node['decision_type'] != '<=':
+                        raise ValueError("Solo se compilan divisiones numéricas")
+                    nodes[index][:2] = [node['split_feature'], node['threshold']]
+                    # Sin faltantes en entrenamiento (missing_type 'None'),
+                    # LightGBM trata un NaN como 0
+                    if node['missing_type'] == 'NaN':
+                        nodes[index][4] = node['default_left']
+                    elif node['missing_type'] == 'None':
+                        nodes[index][4] = 0.0 <= node['threshold']
+                    else:
+                        raise ValueError("No se compila zero_as_missing")
+                    stack.append((node['right_child'], index, 'right'))
+                    stack.append((node['left_child'], index, 'left'))
+            feature, threshold, left, right, missing_left, value = map(list, zip(*nodes))
+            arrays.add_tree(feature, threshold, left, right, missing_left, value)
+        
+        sigmoid = re.search(r'sigmoid:([\d.]+)', dump['objective'])
+        return cls._from_arrays(arrays, dump['max_feature_idx'] + 1,
+                                kind='mean' if dump['average_output'] else 'sigmoid',
+                                sigmoid=float(sigmoid.group(1)) if sigmoid else 1.0)
+    
+    @classmethod
+    def from_model(cls, model) -> 'CompiledTreeEnsemble':
+        """
+        Compila un modelo de árboles según su tipo. Si es un Pipeline, se
+        compila su último paso.
+
+        Args:
+            model: RandomForestClassifier, XGBClassifier o LGBMClassifier
+
+        Returns:
+            CompiledTreeEnsemble: Ensemble compilado
+        """
+        # Las librerías no se importan: un modelo entrenado con ellas ya las cargó
+        if es_instancia_de(model, 'sklearn.pipeline', 'Pipeline'):
+            model = model.steps[-1][1]
+        if es_instancia_de(model, 'sklearn.ensemble', 'RandomForestClassifier'):
+            return cls.from_random_forest(model)
+        if es_instancia_de(model, 'xgboost', 'XGBClassifier'):
+            return cls.from_xgboost(model)
+        if es_instancia_de(model, 'lightgbm', 'LGBMClassifier'):
+            return cls.from_lightgbm(model)
+        raise ValueError(f"Modelo no soportado: {type(model).__name__}")
+    
+    def decisions(self, X) -> np.ndarray:
+        """
+        Evalúa todas las condiciones distintas del ensemble para cada fila.
+
+        Args:
+            X (np.ndarray): Matriz de características (n_filas, n_features)
+
+        Returns:
+            np.ndarray: True si la fila va al hijo derecho (n_filas, n_condiciones + 1)
+        """
+        x = X[:, self.condition_feature]
+        go_left = x < self.condition_threshold if self.strict else x <= self.condition_threshold
+        if np.isnan(x).any():
+            go_left |= np.isnan(x) & self.condition_missing_left
+        decisions = np.zeros((len(X), len(self.condition_feature) + 1), dtype=bool)
+        np.logical_not(go_left, out=decisions[:, :-1])
+        return decisions
+    
+    def leaves(self, X) -> np.ndarray:
+        """
+        Recorre todos los árboles para todas las filas a la vez. Cada paso
+        avanza un nivel con tres lecturas por par (fila, árbol): la condición
+        del nodo, su decisión y el hijo. Cuando la mitad de los pares ya
+        está en una hoja, se descartan para no seguir avanzándolos.
+
+        Args:
+            X: Matriz de características (n_filas, n_features)
+
+        Returns:
+            np.ndarray: Nodo hoja de cada fila y árbol (n_filas, n_árboles)
+        """
+        X = np.asarray(X, dtype=self.dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_trees = len(X), len(self.roots)
+        decisions = self.decisions(X)
+        
+        flat = decisions.ravel()
+        row_offset = np.repeat(np.arange(n_rows) * decisions.shape[1], n_trees)
+        nodes = np.tile(self.roots, n_rows)
+        position = np.arange(n_rows * n_trees)
+        leaves = np.empty(n_rows * n_trees, dtype=np.intp)
+        
+        for _ in range(self.max_depth):
+            go_right = flat.take(row_offset + self.condition.take(nodes))
+            nodes = self.children.take(2 * nodes + go_right)
+            done = self.is_leaf.take(nodes)
+            if 2 * np.count_nonzero(done) >= len(nodes):
+                leaves[position[done]] = nodes[done]
+                active = ~done
+                nodes, row_offset, position = nodes[active], row_offset[active], position[active]
+        leaves[position] = nodes
+        return leaves.reshape(n_rows, n_trees)
+    
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Calcula las probabilidades de cada clase, como `predict_proba`.
+
+        Args:
+            X: Matriz de características
+
+        Returns:
+            np.ndarray: Probabilidades (n_filas, 2)
+        """
+        values = self.value[self.leaves(X)]
+        if self.kind == 'mean':
+            proba = values.mean(axis=1)
+        else:
+            proba = 1 / (1 + np.exp(-self.sigmoid * (self.base_score + values.sum(axis=1))))
+        return np.column_stack([1 - proba, proba])
+    
+    def predict(self, X) -> np.ndarray:
+        """
+        Predice la clase de cada fila.
+
+        Args:
+            X: Matriz de características
+
+        Returns:
+            np.ndarray: Clases predichas
+        """
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+    
+    def save(self, path) -> None:
+        """
+        Guarda los arrays empaquetados en un archivo .npz.
+
+        Args:
+            path (str o Path): Ruta del archivo
+        """
+        meta = {
+            'version': ARTIFACT_VERSION,
+            'max_depth': self.max_depth,
+            'n_features': self.n_features,
+            'kind': self.kind,
+            'base_score': self.base_score,
+            'sigmoid': self.sigmoid,
+            'strict': self.strict,
+            'dtype': self.dtype.name
+        }
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, feature=self.feature, threshold=self.threshold,
+                                children=self.children, missing_left=self.missing_left,
+                                value=self.value, roots=self.roots, meta=json.dumps(meta))
+    
+    @classmethod
+    def load(cls, path) -> 'CompiledTreeEnsemble':
+        """
+        Carga un ensemble compilado guardado con `save`.
+
+        Args:
+            path (str o Path): Ruta del archivo
+
+        Returns:
+            CompiledTreeEnsemble: Ensemble listo para predecir
+        """
+        with np.load(Path(path)) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.pop('version') != ARTIFACT_VERSION:
+                raise ValueError(f"Artefacto incompatible: versión distinta de {ARTIFACT_VERSION}")
+            return cls(data['feature'], data['threshold'], data['children'], data['missing_left'],
+                       data['value'], data['roots'], **meta)
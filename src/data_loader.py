@@ -6,43 +6,364 @@ Module for loading and preparing Titanic dataset.
 Handles data loading and feature engineering.
 """
 
+import os
+import re
+import hashlib
+import tempfile
+import importlib.util
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-def cargar_datos(tipo='train'):
+CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'datos'
+PARQUET_DISPONIBLE = importlib.util.find_spec('pyarrow') is not None
+
+ETIQUETAS_TARIFA = ['Low', 'Medium', 'High', 'VeryHigh']
+CUANTILES_TARIFA = [0.25, 0.5, 0.75]
+
+# Esquema compacto de tipos: enteros pequeños, float32 y categorías con
+# vocabulario fijo (así todos los bloques comparten las mismas categorías)
+ESQUEMA_DTYPES = {
+    'PassengerId': 'int32',
+    'Survived': 'int8',
+    'Pclass': 'int8',
+    'Sex': pd.CategoricalDtype(['female', 'male']),
+    'Age': 'float32',
+    'SibSp': 'int8',
+    'Parch': 'int8',
+    'Fare': 'float32',
+    'Embarked': pd.CategoricalDtype(['C', 'Q', 'S'])
+}
+
+ESQUEMA_DERIVADAS = {
+    'FamilySize': 'int8',
+    'IsAlone': 'int8',
+    'Title': pd.CategoricalDtype(['Master', 'Miss', 'Mr', 'Mrs', 'Rare']),
+    'CabinDeck': pd.CategoricalDtype(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'T', 'U'])
+}
+
+def _ruta_datos(tipo):
+    """
+    Devuelve la ruta del archivo CSV correspondiente al tipo de conjunto.
+    
+    Args:
+        tipo (str): 'train' o 'test'
+        
+    Returns:
+        pathlib.Path: Ruta al archivo CSV
+    """
+    data_dir = Path(__file__).parent.parent / 'datasets'
+    
+    if tipo == 'train':
+        return data_dir / 'train.csv'
+    return data_dir / 'test.csv'
+
+def _hash_archivo(file_path):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo, leyendo por bloques.
+    
+    Args:
+        file_path (str o Path): Ruta al archivo
+        
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def _version_preparacion():
+    """
+    Devuelve la versión del código de preparación: el hash de este módulo.
+    Cualquier cambio en `preparar_datos` (o en sus auxiliares) invalida la caché.
+    
+    Returns:
+        str: Hash hexadecimal abreviado del código fuente del módulo
+    """
+    return _hash_archivo(__file__)[:16]
+
+def _ruta_cache(file_path):
+    """
+    Devuelve la ruta en caché del DataFrame preparado a partir de un CSV.
+    
+    Args:
+        file_path (Path): Ruta al archivo CSV de origen
+        
+    Returns:
+        pathlib.Path: Ruta del archivo Parquet en caché
+    """
+    clave = f"{_hash_archivo(file_path)[:16]}-{_version_preparacion()}"
+    return CACHE_DIR / f'{file_path.stem}-{clave}.parquet'
+
+def _guardar_cache(df, ruta_cache):
+    """
+    Guarda el DataFrame preparado en la caché y elimina las entradas
+    obsoletas del mismo archivo de origen. Se escribe en un temporal propio
+    y se renombra, de modo que escritores concurrentes no se pisan y los
+    lectores nunca ven un archivo a medias. Los errores de escritura se
+    ignoran: la caché es solo una optimización.
+    
+    Args:
+        df (pd.DataFrame): DataFrame preparado
+        ruta_cache (Path): Ruta del archivo Parquet en caché
+    """
+    origen = ruta_cache.stem.rsplit('-', 2)[0]
+    # Solo las entradas <origen>-<hash16>-<hash16>, no las de otros archivos
+    # cuyo nombre empieza igual
+    patron = re.compile(rf'{re.escape(origen)}-[0-9a-f]{{16}}-[0-9a-f]{{16}}\.parquet')
+    temporal = None
+    try:
+        ruta_cache.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=ruta_cache.parent, prefix=f'.{ruta_cache.stem}-',
+                                         suffix='.tmp', delete=False) as f:
+            temporal = Path(f.name)
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta_cache)
+        temporal = None
+        for obsoleta in ruta_cache.parent.iterdir():
+            if obsoleta != ruta_cache and patron.fullmatch(obsoleta.name):
+                obsoleta.unlink(missing_ok=True)
+    except OSError:
+        pass
+    finally:
+        if temporal is not None:
+            temporal.unlink(missing_ok=True)
+
+def cargar_datos(tipo='train', usar_cache=True, estadisticas=None, file_path=None):
     """
     Carga y prepara los datos del Titanic.
     
+    El DataFrame preparado se guarda en una caché columnar (Parquet) indexada
+    por el hash del CSV de origen y la versión del código de preparación, de
+    modo que las cargas siguientes no repiten el parseo ni la preparación.
+    
     Args:
         tipo (str): 'train' o 'test' para cargar el conjunto correspondiente
+        usar_cache (bool): Si se usa la caché Parquet (requiere pyarrow)
+        estadisticas (dict, opcional): Estadísticas globales de otro conjunto
+            (por ejemplo, las de train para preparar test). Si se indican,
+            no se usa la caché.
+        file_path (str o Path, opcional): Archivo CSV alternativo a leer
         
     Returns:
         pandas.DataFrame: DataFrame con los datos cargados y preparados
     """
-    # Definir rutas de archivos
-    data_dir = Path(__file__).parent.parent / 'datasets'
+    file_path = _ruta_datos(tipo) if file_path is None else Path(file_path)
     
-    if tipo == 'train':
-        file_path = data_dir / 'train.csv'
-    else:
-        file_path = data_dir / 'test.csv'
+    # El conjunto de submission no se prepara, así que no se cachea
+    usar_cache = (usar_cache and PARQUET_DISPONIBLE and tipo != 'submission'
+                  and estadisticas is None)
+    
+    if usar_cache:
+        ruta_cache = _ruta_cache(file_path)
+        if ruta_cache.exists():
+            return pd.read_parquet(ruta_cache)
     
     # Cargar datos
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(file_path, dtype=ESQUEMA_DTYPES)
     
     # Preparar datos si no es el conjunto de submission
     if tipo != 'submission':
-        df = preparar_datos(df)
+        df = aplicar_esquema(preparar_datos(df, estadisticas))
+    
+    if usar_cache:
+        _guardar_cache(df, ruta_cache)
     
     return df
 
-def preparar_datos(df):
+def cargar_datos_por_chunks(tipo='train', chunksize=100_000, file_path=None, estadisticas=None):
+    """
+    Carga y prepara los datos del Titanic en bloques, sin mantener el
+    archivo completo en memoria.
+    
+    Hace una primera pasada sobre el archivo para calcular las estadísticas
+    globales (medianas, moda y cortes de FareBin) y una segunda pasada que
+    prepara cada bloque con esas mismas estadísticas, de modo que todos los
+    bloques queden etiquetados igual que con `cargar_datos`.
+    
+    Args:
+        tipo (str): 'train' o 'test' para cargar el conjunto correspondiente
+        chunksize (int): Número de filas por bloque
+        file_path (str o Path, opcional): Archivo CSV alternativo a leer
+        estadisticas (dict, opcional): Estadísticas globales ya calculadas;
+            si se indican, se omite la primera pasada
+        
+    Yields:
+        pandas.DataFrame: Bloques de datos preparados
+    """
+    if file_path is None:
+        file_path = _ruta_datos(tipo)
+    
+    if estadisticas is None:
+        estadisticas = calcular_estadisticas_por_chunks(file_path, chunksize)
+    
+    for chunk in pd.read_csv(file_path, dtype=ESQUEMA_DTYPES, chunksize=chunksize):
+        if tipo != 'submission':
+            chunk = aplicar_esquema(preparar_datos(chunk, estadisticas))
+        yield chunk
+
+def aplicar_esquema(df):
+    """
+    Convierte las columnas presentes en el DataFrame a los tipos compactos
+    de `ESQUEMA_DTYPES` y `ESQUEMA_DERIVADAS`.
+    
+    Args:
+        df (pd.DataFrame): DataFrame con columnas originales y/o derivadas
+        
+    Returns:
+        pd.DataFrame: DataFrame con tipos compactos
+    """
+    esquema = {**ESQUEMA_DTYPES, **ESQUEMA_DERIVADAS}
+    return df.astype({col: dtype for col, dtype in esquema.items() if col in df.columns})
+
+def reporte_memoria(tipo='train'):
+    """
+    Compara la memoria por columna del DataFrame preparado con los tipos
+    por defecto de pandas frente al esquema compacto.
+    
+    Args:
+        tipo (str): 'train' o 'test' para cargar el conjunto correspondiente
+        
+    Returns:
+        pandas.DataFrame: Bytes originales, compactos y ahorrados por columna
+    """
+    original = preparar_datos(pd.read_csv(_ruta_datos(tipo)))
+    compacto = cargar_datos(tipo, usar_cache=False)
+    
+    reporte = pd.DataFrame({
+        'Bytes Originales': original.memory_usage(index=False, deep=True),
+        'Bytes Compactos': compacto.memory_usage(index=False, deep=True)
+    })
+    reporte['Bytes Ahorrados'] = reporte['Bytes Originales'] - reporte['Bytes Compactos']
+    reporte.loc['Total'] = reporte.sum()
+    
+    return reporte
+
+def _cuantil_desde_conteos(conteos, q):
+    """
+    Calcula un cuantil exacto a partir de conteos de valores, con la misma
+    interpolación lineal que `pandas.Series.quantile`.
+    
+    Args:
+        conteos (pd.Series): Conteo de cada valor distinto (índice = valor)
+        q (float): Cuantil a calcular, entre 0 y 1
+        
+    Returns:
+        float: Valor del cuantil
+    """
+    if conteos.empty:
+        return np.nan
+    
+    conteos = conteos.sort_index()
+    valores = conteos.index.to_numpy(dtype=float)
+    acumulado = conteos.to_numpy().cumsum()
+    
+    posicion = q * (acumulado[-1] - 1)
+    inferior = int(np.floor(posicion))
+    superior = int(np.ceil(posicion))
+    v_inf = valores[np.searchsorted(acumulado, inferior, side='right')]
+    v_sup = valores[np.searchsorted(acumulado, superior, side='right')]
+    
+    return v_inf + (v_sup - v_inf) * (posicion - inferior)
+
+def _estadisticas_desde_conteos(conteos_edad, conteos_tarifa, conteos_embarque,
+                                faltantes_tarifa=0):
+    """
+    Construye el diccionario de estadísticas globales a partir de conteos.
+    
+    Args:
+        conteos_edad (pd.Series): Conteo de valores de Age
+        conteos_tarifa (pd.Series): Conteo de valores de Fare
+        conteos_embarque (pd.Series): Conteo de valores de Embarked
+        faltantes_tarifa (int): Número de valores faltantes en Fare
+        
+    Returns:
+        dict: Estadísticas usadas por `preparar_datos`
+    """
+    # Moda: el valor más frecuente y, ante empates, el menor (como Series.mode)
+    maximo = conteos_embarque.max()
+    embarked_mode = sorted(conteos_embarque[conteos_embarque == maximo].index)[0]
+    
+    # Los cortes de FareBin se calculan después de imputar Fare con la mediana
+    fare_median = _cuantil_desde_conteos(conteos_tarifa, 0.5)
+    if faltantes_tarifa:
+        conteos_tarifa = conteos_tarifa.add(
+            pd.Series({fare_median: faltantes_tarifa}), fill_value=0)
+    cortes = [_cuantil_desde_conteos(conteos_tarifa, q) for q in CUANTILES_TARIFA]
+    
+    return {
+        'age_median': _cuantil_desde_conteos(conteos_edad, 0.5),
+        'fare_median': fare_median,
+        'embarked_mode': embarked_mode,
+        'fare_bins': [-np.inf] + cortes + [np.inf]
+    }
+
+def calcular_estadisticas(df):
+    """
+    Calcula las estadísticas globales que necesita `preparar_datos`.
+    
+    Args:
+        df (pd.DataFrame): DataFrame original
+        
+    Returns:
+        dict: Medianas de Age y Fare, moda de Embarked y cortes de FareBin
+    """
+    return _estadisticas_desde_conteos(
+        df['Age'].value_counts(),
+        df['Fare'].value_counts(),
+        df['Embarked'].value_counts(),
+        df['Fare'].isna().sum()
+    )
+
+def calcular_estadisticas_por_chunks(file_path, chunksize=100_000):
+    """
+    Calcula las estadísticas globales recorriendo el CSV por bloques.
+    
+    Age y Fare se resumen en sketches KLL y Embarked en conteos de sus
+    categorías, por lo que la memoria no depende del número de filas ni de
+    la cardinalidad de las tarifas. Con menos valores que la capacidad del
+    sketch el resultado es idéntico al de `calcular_estadisticas` sobre el
+    archivo completo; por encima, medianas y cortes tienen un error de rango
+    del orden de 1/k.
+    
+    Args:
+        file_path (str o Path): Ruta al archivo CSV
+        chunksize (int): Número de filas por bloque
+        
+    Returns:
+        dict: Medianas de Age y Fare, moda de Embarked y cortes de FareBin
+    """
+    from sketches import KLLSketch
+    
+    sketch_edad = KLLSketch()
+    sketch_tarifa = KLLSketch()
+    conteos_embarque = pd.Series(dtype='int64')
+    faltantes_tarifa = 0
+    
+    columnas = ['Age', 'Fare', 'Embarked']
+    dtypes = {col: ESQUEMA_DTYPES[col] for col in columnas}
+    for chunk in pd.read_csv(file_path, usecols=columnas, dtype=dtypes, chunksize=chunksize):
+        sketch_edad.update(chunk['Age'].to_numpy())
+        sketch_tarifa.update(chunk['Fare'].to_numpy())
+        conteos_embarque = conteos_embarque.add(chunk['Embarked'].value_counts(), fill_value=0)
+        faltantes_tarifa += chunk['Fare'].isna().sum()
+    
+    # Los pesos del sketch hacen de conteos: cada valor guardado representa
+    # 2**nivel valores originales
+    return _estadisticas_desde_conteos(sketch_edad.weights(), sketch_tarifa.weights(),
+                                       conteos_embarque, faltantes_tarifa)
+
+def preparar_datos(df, estadisticas=None):
     """
     Prepara los datos para el análisis.
     
     Args:
         df (pd.DataFrame): DataFrame original
+        estadisticas (dict, opcional): Estadísticas globales precalculadas
+            (ver `calcular_estadisticas`). Si no se indican, se calculan
+            sobre el propio DataFrame.
         
     Returns:
         pd.DataFrame: DataFrame con características adicionales
@@ -50,10 +371,13 @@ def preparar_datos(df):
     # Copiar DataFrame
     df = df.copy()
     
+    if estadisticas is None:
+        estadisticas = calcular_estadisticas(df)
+    
     # Manejar valores faltantes
-    df['Age'] = df['Age'].fillna(df['Age'].median())
-    df['Embarked'] = df['Embarked'].fillna(df['Embarked'].mode()[0])
-    df['Fare'] = df['Fare'].fillna(df['Fare'].median())
+    df['Age'] = df['Age'].fillna(estadisticas['age_median'])
+    df['Embarked'] = df['Embarked'].fillna(estadisticas['embarked_mode'])
+    df['Fare'] = df['Fare'].fillna(estadisticas['fare_median'])
     
     # Crear características de familia
     df['FamilySize'] = df['SibSp'] + df['Parch'] + 1
@@ -90,9 +414,9 @@ def preparar_datos(df):
                          labels=['Niño', 'Joven', 'Adult', 'MiddleAge', 'Senior'])
     
     # Crear rangos de tarifa
-    df['FareBin'] = pd.qcut(df['Fare'], 
-                           q=4,
-                           labels=['Low', 'Medium', 'High', 'VeryHigh'])
+    df['FareBin'] = pd.cut(df['Fare'],
+                          bins=estadisticas['fare_bins'],
+                          labels=ETIQUETAS_TARIFA)
     
     # Extraer cubierta de la cabina
     df['CabinDeck'] = df['Cabin'].str[0]
@@ -5,9 +5,60 @@ Contiene funciones para generar visualizaciones y estadísticas descriptivas.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from IPython.display import display, Markdown
+
+from aggregates import BINS_PIRAMIDE, SurvivalCube
+from utils import importar_diferido
+
+# Se importan al dibujar la primera figura
+plt = importar_diferido('matplotlib.pyplot')
+sns = importar_diferido('seaborn')
+
+def _cubo(df):
+    """
+    Devuelve el cubo de agregados de un DataFrame preparado, o el propio
+    argumento si ya es un `SurvivalCube`.
+    
+    Args:
+        df (pandas.DataFrame o SurvivalCube): Datos a resumir
+    
+    Returns:
+        SurvivalCube: Cubo de agregados
+    """
+    return df if isinstance(df, SurvivalCube) else SurvivalCube.from_frame(df)
+
+def _barras_supervivencia(ax, supervivencia):
+    """
+    Añade a un gráfico de barras el intervalo de confianza del 95% de cada
+    tasa de supervivencia (aproximación normal de la binomial), con el
+    mismo estilo que las barras de error de seaborn.
+    
+    Args:
+        ax (matplotlib.axes.Axes): Eje del gráfico
+        supervivencia (pandas.DataFrame): Columnas count y rate por barra
+    """
+    p = supervivencia['rate'].to_numpy()
+    error = 1.96 * np.sqrt(p * (1 - p) / supervivencia['count'].to_numpy())
+    # El intervalo se recorta a [0, 1]
+    yerr = [p - np.clip(p - error, 0, 1), np.clip(p + error, 0, 1) - p]
+    ax.errorbar(np.arange(len(p)), p, yerr=yerr, fmt='none', ecolor='.26',
+                elinewidth=plt.rcParams['lines.linewidth'] * 1.8)
+
+def _cajas(ax, estadisticas, etiquetas, colores):
+    """
+    Dibuja diagramas de caja a partir de estadísticas precalculadas, con un
+    estilo cercano al de `seaborn.boxplot`.
+    
+    Args:
+        ax (matplotlib.axes.Axes): Eje del gráfico
+        estadisticas (list): Estadísticas de `Axes.bxp`, una por caja
+        etiquetas (list): Etiqueta de cada caja
+        colores (list): Color de cada caja
+    """
+    cajas = ax.bxp(estadisticas, positions=range(len(estadisticas)), widths=0.8, patch_artist=True,
+                   medianprops={'color': '.26'}, flierprops={'marker': 'd', 'markerfacecolor': '.26'})
+    for caja, color in zip(cajas['boxes'], colores):
+        caja.set_facecolor(color)
+    ax.set_xticks(range(len(estadisticas)), etiquetas)
 
 def analizar_valores_faltantes(df):
     """
@@ -32,13 +83,17 @@ def analizar_valores_faltantes(df):
 def plot_supervivencia_general(df):
     """
     Crea un gráfico de la distribución general de supervivencia con porcentajes.
+    
+    Args:
+        df (pandas.DataFrame o SurvivalCube): Datos preparados o su cubo
     """
     plt.figure(figsize=(10, 6))
     
     # Preparar datos
+    tasa = _cubo(df).survival()['rate'].iloc[0]
     df_plot = pd.DataFrame({
         'Estado': ['No Sobrevivió', 'Sobrevivió'],
-        'Porcentaje': (df['Survived'].value_counts(normalize=True) * 100).round(1).values
+        'Porcentaje': (np.array([1 - tasa, tasa]) * 100).round(1)
     })
     
     # Crear gráfico
@@ -59,28 +114,32 @@ def plot_supervivencia_general(df):
 def plot_supervivencia_por_clase(df):
     """
     Crea un gráfico de supervivencia por clase con información detallada.
+    
+    Args:
+        df (pandas.DataFrame o SurvivalCube): Datos preparados o su cubo
     """
     plt.figure(figsize=(12, 6))
     
     # Calcular porcentajes por clase
-    clase_surv = df.groupby('Pclass')['Survived'].agg(['count', 'mean']).round(3)
-    clase_surv['mean'] = clase_surv['mean'] * 100
+    clase_surv = _cubo(df).survival('Pclass')
     
     # Preparar datos para el gráfico
-    df_plot = df.copy()
-    df_plot['Clase'] = df_plot['Pclass'].map({1: 'Primera', 2: 'Segunda', 3: 'Tercera'})
+    df_plot = pd.DataFrame({
+        'Clase': clase_surv.index.map({1: 'Primera', 2: 'Segunda', 3: 'Tercera'}),
+        'Survived': clase_surv['rate'].to_numpy()
+    })
     
     # Crear gráfico
     ax = sns.barplot(data=df_plot, x='Clase', y='Survived', 
                     hue='Clase', palette=['#3498db', '#2ecc71', '#e74c3c'],
                     legend=False)
+    _barras_supervivencia(ax, clase_surv)
     
     # Añadir porcentajes y cantidades
     for i, row in enumerate(clase_surv.itertuples()):
-        total = row.count
-        porcentaje = row.mean
+        porcentaje = round(row.rate, 3) * 100
         ax.text(i, porcentaje/100 + 0.02, 
-                f'{porcentaje:.1f}%\n({int(total*porcentaje/100)}/{total})', 
+                f'{porcentaje:.1f}%\n({row.survived}/{row.count})', 
                 ha='center', fontsize=10)
     
     plt.title('Tasa de Supervivencia por Clase', pad=20, fontsize=14)
@@ -93,22 +152,23 @@ def plot_supervivencia_por_clase(df):
 def plot_piramide_edad_genero(df):
     """
     Crea una pirámide de edad por género y supervivencia.
+    
+    Args:
+        df (pandas.DataFrame o SurvivalCube): Datos preparados o su cubo
     """
+    cubo = _cubo(df)
     plt.figure(figsize=(12, 8))
     
-    # Preparar datos
-    male_survived = df[(df['Sex'] == 'male') & (df['Survived'] == 1)]['Age']
-    male_died = df[(df['Sex'] == 'male') & (df['Survived'] == 0)]['Age']
-    female_survived = df[(df['Sex'] == 'female') & (df['Survived'] == 1)]['Age']
-    female_died = df[(df['Sex'] == 'female') & (df['Survived'] == 0)]['Age']
-    
-    bins = range(0, 81, 10)
+    # Preparar datos: conteos por intervalo de edad, graficados como pesos
+    bins = BINS_PIRAMIDE
+    centros = bins[:-1]
+    conteos = cubo.age_hist.reindex(pd.MultiIndex.from_product([['male', 'female'], [0, 1]]), fill_value=0)
     
     # Crear subplots
     plt.subplot(121)
-    plt.hist(male_died, bins=bins, orientation='horizontal', alpha=0.8, 
+    plt.hist(centros, bins=bins, weights=conteos.loc[('male', 0)], orientation='horizontal', alpha=0.8, 
             color='#ff6b6b', label='Fallecidos')
-    plt.hist(male_survived, bins=bins, orientation='horizontal', alpha=0.8,
+    plt.hist(centros, bins=bins, weights=conteos.loc[('male', 1)], orientation='horizontal', alpha=0.8,
             color='#4ecdc4', label='Sobrevivientes')
     plt.title('Hombres', pad=20)
     plt.ylabel('Edad')
@@ -116,9 +176,9 @@ def plot_piramide_edad_genero(df):
     plt.legend()
     
     plt.subplot(122)
-    plt.hist(female_died, bins=bins, orientation='horizontal', alpha=0.8,
+    plt.hist(centros, bins=bins, weights=conteos.loc[('female', 0)], orientation='horizontal', alpha=0.8,
             color='#ff6b6b', label='Fallecidas')
-    plt.hist(female_survived, bins=bins, orientation='horizontal', alpha=0.8,
+    plt.hist(centros, bins=bins, weights=conteos.loc[('female', 1)], orientation='horizontal', alpha=0.8,
             color='#4ecdc4', label='Sobrevivientes')
     plt.title('Mujeres', pad=20)
     plt.ylabel('Edad')
@@ -134,12 +194,19 @@ def plot_piramide_edad_genero(df):
 def plot_familias(df):
     """
     Crea visualizaciones sobre el impacto del tamaño familiar en la supervivencia.
+    
+    Args:
+        df (pandas.DataFrame o SurvivalCube): Datos preparados o su cubo
     """
+    cubo = _cubo(df)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-      # Tamaño familiar vs Supervivencia
-    familia_surv = df.groupby('FamilySize')['Survived'].agg(['count', 'mean'])
-    sns.barplot(data=df, x='FamilySize', y='Survived', ax=ax1,
+    
+    # Tamaño familiar vs Supervivencia
+    familia_surv = cubo.survival('FamilySize')
+    df_plot = pd.DataFrame({'FamilySize': familia_surv.index, 'Survived': familia_surv['rate'].to_numpy()})
+    sns.barplot(data=df_plot, x='FamilySize', y='Survived', ax=ax1,
                 hue='FamilySize', palette='viridis', legend=False)
+    _barras_supervivencia(ax1, familia_surv)
     ax1.set_title('Tasa de Supervivencia por Tamaño Familiar', pad=20)
     ax1.set_xlabel('Tamaño de la Familia')
     ax1.set_ylabel('Tasa de Supervivencia')
@@ -147,14 +214,14 @@ def plot_familias(df):
     # Añadir etiquetas con cantidades
     for i, row in enumerate(familia_surv.itertuples()):
         if row.count > 0:  # Solo mostrar si hay pasajeros
-            ax1.text(i, row.mean + 0.02, 
-                    f'n={row.count}\n{row.mean*100:.1f}%', 
+            ax1.text(i, row.rate + 0.02, 
+                    f'n={row.count}\n{row.rate*100:.1f}%', 
                     ha='center', fontsize=9)
-      # Distribución de tamaños familiares por clase
-    df_plot = df.copy()
-    df_plot['Clase'] = df_plot['Pclass'].map({1: 'Primera', 2: 'Segunda', 3: 'Tercera'})
-    sns.boxplot(data=df_plot, x='Clase', y='FamilySize', ax=ax2,
-                hue='Clase', palette=['#3498db', '#2ecc71', '#e74c3c'], legend=False)
+    
+    # Distribución de tamaños familiares por clase, desde los conteos
+    estadisticas = cubo.box_stats('FamilySize', by='Pclass')
+    _cajas(ax2, [estadisticas[clase] for clase in [1, 2, 3]],
+           ['Primera', 'Segunda', 'Tercera'], ['#3498db', '#2ecc71', '#e74c3c'])
     ax2.set_title('Distribución de Tamaño Familiar por Clase', pad=20)
     ax2.set_xlabel('Clase')
     ax2.set_ylabel('Tamaño de la Familia')
@@ -165,21 +232,25 @@ def plot_familias(df):
 def plot_tarifas_supervivencia(df):
     """
     Analiza la relación entre tarifas y supervivencia.
+    
+    Args:
+        df (pandas.DataFrame o SurvivalCube): Datos preparados o su cubo
     """
+    cubo = _cubo(df)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-      # Distribución de tarifas por supervivencia
-    df_plot = df.copy()
-    df_plot['Estado'] = df_plot['Survived'].map({0: 'Fallecidos', 1: 'Sobrevivientes'})
-    sns.boxplot(data=df_plot, x='Estado', y='Fare', ax=ax1,
-                hue='Estado', palette=['#ff6b6b', '#4ecdc4'], legend=False)
+    
+    # Distribución de tarifas por supervivencia, desde los sketches
+    estadisticas = cubo.fare_box_stats('Survived')
+    _cajas(ax1, [estadisticas[estado] for estado in [0, 1]],
+           ['Fallecidos', 'Sobrevivientes'], ['#ff6b6b', '#4ecdc4'])
     ax1.set_title('Distribución de Tarifas por Supervivencia', pad=20)
     ax1.set_xlabel('Estado')
     ax1.set_ylabel('Tarifa (£)')
-      # Tarifas por clase
-    df_plot = df.copy()
-    df_plot['Clase'] = df_plot['Pclass'].map({1: 'Primera', 2: 'Segunda', 3: 'Tercera'})
-    sns.boxplot(data=df_plot, x='Clase', y='Fare', ax=ax2,
-                hue='Clase', palette=['#3498db', '#2ecc71', '#e74c3c'], legend=False)
+    
+    # Tarifas por clase
+    estadisticas = cubo.fare_box_stats('Pclass')
+    _cajas(ax2, [estadisticas[clase] for clase in [1, 2, 3]],
+           ['Primera', 'Segunda', 'Tercera'], ['#3498db', '#2ecc71', '#e74c3c'])
     ax2.set_title('Distribución de Tarifas por Clase', pad=20)
     ax2.set_xlabel('Clase')
     ax2.set_ylabel('Tarifa (£)')
@@ -195,7 +266,7 @@ def plot_correlaciones(df):
         df (pandas.DataFrame): DataFrame con los datos
     """
     # Seleccionar solo variables numéricas
-    numericas = df.select_dtypes(include=['int64', 'float64'])
+    numericas = df.select_dtypes(include='number')
     
     plt.figure(figsize=(10, 8))
     sns.heatmap(numericas.corr(), annot=True, cmap='coolwarm', center=0)
@@ -5,8 +5,23 @@ Este módulo contiene la clase principal para realizar todas las
 transformaciones de características.
 """
 
+import re
+import json
+import hashlib
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
+# Texto entre la primera coma y el primer punto: "Apellido, Título. Nombre"
+TITLE_PATTERN = re.compile(r'^[^,]*,([^.]*)')
+COMMON_TITLES = ['Mr', 'Mrs', 'Miss', 'Master']
+AGE_LABELS = ['Young', 'Adult', 'MiddleAge', 'Senior']
+FARE_LABELS = ['Low', 'Medium', 'High', 'VeryHigh']
+
+# Versión del formato del artefacto serializado; incrementarla si cambian
+# los parámetros aprendidos o su significado
+ARTIFACT_VERSION = 2
+
 class TitanicFeatureEngineering:
     """
     Clase para realizar feature engineering en el dataset del Titanic.
@@ -19,6 +34,58 @@ class TitanicFeatureEngineering:
         self.fare_bins = None
         self.age_bins = None
     
+    @staticmethod
+    def quantile_edges(values: pd.Series, q: int = 4) -> np.ndarray:
+        """
+        Calcula los cortes de cuantiles de una columna, con extremos
+        infinitos para que valores fuera del rango de entrenamiento
+        caigan en el primer o último bin.
+
+        Args:
+            values (pd.Series): Valores de la columna
+            q (int): Número de cuantiles
+
+        Returns:
+            np.ndarray: Cortes de los bins, de longitud q + 1
+        """
+        inner = values.quantile(np.linspace(0, 1, q + 1)[1:-1]).to_numpy(dtype=float)
+        return np.concatenate([[-np.inf], inner, [np.inf]])
+    
+    @staticmethod
+    def apply_bins(values: pd.Series, edges: np.ndarray, labels: list) -> pd.Categorical:
+        """
+        Asigna cada valor a su bin con búsqueda binaria sobre los cortes.
+        Los intervalos son cerrados por la derecha, como en `pd.cut`.
+
+        Args:
+            values (pd.Series): Valores a categorizar
+            edges (np.ndarray): Cortes de los bins
+            labels (list): Etiquetas de cada bin
+
+        Returns:
+            pd.Categorical: Bins ordenados; NaN para valores faltantes
+        """
+        values = values.to_numpy(dtype=float)
+        codes = np.searchsorted(edges[1:-1], values, side='left')
+        codes[np.isnan(values)] = -1
+        return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+    
+    def fit(self, df: pd.DataFrame) -> 'TitanicFeatureEngineering':
+        """
+        Aprende los parámetros de las transformaciones: los cortes de
+        cuantiles de edad y tarifa, calculados sobre los valores observados.
+        Los faltantes no se imputan aquí sino en `TitanicPreprocessor`.
+
+        Args:
+            df (pd.DataFrame): DataFrame de entrenamiento
+
+        Returns:
+            TitanicFeatureEngineering: La propia instancia ajustada
+        """
+        self.age_bins = self.quantile_edges(df['Age'])
+        self.fare_bins = self.quantile_edges(df['Fare'])
+        return self
+    
     def extract_title(self, name: str) -> str:
         """
         Extrae el título del nombre del pasajero.
@@ -30,10 +97,30 @@ class TitanicFeatureEngineering:
             str: Título extraído y normalizado
         """
         title = name.split(',')[1].split('.')[0].strip()
-        if title in ['Mr', 'Mrs', 'Miss', 'Master']:
+        if title in COMMON_TITLES:
             return title
         return 'Other'
     
+    def extract_titles(self, names: pd.Series) -> pd.Series:
+        """
+        Versión vectorizada de `extract_title` para una columna de nombres.
+        Si la columna es categórica, la extracción se hace una sola vez por
+        categoría en lugar de por fila.
+
+        Args:
+            names (pd.Series): Nombres completos de los pasajeros
+
+        Returns:
+            pd.Series: Títulos extraídos y normalizados
+        """
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            categories = pd.Series(names.cat.categories)
+            titles = self.extract_titles(categories)
+            return names.map(dict(zip(categories, titles))).astype(titles.dtype)
+        
+        titles = names.str.extract(TITLE_PATTERN, expand=False).str.strip()
+        return titles.where(titles.isin(COMMON_TITLES), 'Other')
+    
     def create_family_size(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Crea características relacionadas con el tamaño de la familia.
@@ -50,7 +137,8 @@ class TitanicFeatureEngineering:
     
     def create_age_bins(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Crea bins de edad para categorizar a los pasajeros.
+        Crea bins de edad para categorizar a los pasajeros, usando los
+        cortes de cuantiles aprendidos en `fit`.
 
         Args:
             df (pd.DataFrame): DataFrame original
@@ -58,12 +146,13 @@ class TitanicFeatureEngineering:
         Returns:
             pd.DataFrame: DataFrame con edad categorizada
         """
-        df['AgeBin'] = pd.qcut(df['Age'], q=4, labels=['Young', 'Adult', 'MiddleAge', 'Senior'])
+        df['AgeBin'] = self.apply_bins(df['Age'], self.age_bins, AGE_LABELS)
         return df
     
     def create_fare_bins(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Crea bins de tarifa para categorizar los precios.
+        Crea bins de tarifa para categorizar los precios, usando los
+        cortes de cuantiles aprendidos en `fit`.
 
         Args:
             df (pd.DataFrame): DataFrame original
@@ -71,7 +160,7 @@ class TitanicFeatureEngineering:
         Returns:
             pd.DataFrame: DataFrame con tarifa categorizada
         """
-        df['FareBin'] = pd.qcut(df['Fare'], q=4, labels=['Low', 'Medium', 'High', 'VeryHigh'])
+        df['FareBin'] = self.apply_bins(df['Fare'], self.fare_bins, FARE_LABELS)
         return df
     
     def extract_cabin_info(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -90,7 +179,11 @@ class TitanicFeatureEngineering:
     
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Aplica todas las transformaciones de feature engineering.
+        Aplica todas las transformaciones de feature engineering con los
+        parámetros aprendidos en `fit`, que debe llamarse antes (o usar
+        `fit_transform` sobre el entrenamiento). Los faltantes de Age, Fare y
+        Embarked se conservan (y sus bins quedan vacíos) para que los impute
+        `TitanicPreprocessor`.
 
         Args:
             df (pd.DataFrame): DataFrame original
@@ -98,10 +191,103 @@ class TitanicFeatureEngineering:
         Returns:
             pd.DataFrame: DataFrame con todas las nuevas características
         """
+        if self.fare_bins is None:
+            raise ValueError("TitanicFeatureEngineering no está ajustado; llama a fit() primero")
+        
         df = df.copy()
-        df['Title'] = df['Name'].apply(self.extract_title)
+        df['Title'] = self.extract_titles(df['Name'])
         df = self.create_family_size(df)
         df = self.create_age_bins(df)
         df = self.create_fare_bins(df)
         df = self.extract_cabin_info(df)
         return df
+    
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Ajusta los parámetros sobre el DataFrame y lo transforma.
+
+        Args:
+            df (pd.DataFrame): DataFrame de entrenamiento
+
+        Returns:
+            pd.DataFrame: DataFrame con todas las nuevas características
+        """
+        return self.fit(df).transform(df)
+    
+    @staticmethod
+    def schema_hash() -> str:
+        """
+        Calcula el hash del esquema de las transformaciones: versión del
+        artefacto, títulos reconocidos y etiquetas de los bins. Un artefacto
+        solo es compatible con código que produzca el mismo hash.
+
+        Returns:
+            str: Hash hexadecimal abreviado
+        """
+        schema = {
+            'version': ARTIFACT_VERSION,
+            'titles': COMMON_TITLES,
+            'age_labels': AGE_LABELS,
+            'fare_labels': FARE_LABELS
+        }
+        return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:16]
+    
+    def to_dict(self) -> dict:
+        """
+        Exporta los parámetros aprendidos en `fit` a un diccionario
+        serializable en JSON.
+
+        Returns:
+            dict: Parámetros aprendidos junto con el hash del esquema
+        """
+        if self.fare_bins is None:
+            raise ValueError("TitanicFeatureEngineering no está ajustado; llama a fit() primero")
+        return {
+            'schema_hash': self.schema_hash(),
+            'titles': COMMON_TITLES,
+            'age_bins': [float(x) for x in self.age_bins],
+            'fare_bins': [float(x) for x in self.fare_bins]
+        }
+    
+    @classmethod
+    def from_dict(cls, params: dict) -> 'TitanicFeatureEngineering':
+        """
+        Reconstruye una instancia ajustada a partir de `to_dict`.
+
+        Args:
+            params (dict): Parámetros exportados
+
+        Returns:
+            TitanicFeatureEngineering: Instancia lista para `transform`
+        """
+        if params.get('schema_hash') != cls.schema_hash():
+            raise ValueError(
+                f"Artefacto incompatible: esquema {params.get('schema_hash')}, "
+                f"se esperaba {cls.schema_hash()}"
+            )
+        fe = cls()
+        fe.age_bins = np.array(params['age_bins'])
+        fe.fare_bins = np.array(params['fare_bins'])
+        return fe
+    
+    def save(self, path) -> None:
+        """
+        Guarda los parámetros aprendidos en un archivo JSON.
+
+        Args:
+            path (str o Path): Ruta del archivo
+        """
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding='utf-8')
+    
+    @classmethod
+    def load(cls, path) -> 'TitanicFeatureEngineering':
+        """
+        Carga una instancia ajustada desde un archivo JSON.
+
+        Args:
+            path (str o Path): Ruta del archivo
+
+        Returns:
+            TitanicFeatureEngineering: Instancia lista para `transform`
+        """
+        return cls.from_dict(json.loads(Path(path).read_text(encoding='utf-8')))
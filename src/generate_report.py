@@ -3,18 +3,143 @@ Script principal para el análisis del Titanic.
 Ejecuta todas las pruebas, genera visualizaciones y crea un reporte en Markdown.
 """
 
+import re
 import sys
+import json
+import shutil
+import tempfile
+import hashlib
+import importlib
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import os
 
+# Caché de figuras por contenido: <función>-<clave>.png, con la clave derivada
+# de los datos graficados, el código que los grafica y el estilo. Cada función
+# conserva solo su última entrada
+FIGURE_CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'figuras'
+
+# Módulos de los que dependen las figuras además del de cada función:
+# el cubo de agregados y los sketches que lo resumen
+FIGURE_MODULES = ('aggregates', 'sketches')
+
+# Estado de los agregados entre ejecuciones: el cubo y las estadísticas con
+# las que se preparan los lotes nuevos
+AGGREGATES_DIR = Path(__file__).parent.parent / '.cache' / 'agregados'
+
+def _figure_key(plot_func, cube, rc):
+    """
+    Calcula la clave de caché de una figura: hash del cubo de agregados que
+    grafica, del nombre de la función, del código fuente de su módulo (con
+    sus auxiliares) y de `FIGURE_MODULES`, de los rcParams y de las
+    versiones de matplotlib y seaborn. Cualquier cambio en ese código
+    invalida la figura.
+    
+    Args:
+        plot_func (callable): Función de `eda` que devuelve la figura
+        cube (SurvivalCube): Cubo que recibe la función
+        rc (dict): rcParams con los que se genera
+        
+    Returns:
+        str: Hash hexadecimal de la figura
+    """
+    sha = hashlib.sha256()
+    sha.update(cube.digest().encode())
+    sha.update(f'{plot_func.__module__}.{plot_func.__qualname__}'.encode())
+    for name in (plot_func.__module__, *FIGURE_MODULES):
+        sha.update(Path(importlib.import_module(name).__file__).read_bytes())
+    sha.update(json.dumps(rc, sort_keys=True, default=str).encode())
+    sha.update(f'{matplotlib.__version__}-{sns.__version__}'.encode())
+    return sha.hexdigest()
+
+def _store_figure(filepath, cached):
+    """
+    Copia una figura recién generada en la caché y elimina las entradas
+    obsoletas de la misma función. Se escribe en un temporal propio y se
+    renombra, de modo que escritores concurrentes no se pisan. Los errores
+    de escritura se ignoran: la caché es solo una optimización.
+    
+    Args:
+        filepath (Path): PNG generado
+        cached (Path): Ruta de la figura en caché (`<función>-<clave>.png`)
+    """
+    funcion = cached.stem.rsplit('-', 1)[0]
+    # Solo las entradas <función>-<sha256>, no las de otras funciones cuyo
+    # nombre empieza igual
+    patron = re.compile(rf'{re.escape(funcion)}-[0-9a-f]{{64}}\.png')
+    temporal = None
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cached.parent, prefix=f'.{cached.stem}-',
+                                         suffix='.tmp', delete=False) as f:
+            temporal = Path(f.name)
+        shutil.copyfile(filepath, temporal)
+        os.replace(temporal, cached)
+        temporal = None
+        for obsoleta in cached.parent.iterdir():
+            if obsoleta != cached and patron.fullmatch(obsoleta.name):
+                obsoleta.unlink(missing_ok=True)
+    except OSError:
+        pass
+    finally:
+        if temporal is not None:
+            temporal.unlink(missing_ok=True)
+
+def _init_worker():
+    """Inicializa cada proceso del pool con el backend Agg, sin ventanas."""
+    matplotlib.use('Agg')
+
+def _render_figure(plot_func, df, filepath, rc):
+    """
+    Genera una visualización y la guarda como PNG. Se usa igual en serie
+    y en el pool, con los mismos rcParams, para que los archivos sean
+    idénticos byte a byte. Mide por separado la construcción de la figura
+    (matplotlib y seaborn) y `savefig` (rasterizado y codificación PNG).
+    
+    Args:
+        plot_func (callable): Función de `eda` que devuelve la figura
+        df (SurvivalCube o pd.DataFrame): Datos a graficar
+        filepath (Path): Ruta del PNG
+        rc (dict): rcParams del proceso principal
+        
+    Returns:
+        tuple: Ruta del PNG generado y etapas medidas (`StageProfiler.events`)
+    """
+    from profiling import StageProfiler
+    
+    profiler = StageProfiler()
+    with plt.rc_context(rc):
+        with profiler.stage('render_figura', figura=filepath.stem):
+            fig = plot_func(df)
+        with profiler.stage('guardar_png', figura=filepath.stem):
+            fig.savefig(filepath, bbox_inches='tight', dpi=300)
+        plt.close(fig)
+    return str(filepath), profiler.events
+
 class TitanicAnalyzer:
-    def __init__(self):
+    def __init__(self, output_dir=None, aggregates_dir=None, use_figure_cache=True, profile=None):
+        """
+        Args:
+            output_dir (str o Path, opcional): Directorio del reporte y de las
+                imágenes; por defecto, output/
+            aggregates_dir (str o Path, opcional): Directorio del estado de los
+                agregados; por defecto, `AGGREGATES_DIR`
+            use_figure_cache (bool): Reutilizar las figuras de la caché
+            profile (str, opcional): 'cprofile' o 'pyinstrument' para perfilar
+                cada ejecución además de medir sus etapas
+        """
+        self.output_dir = Path(output_dir) if output_dir else Path(__file__).parent.parent / 'output'
+        self.aggregates_dir = Path(aggregates_dir) if aggregates_dir else AGGREGATES_DIR
+        self.use_figure_cache = use_figure_cache
+        self.profile = profile
         self.setup_environment()
+        self.profiler = self.utils['StageProfiler'](profile)
         self.results = {}
         
     def setup_environment(self):
@@ -26,7 +151,10 @@ class TitanicAnalyzer:
             
         # Importar módulos necesarios
         from utils import configurar_visualizacion
-        from data_loader import cargar_datos, preparar_datos
+        from data_loader import (ESQUEMA_DTYPES, aplicar_esquema, calcular_estadisticas_por_chunks,
+                                 cargar_datos, cargar_datos_por_chunks, preparar_datos)
+        from aggregates import BANDAS_EDAD, SurvivalCube
+        from profiling import StageProfiler
         from eda import (
             plot_supervivencia_general,
             plot_supervivencia_por_clase,
@@ -39,6 +167,13 @@ class TitanicAnalyzer:
             'configurar_visualizacion': configurar_visualizacion,
             'cargar_datos': cargar_datos,
             'preparar_datos': preparar_datos,
+            'aplicar_esquema': aplicar_esquema,
+            'calcular_estadisticas_por_chunks': calcular_estadisticas_por_chunks,
+            'cargar_datos_por_chunks': cargar_datos_por_chunks,
+            'ESQUEMA_DTYPES': ESQUEMA_DTYPES,
+            'SurvivalCube': SurvivalCube,
+            'BANDAS_EDAD': BANDAS_EDAD,
+            'StageProfiler': StageProfiler,
             'plot_supervivencia_general': plot_supervivencia_general,
             'plot_supervivencia_por_clase': plot_supervivencia_por_clase,
             'plot_piramide_edad_genero': plot_piramide_edad_genero,
@@ -48,33 +183,157 @@ class TitanicAnalyzer:
         plt.style.use('seaborn-v0_8')  # Usar un estilo válido de seaborn
         sns.set_theme(style='darkgrid')  # Configuración adicional de seaborn
         
-    def run_analysis(self):
-        """Ejecuta el análisis completo."""
+    def run_analysis(self, train_path=None):
+        """
+        Ejecuta el análisis completo.
+        
+        Args:
+            train_path (str o Path, opcional): CSV de pasajeros; por defecto,
+                datasets/train.csv
+        """
         print("🚀 Iniciando análisis del Titanic...")
         
-        # Cargar datos
-        self.df = self.utils['cargar_datos']()
-        print("✅ Datos cargados correctamente")
+        if train_path is None:
+            train_path = Path(__file__).parent.parent / 'datasets' / 'train.csv'
+        self.profiler = self.utils['StageProfiler'](self.profile)
+        self.profiler.start_capture()
+        with self.profiler.stage('analisis', modo='completo', datos=str(train_path)):
+            # Estadísticas de preparación y cubo de agregados, recorriendo los
+            # datos por bloques sin cargarlos completos
+            with self.profiler.stage('estadisticas_preparacion'):
+                self.estadisticas = self.utils['calcular_estadisticas_por_chunks'](train_path)
+            with self.profiler.stage('cubo_agregados'):
+                self.cube = self.utils['SurvivalCube'].from_chunks(self._prepared_chunks(train_path))
+            with self.profiler.stage('guardar_agregados'):
+                self.save_aggregates()
+            print("✅ Datos cargados y cubo de agregados construido")
+            
+            self._build_outputs()
+        self._write_trace()
+        
+    def _prepared_chunks(self, train_path, chunksize=100_000):
+        """
+        Lee y prepara el CSV por bloques como `cargar_datos_por_chunks`,
+        midiendo por separado la lectura de cada bloque y su preparación.
+        
+        Args:
+            train_path (str o Path): CSV de pasajeros
+            chunksize (int): Número de filas por bloque
+            
+        Yields:
+            pd.DataFrame: Bloques preparados con las estadísticas del análisis
+        """
+        with pd.read_csv(train_path, dtype=self.utils['ESQUEMA_DTYPES'], chunksize=chunksize) as reader:
+            while True:
+                with self.profiler.stage('lectura_csv'):
+                    chunk = next(reader, None)
+                if chunk is None:
+                    return
+                with self.profiler.stage('preparar_datos', filas=len(chunk)):
+                    chunk = self.utils['aplicar_esquema'](self.utils['preparar_datos'](chunk, self.estadisticas))
+                yield chunk
+        
+    def update_analysis(self, batch_path):
+        """
+        Incorpora un lote nuevo de pasajeros a los agregados guardados y
+        regenera el reporte sin volver a leer los datos anteriores.
+        
+        Args:
+            batch_path (str o Path): CSV con el lote, con las columnas del original
+        """
+        print("🚀 Actualizando análisis del Titanic...")
+        
+        self.profiler = self.utils['StageProfiler'](self.profile)
+        self.profiler.start_capture()
+        with self.profiler.stage('analisis', modo='incremental', datos=str(batch_path)):
+            with self.profiler.stage('cargar_agregados'):
+                self.load_aggregates()
+            with self.profiler.stage('lectura_csv'):
+                batch = pd.read_csv(batch_path, dtype=self.utils['ESQUEMA_DTYPES'])
+            with self.profiler.stage('preparar_datos', filas=len(batch)):
+                batch = self.utils['aplicar_esquema'](self.utils['preparar_datos'](batch, self.estadisticas))
+            with self.profiler.stage('cubo_agregados'):
+                self.cube = self.cube.update(batch)
+            with self.profiler.stage('guardar_agregados'):
+                self.save_aggregates()
+            print(f"✅ Lote de {len(batch)} pasajeros incorporado")
+            
+            self._build_outputs()
+        self._write_trace()
         
+    def _build_outputs(self):
+        """Genera visualizaciones, estadísticas y reporte a partir del cubo."""
         # Generar y guardar visualizaciones
-        self.generate_visualizations()
+        with self.profiler.stage('visualizaciones'):
+            self.generate_visualizations(use_cache=self.use_figure_cache)
         print("✅ Visualizaciones generadas")
         
         # Calcular estadísticas
-        self.calculate_statistics()
+        with self.profiler.stage('estadisticas'):
+            self.calculate_statistics()
         print("✅ Estadísticas calculadas")
         
         # Generar reporte
-        self.generate_report()
+        with self.profiler.stage('reporte'):
+            self.generate_report()
         print("✅ Reporte generado")
         
-    def generate_visualizations(self):
-        """Genera y guarda todas las visualizaciones."""        # Crear directorio para imágenes si no existe
-        base_dir = Path(__file__).parent.parent
-        img_dir = base_dir / 'output' / 'images'
+    def _write_trace(self):
+        """
+        Escribe la traza de etapas de la última ejecución junto al reporte
+        (titanic_analysis_trace.json, en formato de eventos de Chrome) y, si
+        se pidió, el perfil de `profile`.
+        """
+        profile_path = self.profiler.stop_capture(self.output_dir / 'titanic_analysis_profile')
+        metadata = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'pasajeros': int(self.cube.survival()['count'].iloc[0]),
+            'cpus': os.cpu_count(),
+            'perfil': str(profile_path) if profile_path else None
+        }
+        trace_path = self.profiler.write_trace(self.output_dir / 'titanic_analysis_trace.json', metadata)
+        self.results['trace'] = str(trace_path)
+        print(f"⏱️ Traza de etapas en: {trace_path}")
+        if profile_path:
+            print(f"🔬 Perfil de la ejecución en: {profile_path}")
+        
+    def save_aggregates(self):
+        """Guarda el cubo y las estadísticas de preparación en `aggregates_dir`."""
+        self.cube.save(self.aggregates_dir / 'cubo.pkl')
+        estadisticas = {
+            'age_median': float(self.estadisticas['age_median']),
+            'fare_median': float(self.estadisticas['fare_median']),
+            'embarked_mode': str(self.estadisticas['embarked_mode']),
+            'fare_bins': [float(x) for x in self.estadisticas['fare_bins']]
+        }
+        (self.aggregates_dir / 'estadisticas.json').write_text(json.dumps(estadisticas, indent=2), encoding='utf-8')
+        
+    def load_aggregates(self):
+        """Carga el cubo y las estadísticas guardados por `save_aggregates`."""
+        if not (self.aggregates_dir / 'cubo.pkl').exists():
+            raise FileNotFoundError(
+                f"No hay agregados en {self.aggregates_dir}; ejecute primero el análisis completo")
+        self.cube = self.utils['SurvivalCube'].load(self.aggregates_dir / 'cubo.pkl')
+        self.estadisticas = json.loads((self.aggregates_dir / 'estadisticas.json').read_text(encoding='utf-8'))
+        
+    def generate_visualizations(self, n_jobs=None, use_cache=True):
+        """
+        Genera y guarda todas las visualizaciones, una por proceso. Las
+        figuras cuyos datos, código y estilo no cambiaron se copian de la
+        caché en lugar de volver a generarse.
+        
+        Args:
+            n_jobs (int, opcional): Procesos del pool; por defecto, uno por
+                visualización pendiente hasta el número de CPUs. Con 1 se
+                generan en serie en el proceso actual.
+            use_cache (bool): Reutilizar las figuras en caché
+        """
+        # Crear directorio para imágenes si no existe
+        img_dir = self.output_dir / 'images'
         img_dir.mkdir(parents=True, exist_ok=True)
         
-        # Lista de visualizaciones a generar
+        # Lista de visualizaciones a generar; todas se dibujan desde el cubo
+        # de agregados
         visualizations = [
             ('supervivencia_general', self.utils['plot_supervivencia_general']),
             ('supervivencia_clase', self.utils['plot_supervivencia_por_clase']),
@@ -83,30 +342,65 @@ class TitanicAnalyzer:
             ('analisis_tarifas', self.utils['plot_tarifas_supervivencia'])
         ]
         
-        # Generar y guardar cada visualización
+        # Los workers reciben el estilo del proceso principal
+        rc = {key: value for key, value in plt.rcParams.items() if key != 'backend'}
+        
+        # Reutilizar las figuras en caché y dejar pendientes las demás
         self.results['plots'] = {}
-        for name, plot_func in visualizations:
-            fig = plot_func(self.df)
-            filepath = img_dir / f'{name}.png'
-            fig.savefig(filepath, bbox_inches='tight', dpi=300)
-            plt.close(fig)
-            self.results['plots'][name] = str(filepath)
+        pending = []
+        with self.profiler.stage('cache_figuras'):
+            for name, plot_func in visualizations:
+                filepath = img_dir / f'{name}.png'
+                cached = FIGURE_CACHE_DIR / f'{plot_func.__name__}-{_figure_key(plot_func, self.cube, rc)}.png'
+                if use_cache and cached.exists():
+                    shutil.copyfile(cached, filepath)
+                    self.results['plots'][name] = str(filepath)
+                else:
+                    pending.append((name, plot_func, self.cube, filepath, cached))
+        
+        if n_jobs is None:
+            n_jobs = min(len(pending), os.cpu_count() or 1)
+        
+        # Generar y guardar cada visualización pendiente; las etapas medidas
+        # en los workers se incorporan a la traza con su pid
+        if n_jobs <= 1:
+            for name, plot_func, df, filepath, _ in pending:
+                self.results['plots'][name], events = _render_figure(plot_func, df, filepath, rc)
+                self.profiler.extend(events)
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+                futures = {
+                    name: pool.submit(_render_figure, plot_func, df, filepath, rc)
+                    for name, plot_func, df, filepath, _ in pending
+                }
+                for name, future in futures.items():
+                    self.results['plots'][name], events = future.result()
+                    self.profiler.extend(events)
+        
+        # Guardar las nuevas figuras en la caché en lugar de las anteriores
+        # de la misma función
+        for _, _, _, filepath, cached in pending:
+            _store_figure(filepath, cached)
+        
+        # Mantener el orden de las visualizaciones
+        self.results['plots'] = {name: self.results['plots'][name] for name, _ in visualizations}
             
     def calculate_statistics(self):
         """Calcula estadísticas importantes."""
         self.results['stats'] = {
-            'total_passengers': len(self.df),
-            'survival_rate': (self.df['Survived'].mean() * 100),
-            'class_survival': self.df.groupby('Pclass')['Survived'].mean() * 100,
-            'gender_survival': self.df.groupby('Sex')['Survived'].mean() * 100,
-            'avg_age': self.df['Age'].mean(),
-            'avg_fare': self.df['Fare'].mean()
+            'total_passengers': int(self.cube.survival()['count'].iloc[0]),
+            'survival_rate': self.cube.survival()['rate'].iloc[0] * 100,
+            'class_survival': self.cube.survival('Pclass')['rate'] * 100,
+            'gender_survival': self.cube.survival('Sex')['rate'] * 100,
+            'avg_age': self.cube.mean('Age'),
+            'avg_fare': self.cube.mean('Fare'),
+            'std_age': self.cube.std('Age'),
+            'std_fare': self.cube.std('Fare')
         }
         
     def generate_report(self):
         """Genera el reporte en Markdown."""
-        base_dir = Path(__file__).parent.parent
-        report_path = base_dir / 'output' / 'titanic_analysis_report.md'
+        report_path = self.output_dir / 'titanic_analysis_report.md'
         report_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Generar rutas relativas para las imágenes
@@ -114,9 +408,13 @@ class TitanicAnalyzer:
             self.results['plots'][key] = os.path.relpath(path, report_path.parent)
 
         # Calcular estadísticas adicionales
-        edad_por_clase = self.df.groupby('Pclass')['Age'].mean()
-        tarifa_por_clase = self.df.groupby('Pclass')['Fare'].mean()
-        supervivencia_por_edad = self.df.groupby(pd.cut(self.df['Age'], bins=[0, 12, 18, 35, 50, 100]))['Survived'].mean() * 100
+        edad_por_clase = self.cube.mean('Age', 'Pclass')
+        tarifa_por_clase = self.cube.mean('Fare', 'Pclass')
+        # Las cinco bandas en orden aunque alguna no tenga pasajeros, para que
+        # cada línea del reporte lea la suya
+        bandas_edad = pd.IntervalIndex.from_breaks(self.utils['BANDAS_EDAD'])
+        supervivencia_por_edad = self.cube.survival('AgeBand')['rate'].reindex(bandas_edad) * 100
+        tarifa_minima, tarifa_maxima = self.cube.fare_range()
         
         report_content = f"""# 🚢 Análisis Exhaustivo del Desastre del Titanic
 *Análisis detallado generado el {datetime.now().strftime('%d/%m/%Y')}*
@@ -137,8 +435,8 @@ El RMS Titanic, considerado "insumergible", se hundió en su viaje inaugural el
 
 ### Estadísticas Fundamentales
 - **Supervivientes**: {self.results['stats']['survival_rate']:.1f}% del total de pasajeros
-- **Demografía**: Edad promedio de {self.results['stats']['avg_age']:.1f} años
-- **Aspecto Económico**: Tarifa promedio de £{self.results['stats']['avg_fare']:.2f}
+- **Demografía**: Edad promedio de {self.results['stats']['avg_age']:.1f} años (desviación estándar de {self.results['stats']['std_age']:.1f})
+- **Aspecto Económico**: Tarifa promedio de £{self.results['stats']['avg_fare']:.2f} (desviación estándar de £{self.results['stats']['std_fare']:.2f})
 
 ## 🎭 Contexto Histórico
 
@@ -228,8 +526,8 @@ Este gráfico ilustra la dramática realidad del desastre: de los {self.results[
 ![Análisis de Tarifas]({self.results['plots']['analisis_tarifas']})
 
 **Análisis Detallado de Tarifas:**
-- **Rango de Tarifas**: £{self.df['Fare'].min():.2f} - £{self.df['Fare'].max():.2f}
-- **Mediana**: £{self.df['Fare'].median():.2f}
+- **Rango de Tarifas**: £{tarifa_minima:.2f} - £{tarifa_maxima:.2f}
+- **Mediana**: £{self.cube.fare_quantile(0.5):.2f}
 - **Correlación con Supervivencia**: Fuertemente positiva
 
 **Observaciones sobre Tarifas:**
@@ -331,5 +629,17 @@ Este gráfico ilustra la dramática realidad del desastre: de los {self.results[
         print(f"📄 Reporte exhaustivo generado en: {report_path}")
 
 if __name__ == "__main__":
-    analyzer = TitanicAnalyzer()
-    analyzer.run_analysis()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Genera el reporte del análisis del Titanic")
+    # python generate_report.py lote.csv: actualizar con un lote nuevo
+    parser.add_argument('lote', nargs='?', help="CSV con un lote nuevo de pasajeros")
+    parser.add_argument('--perfil', choices=['cprofile', 'pyinstrument'],
+                        help="Perfilar la ejecución además de medir sus etapas")
+    args = parser.parse_args()
+    
+    analyzer = TitanicAnalyzer(profile=args.perfil)
+    if args.lote:
+        analyzer.update_analysis(args.lote)
+    else:
+        analyzer.run_analysis()
@@ -0,0 +1,230 @@
+"""
+Módulo de inferencia para el problema del Titanic.
+
+Este módulo contiene la clase principal para puntuar pasajeros nuevos
+con el mejor modelo entrenado, por lotes de tamaño fijo y escribiendo
+las predicciones de forma incremental.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_loader import ESQUEMA_DTYPES, aplicar_esquema
+from feature_engineering import TitanicFeatureEngineering
+from profiling import peak_rss_window
+
+def _rebatch(chunks: Iterable[pd.DataFrame], batch_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Reagrupa bloques de tamaño arbitrario en lotes de `batch_size` filas
+    (el último puede ser menor).
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Bloques de entrada
+        batch_size (int): Filas por lote
+
+    Yields:
+        pd.DataFrame: Lotes de tamaño fijo
+    """
+    pending = []
+    pending_rows = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_rows += len(chunk)
+        if pending_rows < batch_size:
+            continue
+        buffer = pd.concat(pending, ignore_index=True)
+        n_full = len(buffer) // batch_size * batch_size
+        for start in range(0, n_full, batch_size):
+            yield buffer.iloc[start:start + batch_size]
+        pending = [buffer.iloc[n_full:]]
+        pending_rows = len(pending[0])
+    if pending_rows:
+        yield pd.concat(pending, ignore_index=True)
+
+class TitanicPredictor:
+    """
+    Clase para puntuar pasajeros con un modelo entrenado.
+    Encadena el esquema compacto, el feature engineering, el preprocesador
+    (que imputa los valores faltantes) y el modelo, todos con los parámetros
+    aprendidos en entrenamiento.
+    """
+    
+    def __init__(self, feature_engineering: TitanicFeatureEngineering,
+                 preprocessor: 'TitanicPreprocessor', model, model_name: str = None):
+        """
+        Args:
+            feature_engineering (TitanicFeatureEngineering): Instancia ajustada
+            preprocessor (TitanicPreprocessor): Instancia ajustada, o None si
+                el modelo ya es un Pipeline con su preprocesador
+            model: Estimador entrenado con `predict_proba`
+            model_name (str, opcional): Nombre del modelo
+        """
+        self.feature_engineering = feature_engineering
+        self.preprocessor = preprocessor
+        self.model = model
+        self.model_name = model_name
+    
+    @classmethod
+    def from_results(cls, results: dict, train: pd.DataFrame, model_name: str = None,
+                     preprocessor: 'TitanicPreprocessor' = None) -> 'TitanicPredictor':
+        """
+        Construye un predictor a partir de los resultados de
+        `TitanicModeling.train_and_evaluate`, reajustando las etapas previas
+        sobre el mismo conjunto de entrenamiento crudo.
+
+        Args:
+            results (dict): Resultados de `train_and_evaluate`
+            train (pd.DataFrame): Datos de entrenamiento tal como se leen del CSV
+            model_name (str, opcional): Modelo a usar; por defecto, el de
+                mejor puntuación
+            preprocessor (TitanicPreprocessor, opcional): Preprocesador con el
+                que se entrenó el modelo; se ajusta si aún no lo está. Se omite
+                si los modelos ya son Pipelines con su preprocesador.
+
+        Returns:
+            TitanicPredictor: Predictor listo para `predict`
+        """
+        if model_name is None:
+            model_name = max(results, key=lambda name: results[name]['best_score'])
+        
+        train = aplicar_esquema(train)
+        feature_engineering = TitanicFeatureEngineering().fit(train)
+        if preprocessor is not None and preprocessor.pipeline is None:
+            preprocessor.fit(feature_engineering.transform(train))
+        
+        return cls(feature_engineering, preprocessor, results[model_name]['model'], model_name)
+    
+    def predict_proba_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Calcula la probabilidad de supervivencia de un lote de pasajeros.
+
+        Args:
+            df (pd.DataFrame): Lote con las columnas del CSV original
+
+        Returns:
+            np.ndarray: Probabilidad de supervivencia por pasajero
+        """
+        features = self.feature_engineering.transform(aplicar_esquema(df))
+        if self.preprocessor is not None:
+            features = self.preprocessor.transform(features)
+        return self.model.predict_proba(features)[:, 1]
+    
+    def predict_batches(self, source: Union[str, Path, Iterable[pd.DataFrame]],
+                        batch_size: int = 10_000, threshold: float = 0.5) -> Iterator[pd.DataFrame]:
+        """
+        Puntúa una fuente de pasajeros por lotes de tamaño fijo.
+
+        Args:
+            source: Ruta a un CSV o iterable de DataFrames
+            batch_size (int): Filas por lote
+            threshold (float): Umbral de probabilidad para predecir supervivencia
+
+        Yields:
+            pd.DataFrame: PassengerId, Survived y Probability de cada lote
+        """
+        if isinstance(source, (str, Path)):
+            chunks = pd.read_csv(source, dtype=ESQUEMA_DTYPES, chunksize=batch_size)
+        else:
+            chunks = _rebatch(source, batch_size)
+        
+        for batch in chunks:
+            proba = self.predict_proba_frame(batch)
+            yield pd.DataFrame({
+                'PassengerId': batch['PassengerId'].to_numpy(),
+                'Survived': (proba >= threshold).astype('int8'),
+                'Probability': proba
+            })
+    
+    def predict(self, source: Union[str, Path, Iterable[pd.DataFrame]], output_path,
+                batch_size: int = 10_000, include_probability: bool = False) -> dict:
+        """
+        Puntúa una fuente de pasajeros por lotes y escribe las predicciones
+        en un CSV a medida que se calculan, sin acumularlas en memoria.
+
+        Args:
+            source: Ruta a un CSV o iterable de DataFrames
+            output_path (str o Path): CSV de salida (PassengerId, Survived)
+            batch_size (int): Filas por lote
+            include_probability (bool): Añadir la columna Probability
+
+        Returns:
+            dict: Filas, lotes, segundos, filas por segundo y pico de memoria
+                residente durante la puntuación en MB (NaN si la plataforma
+                no lo permite)
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        rows = batches = 0
+        start = time.perf_counter()
+        with peak_rss_window() as memory, open(output_path, 'w', newline='', encoding='utf-8') as f:
+            for predictions in self.predict_batches(source, batch_size):
+                if not include_probability:
+                    predictions = predictions.drop(columns='Probability')
+                predictions.to_csv(f, header=(batches == 0), index=False)
+                rows += len(predictions)
+                batches += 1
+        seconds = time.perf_counter() - start
+        peak = memory['peak_rss_mb']
+        
+        return {
+            'rows': rows,
+            'batches': batches,
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds > 0 else float('nan'),
+            'peak_memory_mb': float('nan') if peak is None else peak
+        }
+    
+    def save(self, directory) -> None:
+        """
+        Guarda el predictor en un directorio: artefactos de feature
+        engineering y preprocesamiento, y el modelo.
+
+        Args:
+            directory (str o Path): Directorio de destino
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.feature_engineering.save(directory / 'features.json')
+        if self.preprocessor is not None:
+            self.preprocessor.save(directory / 'preprocessor.joblib')
+        joblib.dump({'model_name': self.model_name, 'model': self.model},
+                    directory / 'model.joblib', compress=3)
+    
+    @classmethod
+    def load(cls, directory) -> 'TitanicPredictor':
+        """
+        Carga un predictor guardado con `save`.
+
+        Args:
+            directory (str o Path): Directorio del predictor
+
+        Returns:
+            TitanicPredictor: Predictor listo para `predict`
+        """
+        directory = Path(directory)
+        feature_engineering = TitanicFeatureEngineering.load(directory / 'features.json')
+        preprocessor = None
+        if (directory / 'preprocessor.joblib').exists():
+            # scikit-learn solo se importa si hay un preprocesador que cargar
+            from preprocessor import TitanicPreprocessor
+            preprocessor = TitanicPreprocessor.load(directory / 'preprocessor.joblib')
+        model = joblib.load(directory / 'model.joblib')
+        return cls(feature_engineering, preprocessor, model['model'], model['model_name'])
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).parent.parent
+    
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else base_dir / 'output' / 'models'
+    source = sys.argv[2] if len(sys.argv) > 2 else base_dir / 'datasets' / 'test.csv'
+    output = sys.argv[3] if len(sys.argv) > 3 else base_dir / 'output' / 'predictions.csv'
+    
+    predictor = TitanicPredictor.load(model_dir)
+    metrics = predictor.predict(source, output)
+    print(f"✅ {metrics['rows']} predicciones escritas en {output}")
+    print(f"⏱️ {metrics['rows_per_second']:.0f} filas/s, pico de memoria {metrics['peak_memory_mb']:.0f} MB")
@@ -5,13 +5,229 @@ Este módulo contiene la clase principal para entrenar y evaluar
 múltiples modelos de machine learning.
 """
 
+import copy
+import math
+import itertools
+import tempfile
+from pathlib import Path
+import numpy as np
+import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
-import lightgbm as lgb
-from sklearn.model_selection import GridSearchCV, StratifiedKFold
-import matplotlib.pyplot as plt
-import seaborn as sns
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import Pipeline
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, ParameterGrid, train_test_split
+
+from utils import importar_diferido
+
+# Se importan al crear los modelos o al graficar, no al importar el módulo
+xgb = importar_diferido('xgboost')
+lgb = importar_diferido('lightgbm')
+plt = importar_diferido('matplotlib.pyplot')
+sns = importar_diferido('seaborn')
+
+# Coste relativo aproximado de entrenar cada modelo (por árbol en los
+# ensembles); solo se usa para ordenar las tareas de la búsqueda compartida
+MODEL_COST = {
+    'logistic': 20.0,
+    'random_forest': 1.0,
+    'xgboost': 0.5,
+    'lightgbm': 0.5
+}
+
+# Cada tarea de la búsqueda compartida usa un solo hilo: el paralelismo lo
+# aporta el pool de workers y así no se sobresuscriben los núcleos
+THREAD_CAPS = {
+    'random_forest': {'n_jobs': 1},
+    'xgboost': {'n_jobs': 1},
+    'lightgbm': {'n_jobs': 1}
+}
+
+# Parámetros por defecto del entrenamiento fuera de memoria; `n_estimators`
+# es un máximo que la parada temprana recorta
+OUT_OF_CORE_PARAMS = {
+    'xgboost': {'n_estimators': 200, 'max_depth': 5, 'learning_rate': 0.1},
+    'lightgbm': {'n_estimators': 200, 'max_depth': 5, 'learning_rate': 0.1}
+}
+
+# Incremento por defecto de `update_models`: árboles nuevos del random
+# forest, rondas de boosting adicionales e iteraciones de la logística
+INCREMENTAL_STEPS = {
+    'random_forest': 50,
+    'xgboost': 50,
+    'lightgbm': 50,
+    'logistic': 100
+}
+
+# Filas por lote del iterador de memoria externa de XGBoost
+EXTERNAL_MEMORY_BLOCK_ROWS = 100_000
+
+def _take(data, indices):
+    """
+    Selecciona filas por posición en arrays, matrices dispersas o pandas.
+
+    Args:
+        data: Datos de entrada
+        indices (np.ndarray): Posiciones de las filas
+
+    Returns:
+        Filas seleccionadas, del mismo tipo que la entrada
+    """
+    if hasattr(data, 'iloc'):
+        return data.iloc[indices]
+    return data[indices]
+
+def _memmap(data, path: Path):
+    """
+    Vuelca un array (o matriz dispersa) a disco y lo reabre como memmap de
+    solo lectura, para que los workers lo compartan sin copiarlo.
+
+    Args:
+        data: Array a volcar
+        path (Path): Ruta del archivo
+
+    Returns:
+        El mismo array, respaldado por el archivo en disco
+    """
+    joblib.dump(data, path)
+    return joblib.load(path, mmap_mode='r')
+
+def _fit_estimator(estimator, X, y, early_stopping_rounds=None, random_state=None):
+    """
+    Entrena un estimador. Si se piden rondas de parada temprana y el
+    estimador es XGBoost o LightGBM, se reserva un 10% estratificado de las
+    filas como conjunto de evaluación.
+
+    Args:
+        estimator: Estimador sin entrenar
+        X: Features de entrenamiento
+        y: Variable objetivo
+        early_stopping_rounds (int, opcional): Rondas sin mejora antes de parar
+        random_state (int, opcional): Semilla de la partición de evaluación
+
+    Returns:
+        Estimador entrenado
+    """
+    if early_stopping_rounds is None or not isinstance(estimator, (xgb.XGBClassifier, lgb.LGBMClassifier)):
+        return estimator.fit(X, y)
+    
+    fit_idx, eval_idx = train_test_split(
+        np.arange(len(y)), test_size=0.1, stratify=y, random_state=random_state
+    )
+    X_fit, y_fit = _take(X, fit_idx), _take(y, fit_idx)
+    eval_set = [(_take(X, eval_idx), _take(y, eval_idx))]
+    
+    if isinstance(estimator, xgb.XGBClassifier):
+        estimator.set_params(early_stopping_rounds=early_stopping_rounds)
+        estimator.fit(X_fit, y_fit, eval_set=eval_set, verbose=False)
+        # La predicción sigue usando best_iteration; se quita el parámetro
+        # para que el modelo pueda volver a entrenarse sin eval_set
+        return estimator.set_params(early_stopping_rounds=None)
+    
+    return estimator.fit(X_fit, y_fit, eval_set=eval_set,
+                         callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)])
+
+def _fit_and_score(estimator, fold: dict, n_samples: int = None, early_stopping_rounds=None,
+                   random_state=None) -> float:
+    """
+    Entrena un estimador en un fold y devuelve su accuracy en validación.
+
+    Args:
+        estimator: Estimador sin entrenar
+        fold (dict): Matrices del fold ('X_train', 'y_train', 'X_test', 'y_test')
+        n_samples (int, opcional): Usar solo las primeras filas de entrenamiento
+        early_stopping_rounds (int, opcional): Rondas de parada temprana
+        random_state (int, opcional): Semilla de la partición de evaluación
+
+    Returns:
+        float: Accuracy en las filas de validación
+    """
+    rows = slice(None, n_samples)
+    _fit_estimator(estimator, fold['X_train'][rows], fold['y_train'][rows],
+                   early_stopping_rounds, random_state)
+    return accuracy_score(fold['y_test'], estimator.predict(fold['X_test']))
+
+def _write_feature_store(chunks, feature_engineering, preprocessor, directory: Path,
+                         validation_fraction: float, random_state=None) -> dict:
+    """
+    Transforma bloques preparados en matrices de características float32 y
+    las añade a archivos binarios en disco, separando al azar una fracción
+    de filas para validación. Solo hay un bloque en memoria a la vez.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Bloques preparados con Survived
+        feature_engineering (TitanicFeatureEngineering): Instancia ajustada
+        preprocessor (TitanicPreprocessor): Instancia ajustada
+        directory (Path): Directorio de los archivos
+        validation_fraction (float): Fracción de filas de validación
+        random_state (int, opcional): Semilla de la partición
+
+    Returns:
+        dict: Memmaps de solo lectura 'X_train', 'y_train', 'X_valid' e 'y_valid'
+    """
+    rng = np.random.default_rng(random_state)
+    files = {key: open(directory / f'{key}.bin', 'wb') for key in ['X_train', 'y_train', 'X_valid', 'y_valid']}
+    rows = {'train': 0, 'valid': 0}
+    n_features = None
+    try:
+        for chunk in chunks:
+            X = preprocessor.transform(feature_engineering.transform(chunk))
+            X = np.asarray(X.toarray() if hasattr(X, 'toarray') else X, dtype=np.float32)
+            y = chunk['Survived'].to_numpy(dtype=np.int8)
+            n_features = X.shape[1]
+            valid = rng.random(len(y)) < validation_fraction
+            for part, mask in [('train', ~valid), ('valid', valid)]:
+                X[mask].tofile(files[f'X_{part}'])
+                y[mask].tofile(files[f'y_{part}'])
+                rows[part] += int(mask.sum())
+    finally:
+        for f in files.values():
+            f.close()
+    
+    if not rows['train'] or not rows['valid']:
+        raise ValueError("No hay filas suficientes para entrenar y validar")
+    return {
+        f'{matrix}_{part}': np.memmap(directory / f'{matrix}_{part}.bin', mode='r',
+                                     dtype=np.float32 if matrix == 'X' else np.int8,
+                                     shape=(rows[part], n_features) if matrix == 'X' else (rows[part],))
+        for matrix in ['X', 'y'] for part in ['train', 'valid']
+    }
+
+def _external_memory_matrix(X, y, cache_prefix: str, ref=None):
+    """
+    Construye un DMatrix de memoria externa de XGBoost que lee los memmaps
+    por lotes; las páginas cuantizadas se guardan en disco con el prefijo
+    indicado.
+
+    Args:
+        X (np.memmap): Matriz de características
+        y (np.memmap): Variable objetivo
+        cache_prefix (str): Prefijo de las páginas en disco
+        ref (xgb.DMatrix, opcional): Matriz de entrenamiento cuyos cortes de
+            cuantización se reutilizan (para validación)
+
+    Returns:
+        xgb.ExtMemQuantileDMatrix: Matriz de memoria externa
+    """
+    class MemmapIter(xgb.DataIter):
+        def __init__(self):
+            self.start = 0
+            super().__init__(cache_prefix=cache_prefix)
+        
+        def next(self, input_data):
+            if self.start >= len(y):
+                return False
+            rows = slice(self.start, self.start + EXTERNAL_MEMORY_BLOCK_ROWS)
+            input_data(data=np.asarray(X[rows]), label=np.asarray(y[rows]))
+            self.start += EXTERNAL_MEMORY_BLOCK_ROWS
+            return True
+        
+        def reset(self):
+            self.start = 0
+    
+    return xgb.ExtMemQuantileDMatrix(MemmapIter(), ref=ref)
 
 class TitanicModeling:
     """
@@ -30,7 +246,7 @@ class TitanicModeling:
         self.models = {
             'logistic': LogisticRegression(random_state=random_state),
             'random_forest': RandomForestClassifier(random_state=random_state),
-            'xgboost': XGBClassifier(random_state=random_state),
+            'xgboost': xgb.XGBClassifier(random_state=random_state),
             'lightgbm': lgb.LGBMClassifier(random_state=random_state)
         }
         
@@ -58,7 +274,10 @@ class TitanicModeling:
             }
         }
     
-    def train_and_evaluate(self, X, y, cv: int = 5) -> dict:
+    def train_and_evaluate(self, X, y, cv: int = 5, search: str = 'shared',
+                           n_jobs: int = -1, factor: int = 3,
+                           early_stopping_rounds: int = None,
+                           preprocessor=None, work_dir=None) -> dict:
         """
         Entrena y evalúa múltiples modelos usando validación cruzada y
         búsqueda de hiperparámetros.
@@ -67,6 +286,68 @@ class TitanicModeling:
             X: Features de entrenamiento
             y: Variable objetivo
             cv (int): Número de folds para validación cruzada
+            search (str): Estrategia de búsqueda:
+                - 'shared': todas las tareas (modelo, parámetros, fold) en un
+                  único pool de workers, ordenadas por coste estimado
+                - 'halving': successive halving sobre el número de filas de
+                  entrenamiento, en el mismo pool compartido
+                - 'grid': un GridSearchCV por modelo, uno tras otro
+            n_jobs (int): Número de workers (-1 para todos los núcleos)
+            factor (int): En 'halving', proporción de candidatos descartados
+                y de aumento de filas en cada ronda
+            early_stopping_rounds (int, opcional): Parada temprana nativa de
+                XGBoost y LightGBM (no aplica a 'grid'); `n_estimators` pasa
+                a ser un máximo
+            preprocessor (opcional): Transformador sin ajustar (por ejemplo,
+                `TitanicPreprocessor().create_pipeline()`) que se ajusta
+                dentro de cada fold. En 'shared' y 'halving' se ajusta una
+                sola vez por fold y todas las tareas comparten las matrices
+                transformadas. Los modelos devueltos son entonces Pipelines
+                (preprocesador + modelo).
+            work_dir (str o Path, opcional): Directorio en el que 'shared' y
+                'halving' crean el temporal de los memmaps de los folds, que
+                se borra al terminar; por defecto, el del sistema
+
+        Returns:
+            dict: Resultados de cada modelo con sus mejores parámetros
+        """
+        splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=self.random_state)
+        
+        if search == 'grid':
+            results = self._grid_search(X, y, splitter, n_jobs, preprocessor)
+        elif search in ('shared', 'halving'):
+            with tempfile.TemporaryDirectory(prefix='titanic_folds_', dir=work_dir) as cache_dir:
+                folds = self._prepare_folds(X, y, splitter, preprocessor, Path(cache_dir),
+                                            shuffle_train=(search == 'halving'))
+                if search == 'shared':
+                    best_params, best_scores = self._shared_search(
+                        folds, n_jobs, early_stopping_rounds)
+                else:
+                    best_params, best_scores = self._halving_search(
+                        folds, n_jobs, factor, early_stopping_rounds)
+                results = self._refit_best(best_params, best_scores, X, y, n_jobs,
+                                           early_stopping_rounds, preprocessor, Path(cache_dir))
+        else:
+            raise ValueError(f"Estrategia de búsqueda desconocida: {search}")
+        
+        for name, result in results.items():
+            print(f"\nResultados para {name}:")
+            print(f"Mejor puntuación: {result['best_score']:.4f}")
+            print(f"Mejores parámetros: {result['best_params']}")
+        
+        return results
+    
+    def _grid_search(self, X, y, splitter, n_jobs: int, preprocessor=None) -> dict:
+        """
+        Búsqueda exhaustiva con un GridSearchCV por modelo. Con preprocesador,
+        este se vuelve a ajustar en cada fold de cada candidato.
+
+        Args:
+            X: Features de entrenamiento
+            y: Variable objetivo
+            splitter: Generador de folds de validación cruzada
+            n_jobs (int): Número de workers de cada GridSearchCV
+            preprocessor (opcional): Transformador sin ajustar
 
         Returns:
             dict: Resultados de cada modelo con sus mejores parámetros
@@ -74,13 +355,18 @@ class TitanicModeling:
         results = {}
         
         for name, model in self.models.items():
+            param_grid = self.param_grids[name]
+            if preprocessor is not None:
+                model = Pipeline([('preprocessor', clone(preprocessor)), ('model', model)])
+                param_grid = {f'model__{param}': values for param, values in param_grid.items()}
+            
             # Búsqueda de hiperparámetros
             grid_search = GridSearchCV(
                 model,
-                self.param_grids[name],
-                cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=self.random_state),
+                param_grid,
+                cv=splitter,
                 scoring='accuracy',
-                n_jobs=-1
+                n_jobs=n_jobs
             )
             
             # Ajustar el modelo
@@ -89,16 +375,521 @@ class TitanicModeling:
             # Guardar resultados
             results[name] = {
                 'best_score': grid_search.best_score_,
-                'best_params': grid_search.best_params_,
+                'best_params': {param.replace('model__', '', 1): value
+                                for param, value in grid_search.best_params_.items()},
                 'model': grid_search.best_estimator_
             }
+        
+        return results
+    
+    def _prepare_folds(self, X, y, splitter, preprocessor, cache_dir: Path,
+                       shuffle_train: bool = False) -> list:
+        """
+        Construye las matrices de entrenamiento y validación de cada fold,
+        ajustando el preprocesador una sola vez por fold, y las vuelca a
+        disco como memmaps para que todos los candidatos y modelos las
+        compartan sin copias por worker.
+
+        Args:
+            X: Features de entrenamiento
+            y: Variable objetivo
+            splitter: Generador de folds de validación cruzada
+            preprocessor: Transformador sin ajustar, o None
+            cache_dir (Path): Directorio de los memmaps
+            shuffle_train (bool): Barajar las filas de entrenamiento de cada
+                fold (para que los prefijos de 'halving' sean aleatorios)
+
+        Returns:
+            list: Un diccionario de matrices por fold
+        """
+        y = np.asarray(y)
+        rng = np.random.RandomState(self.random_state)
+        folds = []
+        
+        for f, (train_idx, test_idx) in enumerate(splitter.split(X, y)):
+            if shuffle_train:
+                train_idx = rng.permutation(train_idx)
+            X_train, X_test = _take(X, train_idx), _take(X, test_idx)
+            if preprocessor is not None:
+                fitted = clone(preprocessor).fit(X_train, y[train_idx])
+                X_train, X_test = fitted.transform(X_train), fitted.transform(X_test)
             
-            print(f"\nResultados para {name}:")
-            print(f"Mejor puntuación: {grid_search.best_score_:.4f}")
-            print(f"Mejores parámetros: {grid_search.best_params_}")
+            folds.append({
+                'X_train': _memmap(X_train, cache_dir / f'fold{f}_X_train.joblib'),
+                'y_train': _memmap(y[train_idx], cache_dir / f'fold{f}_y_train.joblib'),
+                'X_test': _memmap(X_test, cache_dir / f'fold{f}_X_test.joblib'),
+                'y_test': _memmap(y[test_idx], cache_dir / f'fold{f}_y_test.joblib')
+            })
+        
+        return folds
+    
+    def _task_estimator(self, name: str, params: dict):
+        """
+        Crea una copia sin entrenar del modelo con los parámetros indicados
+        y limitada a un hilo.
+
+        Args:
+            name (str): Nombre del modelo
+            params (dict): Hiperparámetros del candidato
+
+        Returns:
+            Estimador sin entrenar
+        """
+        return clone(self.models[name]).set_params(**params, **THREAD_CAPS.get(name, {}))
+    
+    def _run_tasks(self, tasks: list, folds: list, n_jobs: int,
+                   early_stopping_rounds: int = None) -> list:
+        """
+        Ejecuta tareas de validación en un único pool de workers. Las tareas
+        se envían de mayor a menor coste estimado para equilibrar la carga.
+
+        Args:
+            tasks (list): Tuplas (modelo, parámetros, fold, filas de
+                entrenamiento a usar o None para todas)
+            folds (list): Matrices de cada fold
+            n_jobs (int): Número de workers del pool
+            early_stopping_rounds (int, opcional): Rondas de parada temprana
+
+        Returns:
+            list: Accuracy de cada tarea, en el orden de entrada
+        """
+        def cost(t):
+            name, params, f, n_samples = tasks[t]
+            rows = n_samples or len(folds[f]['y_train'])
+            return MODEL_COST[name] * params.get('n_estimators', 1) * rows
+        
+        order = sorted(range(len(tasks)), key=cost, reverse=True)
+        scores = Parallel(n_jobs=n_jobs, batch_size=1)(
+            delayed(_fit_and_score)(
+                self._task_estimator(tasks[t][0], tasks[t][1]), folds[tasks[t][2]], tasks[t][3],
+                early_stopping_rounds, self.random_state
+            )
+            for t in order
+        )
+        
+        ordered = [None] * len(tasks)
+        for t, score in zip(order, scores):
+            ordered[t] = score
+        return ordered
+    
+    def _refit_best(self, best_params: dict, best_scores: dict, X, y, n_jobs: int,
+                    early_stopping_rounds: int = None, preprocessor=None,
+                    cache_dir: Path = None) -> dict:
+        """
+        Reentrena en paralelo el mejor candidato de cada modelo con todos
+        los datos y restaura sus hilos originales para la inferencia.
+
+        Args:
+            best_params (dict): Mejores parámetros por modelo
+            best_scores (dict): Mejor accuracy media por modelo
+            X: Features de entrenamiento
+            y: Variable objetivo
+            n_jobs (int): Número de workers del pool
+            early_stopping_rounds (int, opcional): Rondas de parada temprana
+            preprocessor (opcional): Transformador sin ajustar
+            cache_dir (Path, opcional): Directorio de los memmaps
+
+        Returns:
+            dict: Resultados de cada modelo con sus mejores parámetros
+        """
+        y = np.asarray(y)
+        if preprocessor is not None:
+            preprocessor = clone(preprocessor).fit(X, y)
+            X = preprocessor.transform(X)
+        if cache_dir is not None:
+            X = _memmap(X, cache_dir / 'full_X.joblib')
+        
+        models = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_estimator)(
+                self._task_estimator(name, params), X, y, early_stopping_rounds, self.random_state
+            )
+            for name, params in best_params.items()
+        )
+        
+        results = {}
+        for name, model in zip(best_params, models):
+            model.set_params(**{
+                param: self.models[name].get_params()[param]
+                for param in THREAD_CAPS.get(name, {})
+            })
+            if preprocessor is not None:
+                model = Pipeline([('preprocessor', preprocessor), ('model', model)])
+            results[name] = {
+                'best_score': best_scores[name],
+                'best_params': best_params[name],
+                'model': model
+            }
+        
+        return results
+    
+    def _score_candidates(self, candidates: dict, folds: list, n_jobs: int,
+                          early_stopping_rounds: int = None, n_samples: int = None) -> dict:
+        """
+        Evalúa en todos los folds los candidatos de varios modelos, con todas
+        las tareas en el pool compartido.
+
+        Args:
+            candidates (dict): Lista de parámetros candidatos por modelo
+            folds (list): Matrices de cada fold
+            n_jobs (int): Número de workers del pool
+            early_stopping_rounds (int, opcional): Rondas de parada temprana
+            n_samples (int, opcional): Filas de entrenamiento por tarea
+
+        Returns:
+            dict: Accuracy media de cada candidato, por modelo
+        """
+        keys = [
+            (name, i, f)
+            for name, grid in candidates.items()
+            for i in range(len(grid))
+            for f in range(len(folds))
+        ]
+        scores = self._run_tasks(
+            [(name, candidates[name][i], f, n_samples) for name, i, f in keys],
+            folds, n_jobs, early_stopping_rounds
+        )
+        
+        fold_scores = {name: np.zeros((len(grid), len(folds))) for name, grid in candidates.items()}
+        for (name, i, f), score in zip(keys, scores):
+            fold_scores[name][i, f] = score
+        
+        return {name: fold_scores[name].mean(axis=1) for name in candidates}
+    
+    def _shared_search(self, folds: list, n_jobs: int, early_stopping_rounds: int = None) -> tuple:
+        """
+        Búsqueda exhaustiva que aplana todas las tareas (modelo, parámetros,
+        fold) de todos los modelos en un único pool de workers, con un hilo
+        por tarea. Sin parada temprana, los resultados coinciden con
+        `_grid_search`.
+
+        Args:
+            folds (list): Matrices de cada fold
+            n_jobs (int): Número de workers del pool
+            early_stopping_rounds (int, opcional): Rondas de parada temprana
+
+        Returns:
+            tuple: (mejores parámetros, mejor accuracy media) por modelo
+        """
+        candidates = {name: list(ParameterGrid(self.param_grids[name])) for name in self.models}
+        mean_scores = self._score_candidates(candidates, folds, n_jobs, early_stopping_rounds)
+        
+        # Igual que GridSearchCV: media por candidato y, ante empates, el primero
+        best = {name: int(np.argmax(mean_scores[name])) for name in candidates}
+        return ({name: candidates[name][best[name]] for name in candidates},
+                {name: mean_scores[name][best[name]] for name in candidates})
+    
+    def _halving_search(self, folds: list, n_jobs: int, factor: int = 3,
+                        early_stopping_rounds: int = None, min_resources: int = 50) -> tuple:
+        """
+        Búsqueda por successive halving: en cada ronda se evalúan los
+        candidatos supervivientes con `factor` veces más filas de
+        entrenamiento y solo pasa a la siguiente el mejor 1/`factor` de cada
+        modelo. La última ronda usa los folds completos. Las rondas de todos
+        los modelos se alinean para terminar a la vez y cada ronda se
+        ejecuta en el pool compartido.
+
+        Args:
+            folds (list): Matrices de cada fold, con filas de entrenamiento
+                barajadas
+            n_jobs (int): Número de workers del pool
+            factor (int): Proporción de descarte y de aumento de filas
+            early_stopping_rounds (int, opcional): Rondas de parada temprana
+            min_resources (int): Mínimo de filas de entrenamiento por tarea
+
+        Returns:
+            tuple: (mejores parámetros, mejor accuracy media) por modelo
+        """
+        max_resources = min(len(fold['y_train']) for fold in folds)
+        max_rounds = 1 + max(0, int(math.log(max_resources / min_resources, factor)))
+        
+        survivors = {name: list(ParameterGrid(self.param_grids[name])) for name in self.models}
+        rounds = {
+            name: min(max_rounds, 1 + math.ceil(math.log(len(grid), factor)))
+            for name, grid in survivors.items()
+        }
+        n_rounds = max(rounds.values())
+        
+        for r in range(n_rounds):
+            n_samples = max(min_resources, max_resources // factor ** (n_rounds - 1 - r))
+            active = {name: grid for name, grid in survivors.items() if r >= n_rounds - rounds[name]}
+            mean_scores = self._score_candidates(active, folds, n_jobs, early_stopping_rounds,
+                                                 n_samples)
+            if r == n_rounds - 1:
+                break
+            
+            for name in active:
+                keep = math.ceil(len(survivors[name]) / factor)
+                ranking = np.argsort(-mean_scores[name], kind='stable')[:keep]
+                survivors[name] = [survivors[name][i] for i in sorted(ranking)]
+        
+        best = {name: int(np.argmax(mean_scores[name])) for name in survivors}
+        return ({name: survivors[name][best[name]] for name in survivors},
+                {name: mean_scores[name][best[name]] for name in survivors})
+    
+    def update_models(self, results: dict, X, y, steps: dict = None, X_eval=None,
+                      y_eval=None) -> dict:
+        """
+        Actualiza los modelos de una ejecución anterior con datos nuevos sin
+        repetir la búsqueda de hiperparámetros, partiendo de sus mejores
+        parámetros y de su estado entrenado:
+            - random_forest: `warm_start` con árboles adicionales entrenados
+              sobre X
+            - xgboost y lightgbm: rondas de boosting adicionales que continúan
+              el modelo (recortado antes a su mejor iteración si tuvo parada
+              temprana)
+            - logistic: `warm_start` desde los coeficientes anteriores. El
+              solver liblinear no admite arranque en caliente, así que la
+              actualización usa 'saga' con la misma penalización y C.
+        Si los modelos son Pipelines, el preprocesador ajustado se reutiliza
+        tal cual. Los resultados anteriores no se modifican.
+
+        Args:
+            results (dict): Resultados de `train_and_evaluate` (o de un
+                `update_models` previo), por ejemplo de `load_results`
+            X: Features con las que continuar el entrenamiento (el lote nuevo
+                o una ventana reciente que lo incluya)
+            y: Variable objetivo
+            steps (dict, opcional): Incremento por modelo que sustituye a
+                `INCREMENTAL_STEPS`
+            X_eval (opcional): Features de evaluación de los modelos actualizados
+            y_eval (opcional): Variable objetivo de evaluación
+
+        Returns:
+            dict: Resultados con los modelos actualizados, sus parámetros
+                (`n_estimators` y `max_iter` incluyen el incremento) y, si hay
+                datos de evaluación, su accuracy en 'eval_score'
+        """
+        steps = {**INCREMENTAL_STEPS, **(steps or {})}
+        y = np.asarray(y)
+        updated = {}
+        
+        for name, result in results.items():
+            model = copy.deepcopy(result['model'])
+            estimator = model.steps[-1][1] if isinstance(model, Pipeline) else model
+            X_fit = model[:-1].transform(X) if isinstance(model, Pipeline) else X
+            params = dict(result['best_params'])
+            
+            if name == 'random_forest':
+                params['n_estimators'] = estimator.n_estimators + steps[name]
+                estimator.set_params(warm_start=True, n_estimators=params['n_estimators'])
+                estimator.fit(X_fit, y)
+                estimator.set_params(warm_start=False)
+            elif name == 'xgboost':
+                booster = estimator.get_booster()
+                if 'best_iteration' in booster.attributes():
+                    booster = booster[:estimator.best_iteration + 1]
+                params['n_estimators'] = booster.num_boosted_rounds() + steps[name]
+                estimator.set_params(n_estimators=steps[name])
+                estimator.fit(X_fit, y, xgb_model=booster, verbose=False)
+                estimator.set_params(n_estimators=params['n_estimators'])
+            elif name == 'lightgbm':
+                booster = estimator.booster_
+                if estimator.best_iteration_:
+                    booster = lgb.Booster(model_str=booster.model_to_string(
+                        num_iteration=estimator.best_iteration_))
+                params['n_estimators'] = booster.current_iteration() + steps[name]
+                estimator.set_params(n_estimators=steps[name])
+                estimator.fit(X_fit, y, init_model=booster)
+                estimator.set_params(n_estimators=params['n_estimators'])
+            elif name == 'logistic':
+                params.update(solver='saga', max_iter=steps[name])
+                estimator.set_params(warm_start=True, solver='saga', max_iter=steps[name])
+                estimator.fit(X_fit, y)
+                estimator.set_params(warm_start=False)
+            else:
+                raise ValueError(f"Modelo sin actualización incremental: {name}")
+            
+            updated[name] = {**result, 'best_params': params, 'model': model}
+            if X_eval is not None:
+                updated[name]['eval_score'] = accuracy_score(y_eval, model.predict(X_eval))
+        
+        return updated
+    
+    @staticmethod
+    def save_results(results: dict, path) -> None:
+        """
+        Guarda los resultados de un entrenamiento (modelos incluidos) para
+        actualizarlos después con `update_models`.
+
+        Args:
+            results (dict): Resultados de `train_and_evaluate` o `update_models`
+            path (str o Path): Archivo de destino
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(results, path)
+    
+    @staticmethod
+    def load_results(path) -> dict:
+        """
+        Carga los resultados guardados con `save_results`.
+
+        Args:
+            path (str o Path): Archivo de resultados
+
+        Returns:
+            dict: Resultados con sus modelos entrenados
+        """
+        return joblib.load(path)
+    
+    def train_out_of_core(self, chunks, models: tuple = ('xgboost', 'lightgbm'), params: dict = None,
+                          early_stopping_rounds: int = 20, validation_fraction: float = 0.1,
+                          n_jobs: int = -1, work_dir=None, feature_engineering=None,
+                          preprocessor=None) -> dict:
+        """
+        Entrena XGBoost y LightGBM sobre datos que no caben en memoria, sin
+        búsqueda de hiperparámetros. Los bloques crudos del CSV (por ejemplo,
+        de `pd.read_csv(..., dtype=ESQUEMA_DTYPES, chunksize=...)`) pasan uno
+        a uno por el feature engineering y el preprocesador, que imputa los
+        faltantes, y sus matrices se vuelcan a disco en float32; después:
+            - XGBoost entrena con un `ExtMemQuantileDMatrix` que lee esos
+              archivos por lotes y guarda en disco sus páginas cuantizadas;
+              la memoria queda acotada. Requiere xgboost >= 3.0 (opcional:
+              sin él se lanza ImportError).
+            - LightGBM recibe los archivos como memmaps, pero no tiene
+              entrenamiento fuera de memoria: construye en RAM su Dataset
+              discretizado (un byte por valor con hasta 255 bins), así que
+              su memoria crece con las filas, aunque unas 4 veces menos
+              que la matriz float32.
+        Una fracción aleatoria de las filas se reserva para la parada
+        temprana y la puntuación.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Bloques crudos con Survived
+            models (tuple): Modelos a entrenar ('xgboost' y/o 'lightgbm')
+            params (dict, opcional): Parámetros por modelo que sustituyen a
+                `OUT_OF_CORE_PARAMS`
+            early_stopping_rounds (int): Rondas sin mejora antes de parar
+            validation_fraction (float): Fracción de filas de validación
+            n_jobs (int): Hilos de cada modelo (-1 para todos los núcleos)
+            work_dir (str o Path, opcional): Directorio de los archivos
+                intermedios, que se conservan; por defecto, uno temporal
+            feature_engineering (TitanicFeatureEngineering, opcional):
+                Instancia ajustada; por defecto, se ajusta con el primer bloque
+            preprocessor (TitanicPreprocessor, opcional): Instancia, ajustada o
+                no; por defecto, una con imputación 'group_median' (O(n)). Si
+                no está ajustada, se ajusta con el primer bloque.
+
+        Returns:
+            dict: Resultados de cada modelo con la accuracy en validación,
+                los parámetros usados (con `n_estimators` tras la parada
+                temprana), el modelo y las etapas ajustadas
+                ('feature_engineering' y 'preprocessor') para `TitanicPredictor`
+        """
+        from feature_engineering import TitanicFeatureEngineering
+        from preprocessor import TitanicPreprocessor
+        
+        unknown = set(models) - set(OUT_OF_CORE_PARAMS)
+        if unknown:
+            raise ValueError(f"Modelos sin entrenamiento fuera de memoria: {sorted(unknown)}")
+        if 'xgboost' in models and not hasattr(xgb, 'ExtMemQuantileDMatrix'):
+            raise ImportError(
+                "El entrenamiento fuera de memoria de XGBoost necesita xgboost>=3.0 "
+                f"(ExtMemQuantileDMatrix); la versión instalada es {xgb.__version__}"
+            )
+        
+        # Ajustar las etapas previas con el primer bloque si hace falta
+        chunks = iter(chunks)
+        first = next(chunks)
+        if feature_engineering is None:
+            feature_engineering = TitanicFeatureEngineering().fit(first)
+        if preprocessor is None:
+            preprocessor = TitanicPreprocessor(imputer='group_median')
+        if preprocessor.pipeline is None:
+            preprocessor.fit(feature_engineering.transform(first))
+        
+        with tempfile.TemporaryDirectory(prefix='titanic_ooc_') as tmp:
+            directory = Path(work_dir) if work_dir is not None else Path(tmp)
+            directory.mkdir(parents=True, exist_ok=True)
+            store = _write_feature_store(itertools.chain([first], chunks), feature_engineering,
+                                         preprocessor, directory, validation_fraction,
+                                         self.random_state)
+            del first
+            
+            results = {}
+            for name in models:
+                model_params = {**OUT_OF_CORE_PARAMS[name], **(params or {}).get(name, {})}
+                if name == 'xgboost':
+                    model, n_rounds, error = self._train_xgboost_external(
+                        store, model_params, early_stopping_rounds, n_jobs, directory)
+                else:
+                    model, n_rounds, error = self._train_lightgbm_memmap(
+                        store, model_params, early_stopping_rounds, n_jobs)
+                results[name] = {
+                    'best_score': 1 - error,
+                    'best_params': {**model_params, 'n_estimators': n_rounds},
+                    'model': model,
+                    'feature_engineering': feature_engineering,
+                    'preprocessor': preprocessor
+                }
+            del store
+        
+        for name, result in results.items():
+            print(f"\nResultados para {name} (fuera de memoria):")
+            print(f"Accuracy en validación: {result['best_score']:.4f}")
+            print(f"Parámetros: {result['best_params']}")
         
         return results
     
+    def _train_xgboost_external(self, store: dict, params: dict, early_stopping_rounds: int,
+                                n_jobs: int, directory: Path) -> tuple:
+        """
+        Entrena XGBoost con matrices de memoria externa.
+
+        Args:
+            store (dict): Memmaps de `_write_feature_store`
+            params (dict): Parámetros del modelo, con `n_estimators` máximo
+            early_stopping_rounds (int): Rondas sin mejora antes de parar
+            n_jobs (int): Hilos (-1 para todos los núcleos)
+            directory (Path): Directorio de las páginas de memoria externa
+
+        Returns:
+            tuple: (XGBClassifier entrenado, árboles usados, error en validación)
+        """
+        dtrain = _external_memory_matrix(store['X_train'], store['y_train'], str(directory / 'xgb_train'))
+        dvalid = _external_memory_matrix(store['X_valid'], store['y_valid'], str(directory / 'xgb_valid'),
+                                         ref=dtrain)
+        train_params = {key: value for key, value in params.items() if key != 'n_estimators'}
+        train_params.update({
+            'objective': 'binary:logistic',
+            # La parada temprana usa la última métrica: el error de clasificación
+            'eval_metric': ['logloss', 'error'],
+            'tree_method': 'hist',
+            'seed': self.random_state,
+            'nthread': n_jobs if n_jobs > 0 else 0
+        })
+        booster = xgb.train(train_params, dtrain, num_boost_round=params['n_estimators'],
+                            evals=[(dvalid, 'valid')], early_stopping_rounds=early_stopping_rounds,
+                            verbose_eval=False)
+        
+        # El clasificador de sklearn predice con best_iteration, como en `_fit_estimator`
+        model = xgb.XGBClassifier(random_state=self.random_state, n_jobs=n_jobs)
+        model.load_model(bytearray(booster.save_raw('ubj')))
+        return model, booster.best_iteration + 1, float(booster.best_score)
+    
+    def _train_lightgbm_memmap(self, store: dict, params: dict, early_stopping_rounds: int,
+                               n_jobs: int) -> tuple:
+        """
+        Entrena LightGBM con las matrices de los memmaps float32. No es un
+        entrenamiento fuera de memoria: el Dataset discretizado (de
+        entrenamiento y de validación) se construye y se mantiene completo
+        en RAM, y crece con el número de filas.
+
+        Args:
+            store (dict): Memmaps de `_write_feature_store`
+            params (dict): Parámetros del modelo, con `n_estimators` máximo
+            early_stopping_rounds (int): Rondas sin mejora antes de parar
+            n_jobs (int): Hilos (-1 para todos los núcleos)
+
+        Returns:
+            tuple: (LGBMClassifier entrenado, árboles usados, error en validación)
+        """
+        model = lgb.LGBMClassifier(random_state=self.random_state, n_jobs=n_jobs,
+                                   metric='binary_error', verbose=-1, **params)
+        model.fit(store['X_train'], store['y_train'],
+                  eval_set=[(store['X_valid'], store['y_valid'])],
+                  callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)])
+        return model, model.best_iteration_ or model.n_estimators, model.best_score_['valid_0']['binary_error']
+    
     @staticmethod
     def plot_model_comparison(results: dict) -> None:
         """
@@ -5,48 +5,464 @@ Este módulo contiene la clase principal para realizar el
 preprocesamiento de datos antes del modelado.
 """
 
+import json
+import hashlib
+import inspect
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.neighbors import KDTree, BallTree
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.impute import KNNImputer, SimpleImputer
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
+# Versión del formato del artefacto serializado
+ARTIFACT_VERSION = 2
+
+# scikit-learn >= 1.2 renombró `sparse` a `sparse_output`
+_SPARSE_PARAM = ('sparse_output' if 'sparse_output' in inspect.signature(OneHotEncoder).parameters
+                 else 'sparse')
+
+IMPUTERS = ['knn', 'kd_tree', 'ball_tree', 'approximate', 'group_median']
+
+class TreeKNNImputer(BaseEstimator, TransformerMixin):
+    """
+    Imputador por vecinos más cercanos con búsqueda en árbol (KD-tree o
+    ball-tree) en lugar de distancias por fuerza bruta.
+
+    Para cada patrón de valores faltantes se construye un árbol sobre las
+    columnas observadas de las filas de entrenamiento completas, y cada
+    valor faltante se imputa con la media de sus `n_neighbors` vecinos. Si
+    los donantes no tienen faltantes, los vecinos son los mismos que los de
+    `KNNImputer` salvo empates en la distancia. Con `max_donors` se usa una
+    muestra aleatoria de donantes: una búsqueda aproximada de coste acotado.
+    """
+    
+    def __init__(self, n_neighbors: int = 5, algorithm: str = 'kd_tree',
+                 max_donors: int = None, random_state: int = 42):
+        """
+        Args:
+            n_neighbors (int): Número de vecinos a promediar
+            algorithm (str): 'kd_tree' o 'ball_tree'
+            max_donors (int, opcional): Máximo de filas donantes (aproximado)
+            random_state (int): Semilla del muestreo de donantes
+        """
+        self.n_neighbors = n_neighbors
+        self.algorithm = algorithm
+        self.max_donors = max_donors
+        self.random_state = random_state
+    
+    def fit(self, X, y=None):
+        """
+        Guarda las filas completas de entrenamiento como donantes.
+
+        Args:
+            X: Matriz numérica con posibles NaN
+
+        Returns:
+            TreeKNNImputer: La propia instancia ajustada
+        """
+        X = np.asarray(X, dtype=float)
+        donors = X[~np.isnan(X).any(axis=1)]
+        if self.max_donors is not None and len(donors) > self.max_donors:
+            rng = np.random.RandomState(self.random_state)
+            donors = donors[rng.choice(len(donors), self.max_donors, replace=False)]
+        self.donors_ = donors
+        self.means_ = np.nanmean(X, axis=0)
+        self.trees_ = {}
+        return self
+    
+    def _tree(self, observed: tuple):
+        """
+        Devuelve (y construye la primera vez) el árbol sobre las columnas
+        observadas de un patrón de faltantes.
+
+        Args:
+            observed (tuple): Índices de las columnas observadas
+
+        Returns:
+            KDTree o BallTree sobre los donantes
+        """
+        if observed not in self.trees_:
+            tree_class = KDTree if self.algorithm == 'kd_tree' else BallTree
+            self.trees_[observed] = tree_class(self.donors_[:, list(observed)])
+        return self.trees_[observed]
+    
+    def transform(self, X):
+        """
+        Imputa los valores faltantes con la media de los vecinos donantes.
+
+        Args:
+            X: Matriz numérica con posibles NaN
+
+        Returns:
+            np.ndarray: Matriz sin valores faltantes
+        """
+        X = np.array(X, dtype=float)
+        missing = np.isnan(X)
+        rows = np.flatnonzero(missing.any(axis=1))
+        if len(rows) == 0:
+            return X
+        
+        patterns, inverse = np.unique(missing[rows], axis=0, return_inverse=True)
+        for p, pattern in enumerate(patterns):
+            pattern_rows = rows[inverse.ravel() == p]
+            missing_cols = np.flatnonzero(pattern)
+            observed = tuple(np.flatnonzero(~pattern))
+            if not observed:
+                X[np.ix_(pattern_rows, missing_cols)] = self.means_[missing_cols]
+                continue
+            k = min(self.n_neighbors, len(self.donors_))
+            _, neighbors = self._tree(observed).query(X[np.ix_(pattern_rows, observed)], k=k)
+            X[np.ix_(pattern_rows, missing_cols)] = self.donors_[:, missing_cols][neighbors].mean(axis=1)
+        return X
+
+class GroupMedianImputer(BaseEstimator, TransformerMixin):
+    """
+    Imputador por mediana de grupo: cada valor faltante se reemplaza por la
+    mediana de su grupo (por defecto Title y Pclass), con respaldo en la
+    mediana del primer nivel de agrupación y luego en la mediana global.
+    Coste O(n), independiente de la distancia entre filas.
+    """
+    
+    def __init__(self, columns: list = None, group_cols: list = None):
+        """
+        Args:
+            columns (list): Columnas numéricas a imputar y devolver
+            group_cols (list): Columnas de agrupación, de más general a más fina
+        """
+        self.columns = columns
+        self.group_cols = group_cols
+    
+    def fit(self, X: pd.DataFrame, y=None):
+        """
+        Calcula las medianas por grupo, por primer nivel y globales.
+
+        Args:
+            X (pd.DataFrame): DataFrame con las columnas y los grupos
+
+        Returns:
+            GroupMedianImputer: La propia instancia ajustada
+        """
+        values = X[self.columns].astype(float)
+        groups = [X[col].astype(str) for col in self.group_cols]
+        self.group_medians_ = values.groupby(groups).median()
+        self.first_level_medians_ = values.groupby(groups[0]).median()
+        self.global_medians_ = values.median()
+        return self
+    
+    def transform(self, X: pd.DataFrame):
+        """
+        Imputa los valores faltantes con la mediana de su grupo.
+
+        Args:
+            X (pd.DataFrame): DataFrame con las columnas y los grupos
+
+        Returns:
+            np.ndarray: Matriz de las columnas sin valores faltantes
+        """
+        values = X[self.columns].astype(float).reset_index(drop=True)
+        keys = pd.MultiIndex.from_arrays([X[col].astype(str).to_numpy() for col in self.group_cols])
+        first_level = X[self.group_cols[0]].astype(str).to_numpy()
+        
+        for col in self.columns:
+            missing = values[col].isna().to_numpy()
+            if not missing.any():
+                continue
+            fill = self.group_medians_[col].reindex(keys[missing]).to_numpy()
+            fallback = self.first_level_medians_[col].reindex(first_level[missing]).to_numpy()
+            fill = np.where(np.isnan(fill), fallback, fill)
+            fill = np.where(np.isnan(fill), self.global_medians_[col], fill)
+            values.loc[missing, col] = fill
+        return values.to_numpy()
+
 class TitanicPreprocessor:
     """
     Clase para preprocesar los datos del Titanic.
     Implementa un pipeline completo de preprocesamiento.
     """
     
-    def __init__(self):
+    def __init__(self, imputer: str = 'knn', n_neighbors: int = 5, max_donors: int = 50_000,
+                 sparse: bool = False):
         """
         Inicializa las listas de características numéricas y categóricas
+
+        Args:
+            imputer (str): Imputación de las variables numéricas:
+                - 'knn': KNNImputer con distancias por fuerza bruta, O(n²)
+                - 'kd_tree' / 'ball_tree': vecinos exactos con búsqueda en árbol
+                - 'approximate': vecinos en árbol sobre una muestra de
+                  `max_donors` donantes
+                - 'group_median': mediana por Title y Pclass, O(n)
+            n_neighbors (int): Vecinos a promediar en las opciones por vecinos
+            max_donors (int): Donantes máximos de la opción 'approximate'
+            sparse (bool): Devolver una matriz dispersa CSR en lugar de densa;
+                el one-hot no se densifica en ningún paso
         """
+        if imputer not in IMPUTERS:
+            raise ValueError(f"Imputador desconocido: {imputer}. Opciones: {IMPUTERS}")
         self.numerical_features = ['Age', 'Fare', 'FamilySize']
         self.categorical_features = ['Sex', 'Embarked', 'Title', 'CabinDeck', 'AgeBin', 'FareBin']
-        
+        self.group_features = ['Title', 'Pclass']
+        self.imputer = imputer
+        self.n_neighbors = n_neighbors
+        self.max_donors = max_donors
+        self.sparse = sparse
+        self.pipeline = None
+    
+    def create_imputer(self):
+        """
+        Crea el imputador de variables numéricas configurado.
+
+        Returns:
+            Transformador de imputación sin ajustar
+        """
+        if self.imputer == 'knn':
+            return KNNImputer(n_neighbors=self.n_neighbors)
+        if self.imputer == 'group_median':
+            return GroupMedianImputer(columns=self.numerical_features, group_cols=self.group_features)
+        if self.imputer == 'approximate':
+            return TreeKNNImputer(n_neighbors=self.n_neighbors, max_donors=self.max_donors)
+        return TreeKNNImputer(n_neighbors=self.n_neighbors, algorithm=self.imputer)
+    
     def create_pipeline(self) -> ColumnTransformer:
         """
         Crea un pipeline de preprocesamiento que combina:
         - Imputación de valores faltantes
         - Escalado de variables numéricas
-        - Codificación one-hot de variables categóricas
+        - Codificación one-hot de variables categóricas (densa o dispersa)
 
         Returns:
             ColumnTransformer: Pipeline completo de preprocesamiento
         """
         numerical_pipeline = Pipeline([
-            ('imputer', KNNImputer(n_neighbors=5)),
+            ('imputer', self.create_imputer()),
             ('scaler', StandardScaler())
         ])
         
+        # La mediana por grupo necesita también las columnas de agrupación
+        numerical_columns = self.numerical_features
+        if self.imputer == 'group_median':
+            numerical_columns = self.numerical_features + self.group_features
+        
         categorical_pipeline = Pipeline([
             ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-            ('onehot', OneHotEncoder(drop='first', sparse=False, handle_unknown='ignore'))
+            ('onehot', OneHotEncoder(drop='first', handle_unknown='ignore', **{_SPARSE_PARAM: self.sparse}))
         ])
         
         preprocessor = ColumnTransformer(
             transformers=[
-                ('num', numerical_pipeline, self.numerical_features),
+                ('num', numerical_pipeline, numerical_columns),
                 ('cat', categorical_pipeline, self.categorical_features)
-            ])
+            ],
+            sparse_threshold=1.0 if self.sparse else 0.0)
+        
+        return preprocessor
+    
+    def fit(self, df: pd.DataFrame) -> 'TitanicPreprocessor':
+        """
+        Crea y ajusta el pipeline de preprocesamiento.
+
+        Args:
+            df (pd.DataFrame): DataFrame de entrenamiento con las características
+
+        Returns:
+            TitanicPreprocessor: La propia instancia ajustada
+        """
+        self.pipeline = self.create_pipeline().fit(df)
+        return self
+    
+    def transform(self, df: pd.DataFrame):
+        """
+        Transforma un DataFrame con el pipeline ajustado.
+
+        Args:
+            df (pd.DataFrame): DataFrame con las características
+
+        Returns:
+            Matriz de características preprocesadas
+        """
+        if self.pipeline is None:
+            raise ValueError("TitanicPreprocessor no está ajustado; llama a fit() primero")
+        return self.pipeline.transform(df)
+    
+    def fit_transform(self, df: pd.DataFrame):
+        """
+        Ajusta el pipeline y transforma el DataFrame.
+
+        Args:
+            df (pd.DataFrame): DataFrame de entrenamiento con las características
+
+        Returns:
+            Matriz de características preprocesadas
+        """
+        return self.fit(df).transform(df)
+    
+    def schema_hash(self) -> str:
+        """
+        Calcula el hash del esquema de entrada: versión del artefacto,
+        listas de características e imputador. Un artefacto solo se carga
+        si coincide.
+
+        Returns:
+            str: Hash hexadecimal abreviado
+        """
+        schema = {
+            'version': ARTIFACT_VERSION,
+            'numerical': self.numerical_features,
+            'categorical': self.categorical_features,
+            'imputer': self.imputer,
+            'sparse': self.sparse
+        }
+        return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:16]
+    
+    def learned_params(self) -> dict:
+        """
+        Resume los parámetros aprendidos por el pipeline: estadísticas del
+        escalado y vocabularios de las variables categóricas.
+
+        Returns:
+            dict: Parámetros aprendidos, serializables en JSON
+        """
+        if self.pipeline is None:
+            raise ValueError("TitanicPreprocessor no está ajustado; llama a fit() primero")
+        scaler = self.pipeline.named_transformers_['num'].named_steps['scaler']
+        onehot = self.pipeline.named_transformers_['cat'].named_steps['onehot']
+        return {
+            'scaler': {
+                feature: {'mean': float(mean), 'scale': float(scale)}
+                for feature, mean, scale in zip(self.numerical_features, scaler.mean_, scaler.scale_)
+            },
+            'categories': {
+                feature: [str(c) for c in categories]
+                for feature, categories in zip(self.categorical_features, onehot.categories_)
+            }
+        }
+    
+    def imputer_state(self) -> dict:
+        """
+        Extrae el estado aprendido por el imputador numérico. Con las
+        opciones por vecinos son los donantes (la matriz de entrenamiento
+        completa con 'knn', 'kd_tree' y 'ball_tree', como máximo
+        `max_donors` filas con 'approximate'); con 'group_median', las
+        medianas por grupo, de tamaño independiente del número de filas.
+
+        Returns:
+            dict: Arrays del estado del imputador
+        """
+        if self.pipeline is None:
+            raise ValueError("TitanicPreprocessor no está ajustado; llama a fit() primero")
+        imputer = self.pipeline.named_transformers_['num'].named_steps['imputer']
+        if self.imputer == 'knn':
+            return {'fit_X': imputer._fit_X}
+        if self.imputer == 'group_median':
+            return {
+                'group_keys': [list(key) for key in imputer.group_medians_.index],
+                'group_medians': imputer.group_medians_.to_numpy(),
+                'first_level_keys': list(imputer.first_level_medians_.index),
+                'first_level_medians': imputer.first_level_medians_.to_numpy(),
+                'global_medians': imputer.global_medians_.to_numpy()
+            }
+        return {'donors': imputer.donors_, 'means': imputer.means_}
+    
+    def _rebuild_pipeline(self, params: dict, state: dict) -> ColumnTransformer:
+        """
+        Reconstruye el pipeline ajustado a partir de `learned_params` y
+        `imputer_state`. El pipeline se ajusta sobre un DataFrame mínimo con
+        cada categoría del vocabulario, para que scikit-learn cree su
+        estructura, y después se le asignan los parámetros guardados.
+
+        Args:
+            params (dict): Salida de `learned_params`
+            state (dict): Salida de `imputer_state`
+
+        Returns:
+            ColumnTransformer: Pipeline listo para `transform`
+        """
+        categories = params['categories']
+        n_rows = max(len(values) for values in categories.values())
+        frame = pd.DataFrame({
+            feature: [values[i % len(values)] for i in range(n_rows)]
+            for feature, values in categories.items()
+        }, dtype=object)
+        for feature in self.numerical_features:
+            frame[feature] = np.arange(n_rows, dtype=float)
+        frame['Pclass'] = 1
+        pipeline = self.create_pipeline().fit(frame)
         
+        onehot = pipeline.named_transformers_['cat'].named_steps['onehot']
+        if [list(c) for c in onehot.categories_] != [categories[f] for f in self.categorical_features]:
+            raise ValueError("Artefacto incompatible: los vocabularios no se pueden reconstruir")
+        scaler = pipeline.named_transformers_['num'].named_steps['scaler']
+        scaler.mean_ = np.array([params['scaler'][f]['mean'] for f in self.numerical_features])
+        scaler.scale_ = np.array([params['scaler'][f]['scale'] for f in self.numerical_features])
+        scaler.var_ = scaler.scale_ ** 2
+        
+        imputer = pipeline.named_transformers_['num'].named_steps['imputer']
+        if self.imputer == 'knn':
+            imputer._fit_X = state['fit_X']
+            imputer._mask_fit_X = np.isnan(state['fit_X'])
+            imputer._valid_mask = ~imputer._mask_fit_X.all(axis=0)
+        elif self.imputer == 'group_median':
+            imputer.group_medians_ = pd.DataFrame(
+                state['group_medians'], columns=self.numerical_features,
+                index=pd.MultiIndex.from_tuples([tuple(key) for key in state['group_keys']],
+                                                names=self.group_features))
+            imputer.first_level_medians_ = pd.DataFrame(
+                state['first_level_medians'], columns=self.numerical_features,
+                index=pd.Index(state['first_level_keys'], name=self.group_features[0]))
+            imputer.global_medians_ = pd.Series(state['global_medians'], index=self.numerical_features)
+        else:
+            imputer.donors_, imputer.means_, imputer.trees_ = state['donors'], state['means'], {}
+        pipeline.sparse_output_ = self.sparse
+        return pipeline
+    
+    def save(self, path) -> None:
+        """
+        Guarda el preprocesador ajustado como artefacto comprimido: hash del
+        esquema, argumentos del constructor, parámetros aprendidos y estado
+        del imputador. No incluye objetos de scikit-learn serializados.
+
+        Args:
+            path (str o Path): Ruta del archivo
+        """
+        artifact = {
+            'schema_hash': self.schema_hash(),
+            'sklearn_version': sklearn.__version__,
+            'config': {'imputer': self.imputer, 'n_neighbors': self.n_neighbors,
+                       'max_donors': self.max_donors, 'sparse': self.sparse},
+            'params': self.learned_params(),
+            'imputer_state': self.imputer_state()
+        }
+        joblib.dump(artifact, path, compress=3)
+    
+    @classmethod
+    def load(cls, path) -> 'TitanicPreprocessor':
+        """
+        Carga un preprocesador ajustado desde un artefacto y reconstruye su
+        pipeline. Avisa si se guardó con otra versión de scikit-learn.
+
+        Args:
+            path (str o Path): Ruta del archivo
+
+        Returns:
+            TitanicPreprocessor: Instancia lista para `transform`
+        """
+        artifact = joblib.load(path)
+        preprocessor = cls(**artifact['config'])
+        if artifact['schema_hash'] != preprocessor.schema_hash():
+            raise ValueError(
+                f"Artefacto incompatible: esquema {artifact['schema_hash']}, "
+                f"se esperaba {preprocessor.schema_hash()}"
+            )
+        if artifact['sklearn_version'] != sklearn.__version__:
+            warnings.warn(
+                f"Artefacto guardado con scikit-learn {artifact['sklearn_version']}; "
+                f"se carga con {sklearn.__version__}"
+            )
+        preprocessor.pipeline = preprocessor._rebuild_pipeline(artifact['params'], artifact['imputer_state'])
         return preprocessor
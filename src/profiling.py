@@ -0,0 +1,244 @@
+"""
+Módulo de instrumentación por etapas para el análisis del Titanic.
+
+Este módulo contiene la clase que mide cada etapa de una ejecución (tiempo
+real, tiempo de CPU y pico de memoria residente), opcionalmente la perfila
+con cProfile o pyinstrument, y escribe la traza en formato Chrome
+(chrome://tracing o Perfetto) junto con un resumen por etapa.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+# Perfiladores admitidos en `StageProfiler(capture=...)`
+CAPTURAS = (None, 'cprofile', 'pyinstrument')
+
+# Ventanas de medición de memoria abiertas en el proceso (ver `peak_rss_window`)
+_OPEN_WINDOWS = []
+
+def _proc_status_mb(field: str):
+    """Lee un campo de memoria (VmRSS, VmHWM) de /proc/self/status en MB, o None."""
+    try:
+        with open('/proc/self/status', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def peak_rss_mb():
+    """
+    Devuelve el pico de memoria residente del proceso en MB: VmHWM en Linux
+    (reiniciable) o ru_maxrss (pico de toda la vida del proceso, sin
+    reinicio) en otros sistemas Unix; None si no está disponible.
+
+    Returns:
+        float: Pico de memoria en MB, o None
+    """
+    hwm = _proc_status_mb('VmHWM')
+    if hwm is not None:
+        return hwm
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en bytes en macOS y en kB en Linux
+    return maxrss / 1024 ** 2 if sys.platform == 'darwin' else maxrss / 1024
+
+def _track_open_windows() -> None:
+    """Anota el pico actual en todas las ventanas abiertas."""
+    peak = peak_rss_mb()
+    if peak is None:
+        return
+    for window in _OPEN_WINDOWS:
+        window['peak_rss_mb'] = max(window['peak_rss_mb'] or 0, peak)
+
+def reset_peak_rss() -> bool:
+    """
+    Reinicia el pico de memoria residente (VmHWM) del proceso en Linux. El
+    pico alcanzado hasta ahora se anota antes en las ventanas abiertas, de
+    modo que las mediciones anidadas no se pisan entre sí.
+
+    Returns:
+        bool: True si el pico se pudo reiniciar
+    """
+    _track_open_windows()
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+@contextmanager
+def peak_rss_window():
+    """
+    Mide el pico de memoria residente de un bloque de código. Las ventanas
+    se pueden anidar (y abrir desde distintos módulos): el pico de una
+    interior cuenta también para las que la contienen. Fuera de Linux el
+    pico no se puede reiniciar y es el de toda la vida del proceso.
+
+    Yields:
+        dict: 'start_rss_mb' (memoria residente al entrar, o None) y, al
+            salir, 'peak_rss_mb' (pico en MB, o None si no está disponible)
+    """
+    reset_peak_rss()
+    window = {'start_rss_mb': _proc_status_mb('VmRSS'), 'peak_rss_mb': None}
+    _OPEN_WINDOWS.append(window)
+    try:
+        yield window
+    finally:
+        _track_open_windows()
+        # Por identidad: dos ventanas pueden tener el mismo contenido
+        _OPEN_WINDOWS[:] = [open_window for open_window in _OPEN_WINDOWS if open_window is not window]
+
+class StageProfiler:
+    """
+    Clase para medir las etapas de una ejecución.
+    Cada etapa se abre con `stage(nombre)`; las etapas se pueden anidar y
+    repetir (por ejemplo, una por bloque del CSV). Por cada una se registra
+    el tiempo real, el tiempo de CPU del proceso y el pico de memoria
+    residente alcanzado durante ella, que también cuenta para las etapas
+    que la contienen. Las etapas medidas en otros procesos (workers de un
+    pool) se incorporan con `extend`.
+    """
+    
+    def __init__(self, capture: str = None):
+        """
+        Args:
+            capture (str, opcional): 'cprofile' o 'pyinstrument' para perfilar
+                además toda la ejecución en el proceso actual
+        """
+        if capture not in CAPTURAS:
+            raise ValueError(f"capture debe ser uno de {CAPTURAS}, no {capture!r}")
+        self.capture = capture
+        self.events = []
+        self._profiler = None
+    
+    @contextmanager
+    def stage(self, name: str, **args):
+        """
+        Mide una etapa.
+
+        Args:
+            name (str): Nombre de la etapa
+            **args: Datos adicionales que se guardan con la etapa en la traza
+        """
+        event = {'name': name, 'ts': time.time() * 1e6, 'pid': os.getpid(),
+                 'tid': threading.get_ident(), 'args': dict(args)}
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            with peak_rss_window() as window:
+                yield event
+        finally:
+            event['dur'] = (time.perf_counter() - start) * 1e6
+            event['cpu_seconds'] = time.process_time() - cpu_start
+            event['peak_rss_mb'] = window['peak_rss_mb']
+            self.events.append(event)
+    
+    def extend(self, events: list) -> None:
+        """
+        Incorpora etapas medidas por otro `StageProfiler`, normalmente en
+        un worker.
+
+        Args:
+            events (list): Atributo `events` del otro perfilador
+        """
+        self.events.extend(events)
+    
+    def start_capture(self) -> None:
+        """Inicia el perfilador de `capture`, si se pidió."""
+        if self.capture == 'cprofile':
+            import cProfile
+            
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.capture == 'pyinstrument':
+            from pyinstrument import Profiler
+            
+            self._profiler = Profiler()
+            self._profiler.start()
+    
+    def stop_capture(self, path) -> Path:
+        """
+        Detiene el perfilador de `capture` y guarda su resultado: estadísticas
+        de pstats (.prof, para snakeviz o `python -m pstats`) con cProfile o
+        una página HTML con pyinstrument.
+
+        Args:
+            path (str o Path): Ruta de destino sin extensión
+
+        Returns:
+            Path: Archivo escrito, o None si no se perfiló
+        """
+        if self._profiler is None:
+            return None
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.capture == 'cprofile':
+            self._profiler.disable()
+            path = path.with_suffix('.prof')
+            self._profiler.dump_stats(path)
+        else:
+            self._profiler.stop()
+            path = path.with_suffix('.html')
+            path.write_text(self._profiler.output_html(), encoding='utf-8')
+        self._profiler = None
+        return path
+    
+    def summary(self) -> dict:
+        """
+        Resume las etapas por nombre, en el orden en que se abrieron por
+        primera vez.
+
+        Returns:
+            dict: Por etapa, llamadas, segundos reales, segundos de CPU y
+                pico de memoria residente en MB
+        """
+        summary = {}
+        for event in sorted(self.events, key=lambda e: e['ts']):
+            stage = summary.setdefault(event['name'], {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_rss_mb': None})
+            stage['calls'] += 1
+            stage['wall_seconds'] += event['dur'] / 1e6
+            stage['cpu_seconds'] += event['cpu_seconds']
+            if event['peak_rss_mb'] is not None:
+                stage['peak_rss_mb'] = max(stage['peak_rss_mb'] or 0, event['peak_rss_mb'])
+        return summary
+    
+    def write_trace(self, path, metadata: dict = None) -> Path:
+        """
+        Escribe la traza en el formato de eventos de Chrome, con el resumen
+        por etapa y `metadata` en claves adicionales que los visores ignoran.
+
+        Args:
+            path (str o Path): Archivo JSON de destino
+            metadata (dict, opcional): Datos de la ejecución a incluir
+
+        Returns:
+            Path: Archivo escrito
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trace_events = [{
+            'name': event['name'], 'ph': 'X', 'cat': 'etapa',
+            'ts': round(event['ts'], 1), 'dur': round(event['dur'], 1),
+            'pid': event['pid'], 'tid': event['tid'],
+            'args': {**event['args'], 'cpu_ms': round(event['cpu_seconds'] * 1000, 3),
+                     'peak_rss_mb': event['peak_rss_mb']}
+        } for event in sorted(self.events, key=lambda e: e['ts'])]
+        content = {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'stages': self.summary(),
+            'metadata': metadata or {}
+        }
+        path.write_text(json.dumps(content, indent=2, default=str), encoding='utf-8')
+        return path
@@ -0,0 +1,548 @@
+"""
+Módulo de servicio en línea para el problema del Titanic.
+
+Este módulo contiene un servidor HTTP/JSON local que puntúa pasajeros
+individuales con baja latencia. Las características de una fila se
+construyen sin pandas a partir de los parámetros aprendidos, y las
+peticiones concurrentes se agrupan en micro-lotes antes del modelo.
+"""
+
+import sys
+import json
+import math
+import time
+import queue
+import socket
+import bisect
+import threading
+import http.client
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+
+from data_loader import ESQUEMA_DTYPES, ESQUEMA_DERIVADAS
+from feature_engineering import TITLE_PATTERN, COMMON_TITLES, AGE_LABELS, FARE_LABELS
+from inference import TitanicPredictor
+from compiled_trees import CompiledTreeEnsemble
+from utils import es_instancia_de
+
+# Características que la ruta rápida sabe construir a partir de un registro
+NUMERICAL_FEATURES = ['Age', 'Fare', 'FamilySize', 'IsAlone', 'SibSp', 'Parch', 'Pclass']
+CATEGORICAL_FEATURES = ['Sex', 'Embarked', 'Title', 'CabinDeck', 'AgeBin', 'FareBin']
+
+class ScoringError(RuntimeError):
+    """Error del modelo al puntuar registros válidos."""
+
+def _is_missing(value) -> bool:
+    """
+    Indica si un valor de un registro JSON falta (None, cadena vacía o NaN).
+
+    Args:
+        value: Valor del registro
+
+    Returns:
+        bool: True si el valor falta
+    """
+    return value is None or value == '' or (isinstance(value, float) and math.isnan(value))
+
+class FastFeatureBuilder:
+    """
+    Clase para construir el vector de características de un pasajero sin
+    pandas. Reproduce `TitanicFeatureEngineering.transform` y el
+    `ColumnTransformer` ajustado (escalado y one-hot) con los mismos
+    parámetros aprendidos, incluido el redondeo a float32 de Age y Fare del
+    esquema compacto. Solo los pasajeros con Age o Fare faltantes pasan por
+    el imputador ajustado, sobre un DataFrame de una fila.
+    """
+    
+    def __init__(self, feature_engineering, column_transformer):
+        """
+        Args:
+            feature_engineering (TitanicFeatureEngineering): Instancia ajustada
+            column_transformer (ColumnTransformer): Preprocesamiento ajustado
+        """
+        self.age_edges = [float(x) for x in feature_engineering.age_bins[1:-1]]
+        self.fare_edges = [float(x) for x in feature_engineering.fare_bins[1:-1]]
+        
+        columns = {name: cols for name, _, cols in column_transformer.transformers_}
+        scaler = column_transformer.named_transformers_['num'].named_steps['scaler']
+        self.imputer = column_transformer.named_transformers_['num'].named_steps['imputer']
+        self.imputer_columns = list(columns['num'])
+        # Tipos compactos del esquema para el imputador; Title queda como
+        # texto, igual que lo produce el feature engineering
+        self.dtypes = {column: dtype for column, dtype in {**ESQUEMA_DTYPES, **ESQUEMA_DERIVADAS}.items()
+                       if column != 'Title'}
+        # El esquema compacto convierte en NaN (y el pipeline en 'missing')
+        # los valores de Sex y Embarked fuera de sus categorías
+        self.vocabularies = {column: set(ESQUEMA_DTYPES[column].categories) for column in ['Sex', 'Embarked']}
+        onehot = column_transformer.named_transformers_['cat'].named_steps['onehot']
+        # La mediana por grupo recibe también las columnas de agrupación,
+        # pero solo devuelve las numéricas
+        self.numerical_features = list(columns['num'][:len(scaler.mean_)])
+        self.categorical_features = list(columns['cat'])
+        unsupported = (set(self.imputer_columns) - set(NUMERICAL_FEATURES) - {'Title'}) | \
+                      (set(self.categorical_features) - set(CATEGORICAL_FEATURES))
+        if unsupported:
+            raise ValueError(f"Características sin ruta rápida: {sorted(unsupported)}")
+        
+        self.mean = np.asarray(scaler.mean_, dtype=float)
+        self.scale = np.asarray(scaler.scale_, dtype=float)
+        
+        # Columna de salida de cada categoría; la eliminada por drop='first'
+        # y las desconocidas no activan ninguna
+        self.category_index = []
+        offset = len(self.numerical_features)
+        drop_idx = onehot.drop_idx_ if onehot.drop_idx_ is not None else [None] * len(onehot.categories_)
+        for categories, dropped in zip(onehot.categories_, drop_idx):
+            index = {}
+            for i, category in enumerate(categories):
+                if dropped is not None and i == dropped:
+                    continue
+                index[str(category)] = offset
+                offset += 1
+            self.category_index.append(index)
+        self.n_features = offset
+    
+    @classmethod
+    def from_predictor(cls, predictor: TitanicPredictor) -> 'FastFeatureBuilder':
+        """
+        Construye la ruta rápida a partir de un `TitanicPredictor`, tomando
+        el preprocesamiento del propio predictor o del Pipeline del modelo.
+
+        Args:
+            predictor (TitanicPredictor): Predictor ajustado
+
+        Returns:
+            FastFeatureBuilder: Constructor de características listo
+        """
+        if predictor.preprocessor is not None:
+            column_transformer = predictor.preprocessor.pipeline
+        else:
+            column_transformer = predictor.model.steps[0][1]
+        return cls(predictor.feature_engineering, column_transformer)
+    
+    def derive(self, record: dict) -> dict:
+        """
+        Calcula las características derivadas de un pasajero crudo.
+
+        Args:
+            record (dict): Registro con las columnas del CSV original
+
+        Returns:
+            dict: Valores de las características numéricas y categóricas;
+                Age y Fare faltantes quedan como NaN y sus bins como 'missing',
+                igual que Sex y Embarked faltantes o fuera del esquema
+        """
+        age = record.get('Age')
+        fare = record.get('Fare')
+        # Age y Fare pasan por float32 en el esquema compacto
+        age = math.nan if _is_missing(age) else float(np.float32(age))
+        fare = math.nan if _is_missing(fare) else float(np.float32(fare))
+        family_size = int(record['SibSp']) + int(record['Parch']) + 1
+        
+        name = record.get('Name')
+        match = TITLE_PATTERN.match(name) if isinstance(name, str) else None
+        title = match.group(1).strip() if match else None
+        cabin = record.get('Cabin')
+        embarked = record.get('Embarked')
+        sex = record.get('Sex')
+        
+        return {
+            'Age': age,
+            'Fare': fare,
+            'FamilySize': family_size,
+            'IsAlone': int(family_size == 1),
+            'SibSp': int(record['SibSp']),
+            'Parch': int(record['Parch']),
+            'Pclass': record.get('Pclass'),
+            'Sex': sex if sex in self.vocabularies['Sex'] else 'missing',
+            'Embarked': embarked if embarked in self.vocabularies['Embarked'] else 'missing',
+            'Title': title if title in COMMON_TITLES else 'Other',
+            'CabinDeck': cabin[0] if isinstance(cabin, str) and cabin else 'U',
+            'AgeBin': 'missing' if math.isnan(age) else AGE_LABELS[bisect.bisect_left(self.age_edges, age)],
+            'FareBin': 'missing' if math.isnan(fare) else FARE_LABELS[bisect.bisect_left(self.fare_edges, fare)]
+        }
+    
+    def impute(self, values: dict) -> list:
+        """
+        Imputa las características numéricas de un pasajero con el imputador
+        ajustado del `ColumnTransformer`.
+
+        Args:
+            values (dict): Características derivadas con `derive`
+
+        Returns:
+            list: Valores numéricos sin faltantes, en el orden del escalado
+        """
+        row = pd.DataFrame([{column: values[column] for column in self.imputer_columns}])
+        # Los mismos tipos compactos que en el pipeline: KNNImputer calcula
+        # en float32 si Age y Fare lo son
+        row = row.astype({column: self.dtypes[column] for column in row.columns if column in self.dtypes})
+        return list(np.asarray(self.imputer.transform(row), dtype=float)[0])
+    
+    def transform_record(self, record: dict) -> np.ndarray:
+        """
+        Construye el vector de características preprocesado de un pasajero.
+
+        Args:
+            record (dict): Registro con las columnas del CSV original
+
+        Returns:
+            np.ndarray: Vector de características, igual a una fila de
+            `ColumnTransformer.transform`
+        """
+        values = self.derive(record)
+        x = np.zeros(self.n_features)
+        n_numerical = len(self.numerical_features)
+        numerical = [values[feature] for feature in self.numerical_features]
+        if any(math.isnan(value) for value in numerical):
+            numerical = self.impute(values)
+        x[:n_numerical] = numerical
+        x[:n_numerical] = (x[:n_numerical] - self.mean) / self.scale
+        for feature, index in zip(self.categorical_features, self.category_index):
+            column = index.get(values[feature])
+            if column is not None:
+                x[column] = 1.0
+        return x
+    
+    def transform_records(self, records: list) -> np.ndarray:
+        """
+        Construye la matriz de características de varios pasajeros.
+
+        Args:
+            records (list): Registros con las columnas del CSV original
+
+        Returns:
+            np.ndarray: Matriz de características, una fila por registro
+        """
+        return np.vstack([self.transform_record(record) for record in records])
+
+class _PendingRequest:
+    """Petición individual a la espera de su micro-lote."""
+    
+    __slots__ = ('features', 'done', 'probability', 'error')
+    
+    def __init__(self, features: np.ndarray):
+        """
+        Args:
+            features (np.ndarray): Vector de características preprocesado
+        """
+        self.features = features
+        self.done = threading.Event()
+        self.probability = None
+        self.error = None
+
+class ScoringService:
+    """
+    Clase para puntuar pasajeros en línea con el modelo precargado.
+    Un hilo dedicado agrupa las peticiones concurrentes en micro-lotes de
+    hasta `max_batch_size` filas y hace una sola llamada a `predict_proba`
+    por lote: las que llegan mientras el modelo puntúa un lote forman el
+    siguiente. Con `max_wait_ms` > 0 se espera además ese tiempo a que el
+    lote se llene, a costa de la latencia de las peticiones aisladas.
+    """
+    
+    def __init__(self, predictor: TitanicPredictor, max_batch_size: int = 64,
+                 max_wait_ms: float = 0.0, threshold: float = 0.5, compile_trees: bool = True):
+        """
+        Args:
+            predictor (TitanicPredictor): Predictor ajustado
+            max_batch_size (int): Máximo de peticiones por micro-lote
+            max_wait_ms (float): Espera adicional para llenar un micro-lote
+            threshold (float): Umbral de probabilidad para predecir supervivencia
+            compile_trees (bool): Compilar random forest, XGBoost y LightGBM
+                a arrays de NumPy (ver `CompiledTreeEnsemble`)
+        """
+        self.predictor = predictor
+        self.model_name = predictor.model_name
+        self.builder = FastFeatureBuilder.from_predictor(predictor)
+        model = predictor.model
+        self.estimator = model.steps[-1][1] if es_instancia_de(model, 'sklearn.pipeline', 'Pipeline') else model
+        if compile_trees:
+            try:
+                self.estimator = CompiledTreeEnsemble.from_model(self.estimator)
+            except ValueError:
+                # Los modelos sin árboles se puntúan con su propia librería
+                pass
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.threshold = threshold
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+    
+    @classmethod
+    def load(cls, directory, **kwargs) -> 'ScoringService':
+        """
+        Carga un predictor guardado con `TitanicPredictor.save`.
+
+        Args:
+            directory (str o Path): Directorio del predictor
+            **kwargs: Argumentos de `ScoringService`
+
+        Returns:
+            ScoringService: Servicio listo para puntuar
+        """
+        return cls(TitanicPredictor.load(directory), **kwargs)
+    
+    def _response(self, record: dict, probability: float) -> dict:
+        """
+        Da formato a la predicción de un pasajero.
+
+        Args:
+            record (dict): Registro puntuado
+            probability (float): Probabilidad de supervivencia
+
+        Returns:
+            dict: PassengerId, Survived y Probability
+        """
+        return {
+            'PassengerId': record.get('PassengerId'),
+            'Survived': int(probability >= self.threshold),
+            'Probability': float(probability)
+        }
+    
+    def score(self, record: dict) -> dict:
+        """
+        Puntúa un pasajero a través del micro-lote compartido. Las
+        características se construyen en el hilo que llama.
+
+        Args:
+            record (dict): Registro con las columnas del CSV original
+
+        Returns:
+            dict: PassengerId, Survived y Probability
+        """
+        request = _PendingRequest(self.builder.transform_record(record))
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise ScoringError(f'Error del modelo: {request.error!r}') from request.error
+        return self._response(record, request.probability)
+    
+    def score_many(self, records: list) -> list:
+        """
+        Puntúa una lista de pasajeros como un único lote, sin pasar por la
+        cola de micro-lotes.
+
+        Args:
+            records (list): Registros con las columnas del CSV original
+
+        Returns:
+            list: Predicciones de cada registro
+        """
+        if not records:
+            return []
+        features = self.builder.transform_records(records)
+        try:
+            proba = self.estimator.predict_proba(features)[:, 1]
+        except Exception as error:
+            raise ScoringError(f'Error del modelo: {error!r}') from error
+        return [self._response(record, p) for record, p in zip(records, proba)]
+    
+    def _collect(self, first: _PendingRequest) -> list:
+        """
+        Completa un micro-lote con las peticiones que llegan antes del plazo.
+
+        Args:
+            first (_PendingRequest): Primera petición del lote
+
+        Returns:
+            list: Peticiones del lote; termina en None si se pidió cerrar
+        """
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            batch.append(request)
+            if request is None:
+                break
+        return batch
+    
+    def _run(self) -> None:
+        """Bucle del hilo de micro-lotes."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            try:
+                proba = self.estimator.predict_proba(np.vstack([r.features for r in batch]))[:, 1]
+                for request, p in zip(batch, proba):
+                    request.probability = p
+            except Exception as error:
+                for request in batch:
+                    request.error = error
+            for request in batch:
+                request.done.set()
+            if stop:
+                return
+    
+    def close(self) -> None:
+        """Detiene el hilo de micro-lotes tras atender lo pendiente."""
+        self._queue.put(None)
+        self._worker.join()
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    """
+    Manejador HTTP del servicio:
+    - GET /health: estado y modelo cargado
+    - POST /predict: un registro JSON (micro-lote) o una lista (lote)
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    # Sin Nagle, las respuestas pequeñas no esperan al ACK retardado
+    disable_nagle_algorithm = True
+    service = None
+    
+    def _send_json(self, status: int, payload) -> None:
+        """
+        Envía una respuesta JSON con longitud explícita (conexión persistente).
+
+        Args:
+            status (int): Código HTTP
+            payload: Contenido serializable en JSON
+        """
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        """Atiende GET /health."""
+        if self.path != '/health':
+            self._send_json(404, {'error': f'Ruta desconocida: {self.path}'})
+            return
+        self._send_json(200, {'status': 'ok', 'model': self.service.model_name})
+    
+    def do_POST(self):
+        """
+        Atiende POST /predict: un cuerpo o registro inválido devuelve 400 y
+        un fallo del modelo, 500.
+        """
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.path != '/predict':
+            self._send_json(404, {'error': f'Ruta desconocida: {self.path}'})
+            return
+        try:
+            payload = json.loads(body)
+            if isinstance(payload, list):
+                result = self.service.score_many(payload)
+            else:
+                result = self.service.score(payload)
+        except ScoringError as error:
+            self._send_json(500, {'error': str(error)})
+            return
+        except Exception as error:
+            # Cualquier otro fallo viene del contenido de la petición (JSON
+            # mal formado, un valor que no es un objeto, columnas faltantes...)
+            self._send_json(400, {'error': f'Registro inválido: {error!r}'})
+            return
+        self._send_json(200, result)
+    
+    def log_message(self, format, *args):
+        """Silencia el log por petición para no añadir latencia."""
+
+def crear_servidor(servicio: ScoringService, host: str = '127.0.0.1',
+                   puerto: int = 8000) -> ThreadingHTTPServer:
+    """
+    Crea el servidor HTTP del servicio, con un hilo por conexión.
+
+    Args:
+        servicio (ScoringService): Servicio de puntuación
+        host (str): Dirección de escucha
+        puerto (int): Puerto de escucha; 0 elige uno libre
+
+    Returns:
+        ThreadingHTTPServer: Servidor listo para `serve_forever`
+    """
+    handler = type('ScoringHandler', (_ScoringHandler,), {'service': servicio})
+    servidor = ThreadingHTTPServer((host, puerto), handler)
+    servidor.daemon_threads = True
+    return servidor
+
+def prueba_de_carga(host: str, puerto: int, registros: list, peticiones: int = 1000,
+                    concurrencia: int = 8) -> dict:
+    """
+    Lanza peticiones POST /predict de un registro cada una desde varios
+    clientes concurrentes con conexiones persistentes, y mide la latencia
+    de extremo a extremo.
+
+    Args:
+        host (str): Dirección del servidor
+        puerto (int): Puerto del servidor
+        registros (list): Registros a enviar, en ciclo
+        peticiones (int): Número total de peticiones
+        concurrencia (int): Número de clientes simultáneos
+
+    Returns:
+        dict: Peticiones, errores, peticiones por segundo y latencias
+        p50/p95/p99/máxima en milisegundos
+    """
+    cuerpos = [json.dumps(registro).encode('utf-8') for registro in registros]
+    cabeceras = {'Content-Type': 'application/json'}
+    
+    def cliente(indice):
+        conexion = http.client.HTTPConnection(host, puerto)
+        conexion.connect()
+        conexion.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        latencias, errores = [], 0
+        for i in range(indice, peticiones, concurrencia):
+            inicio = time.perf_counter()
+            conexion.request('POST', '/predict', cuerpos[i % len(cuerpos)], cabeceras)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            latencias.append(time.perf_counter() - inicio)
+            errores += respuesta.status != 200
+        conexion.close()
+        return latencias, errores
+    
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        resultados = list(pool.map(cliente, range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+    
+    latencias = np.concatenate([r[0] for r in resultados]) * 1000
+    return {
+        'peticiones': len(latencias),
+        'errores': sum(r[1] for r in resultados),
+        'peticiones_por_segundo': len(latencias) / segundos,
+        'p50_ms': float(np.percentile(latencias, 50)),
+        'p95_ms': float(np.percentile(latencias, 95)),
+        'p99_ms': float(np.percentile(latencias, 99)),
+        'max_ms': float(latencias.max())
+    }
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).parent.parent
+    
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else base_dir / 'output' / 'models'
+    puerto = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    
+    servicio = ScoringService.load(model_dir)
+    servidor = crear_servidor(servicio, puerto=puerto)
+    print(f"🚀 Sirviendo {servicio.model_name} en http://127.0.0.1:{puerto}/predict")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servicio.close()
@@ -6,10 +6,12 @@ Configura el entorno y valida todas las dependencias necesarias.
 import sys
 import importlib
 from pathlib import Path
-import pkg_resources
 
 def verificar_dependencias():
     """Verifica que todas las dependencias necesarias estén instaladas."""
+    # pkg_resources tarda en importarse; solo se necesita aquí
+    import pkg_resources
+    
     dependencias_requeridas = {
         'pandas': '1.5.0',
         'numpy': '1.20.0',
@@ -0,0 +1,177 @@
+"""
+Módulo de resúmenes de tamaño acotado para el análisis del Titanic.
+
+Este módulo contiene un sketch de cuantiles KLL (Karnin, Lang y Liberty)
+y un contador de histograma con cortes fijos. Ambos se actualizan por
+bloques en una sola pasada, se pueden combinar entre sí y ocupan una
+memoria que no depende del número de filas resumidas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import _cuantil_desde_conteos
+
+def contar_en_bins(values, bins) -> np.ndarray:
+    """
+    Cuenta los valores de cada intervalo con la misma convención que
+    `numpy.histogram` (y `plt.hist`): intervalos cerrados por la izquierda
+    y el último también por la derecha; los valores fuera de rango se
+    ignoran.
+
+    Args:
+        values (array-like): Valores a contar
+        bins (array-like): Cortes de los intervalos, crecientes
+
+    Returns:
+        np.ndarray: Conteo por intervalo (len(bins) - 1)
+    """
+    values = np.asarray(values, dtype=float)
+    bins = np.asarray(bins, dtype=float)
+    index = np.searchsorted(bins, values, side='right') - 1
+    index[values == bins[-1]] = len(bins) - 2
+    valid = (index >= 0) & (index < len(bins) - 1)
+    return np.bincount(index[valid], minlength=len(bins) - 1)
+
+class KLLSketch:
+    """
+    Clase con un sketch de cuantiles KLL.
+    Los valores se guardan en niveles; el nivel h representa 2**h valores.
+    Cuando un nivel supera su capacidad se ordena y la mitad de sus valores
+    (los de posición par o impar, al azar) sube al nivel siguiente. Con
+    menos de `k` valores el sketch es exacto; por encima, el error de rango
+    es del orden de 1/k y la memoria, de unos 3k valores.
+    """
+    
+    def __init__(self, k: int = 1024, seed: int = 42):
+        """
+        Args:
+            k (int): Capacidad del nivel superior; controla la precisión
+            seed (int): Semilla de las compactaciones, para resultados
+                reproducibles
+        """
+        self.k = k
+        self.seed = seed
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+    
+    def _capacity(self, level: int) -> int:
+        """Capacidad de un nivel: decrece en 2/3 por nivel bajo el superior."""
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+    
+    def _compress(self) -> None:
+        """Compacta niveles hasta que todos respetan su capacidad."""
+        while True:
+            full = [level for level, items in enumerate(self.levels)
+                    if len(items) > self._capacity(level)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # Con un número impar de valores, uno se queda en el nivel
+            leftover = len(items) % 2
+            offset = self._rng.integers(2)
+            self.levels[level] = items[:leftover]
+            self.levels[level + 1] = np.concatenate(
+                [self.levels[level + 1], items[leftover + offset::2]])
+    
+    def update(self, values) -> 'KLLSketch':
+        """
+        Añade un bloque de valores; se ignoran los faltantes.
+
+        Args:
+            values (array-like): Valores a añadir
+
+        Returns:
+            KLLSketch: El propio sketch, actualizado
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+    
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """
+        Combina este sketch con otro en uno nuevo, sin modificar ninguno.
+
+        Args:
+            other (KLLSketch): Sketch a combinar
+
+        Returns:
+            KLLSketch: Sketch de la unión
+        """
+        # La semilla depende de los tamaños para que la combinación sea
+        # reproducible sin consumir el generador de ninguno de los dos
+        merged = KLLSketch(self.k, self.seed)
+        merged._rng = np.random.default_rng([self.seed, self.n, other.n])
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([sketch.levels[h] for sketch in (self, other) if h < len(sketch.levels)])
+            for h in range(depth)
+        ]
+        merged.n = self.n + other.n
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        merged._compress()
+        return merged
+    
+    def weights(self) -> pd.Series:
+        """
+        Devuelve los valores guardados con el número de valores que
+        representa cada uno.
+
+        Returns:
+            pd.Series: Peso de cada valor distinto (índice = valor)
+        """
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** h) for h, items in enumerate(self.levels)])
+        return pd.Series(weights, index=values).groupby(level=0).sum()
+    
+    def quantile(self, q: float) -> float:
+        """
+        Calcula un cuantil, con la interpolación de `pandas.Series.quantile`
+        sobre los valores ponderados. Es exacto mientras n < k.
+
+        Args:
+            q (float): Cuantil, entre 0 y 1
+
+        Returns:
+            float: Valor del cuantil
+        """
+        if self.n == 0:
+            return np.nan
+        return float(np.clip(_cuantil_desde_conteos(self.weights(), q), self.min, self.max))
+    
+    def box_stats(self, whis: float = 1.5) -> dict:
+        """
+        Calcula las estadísticas de un diagrama de caja para `Axes.bxp`.
+        Los bigotes llegan al valor guardado más extremo dentro de los
+        límites y los atípicos son los valores guardados fuera de ellos, de
+        modo que su número está acotado por el tamaño del sketch.
+
+        Args:
+            whis (float): Longitud de los bigotes en rangos intercuartílicos
+
+        Returns:
+            dict: med, q1, q3, whislo, whishi y fliers
+        """
+        q1, med, q3 = (self.quantile(q) for q in [0.25, 0.5, 0.75])
+        values = np.concatenate(self.levels + [[self.min, self.max]])
+        low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+        inside = values[(values >= low) & (values <= high)]
+        return {
+            'med': med, 'q1': q1, 'q3': q3,
+            'whislo': inside.min(), 'whishi': inside.max(),
+            'fliers': np.unique(values[(values < low) | (values > high)])
+        }
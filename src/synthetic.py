@@ -0,0 +1,364 @@
+"""
+Módulo de generación de manifiestos sintéticos del Titanic.
+
+Este módulo contiene la clase que ajusta las distribuciones conjuntas de
+train.csv (clase, sexo, título, familia, puerto, cubierta, edad, tarifa y
+supervivencia condicionada a ellas) y escribe manifiestos de N filas con
+las mismas columnas y valores faltantes, por bloques generados en paralelo.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from data_loader import PARQUET_DISPONIBLE
+
+# Columnas de train.csv, en su orden
+COLUMNS = ['PassengerId', 'Survived', 'Pclass', 'Name', 'Sex', 'Age', 'SibSp', 'Parch',
+           'Ticket', 'Fare', 'Cabin', 'Embarked']
+
+# Atributos discretos que se muestrean juntos, como perfiles observados
+PROFILE_COLUMNS = ['Pclass', 'Sex', 'RawTitle', 'SibSp', 'Parch', 'Embarked', 'CabinDeck']
+
+# Títulos agrupados para condicionar la edad (como en `preparar_datos`)
+TITLE_GROUPS = {'Mr': 'Mr', 'Mrs': 'Mrs', 'Miss': 'Miss', 'Master': 'Master',
+                'Mme': 'Mrs', 'Ms': 'Miss', 'Mlle': 'Miss'}
+
+# Bandas de edad y de tamaño familiar de las celdas de supervivencia
+AGE_BANDS = [0, 12, 18, 35, 50, np.inf]
+FAMILY_BANDS = [0, 1, 4, np.inf]
+
+# Peso de la celda superior al suavizar una tasa de supervivencia
+SMOOTHING = 3
+
+def _bandwidth(values: np.ndarray) -> float:
+    """
+    Ancho de banda de Silverman para suavizar una muestra.
+
+    Args:
+        values (np.ndarray): Muestra
+
+    Returns:
+        float: Ancho de banda (0 si la muestra tiene menos de dos valores)
+    """
+    if len(values) < 2:
+        return 0.0
+    q75, q25 = np.percentile(values, [75, 25])
+    spread = min(values.std(ddof=1), (q75 - q25) / 1.34) or values.std(ddof=1)
+    return 0.9 * spread * len(values) ** -0.2
+
+class _GroupSampler:
+    """
+    Muestrea valores de una variable continua condicionada a un grupo:
+    un valor observado del grupo al azar más ruido gaussiano con el ancho
+    de banda del grupo (estimación de densidad por núcleos).
+    """
+    
+    def __init__(self, values: pd.Series, groups: pd.Series):
+        """
+        Args:
+            values (pd.Series): Valores observados (sin faltantes)
+            groups (pd.Series): Grupo de cada valor
+        """
+        order = np.argsort(groups.to_numpy(), kind='stable')
+        self.groups = {group: i for i, group in enumerate(pd.unique(groups.to_numpy()[order]))}
+        codes = np.array([self.groups[g] for g in groups.to_numpy()[order]])
+        self.values = values.to_numpy(dtype=float)[order]
+        self.offsets = np.searchsorted(codes, np.arange(len(self.groups)))
+        self.counts = np.bincount(codes, minlength=len(self.groups))
+        self.bandwidths = np.array([
+            _bandwidth(self.values[start:start + count])
+            for start, count in zip(self.offsets, self.counts)
+        ])
+    
+    def sample(self, groups: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Args:
+            groups (np.ndarray): Grupo de cada valor a generar (grupos vistos en `fit`)
+            rng (np.random.Generator): Generador aleatorio
+
+        Returns:
+            np.ndarray: Valores generados
+        """
+        codes = np.array([self.groups[g] for g in groups]) if len(groups) else np.empty(0, int)
+        picks = self.offsets[codes] + (rng.random(len(codes)) * self.counts[codes]).astype(int)
+        return self.values[picks] + rng.standard_normal(len(codes)) * self.bandwidths[codes]
+
+class TitanicSyntheticGenerator:
+    """
+    Clase para generar pasajeros sintéticos con las distribuciones de
+    train.csv.
+    Los atributos discretos se muestrean como perfiles completos observados
+    (su distribución conjunta empírica); la edad se genera condicionada a
+    título y clase, la tarifa a clase y tamaño familiar, y la supervivencia
+    con la tasa de su celda (clase, sexo, edad, familia) suavizada hacia la
+    de (clase, sexo). Nombre, billete y cabina se toman de los valores
+    observados compatibles, y los faltantes de Age, Cabin y Embarked siguen
+    las tasas de los datos.
+    """
+    
+    def __init__(self, random_state: int = 42):
+        """
+        Args:
+            random_state (int): Semilla por defecto de `sample` y `write`
+        """
+        self.random_state = random_state
+        self.profiles = None
+    
+    def fit(self, df: pd.DataFrame) -> 'TitanicSyntheticGenerator':
+        """
+        Ajusta las distribuciones a partir del CSV original.
+
+        Args:
+            df (pd.DataFrame): Datos tal como se leen de train.csv
+
+        Returns:
+            TitanicSyntheticGenerator: La propia instancia ajustada
+        """
+        df = df.copy()
+        parts = df['Name'].str.extract(r'^(?P<surname>[^,]+), (?P<title>[^.]+)\. (?P<rest>.*)$')
+        df['RawTitle'] = parts['title'].str.split().str[-1].fillna('Mr')
+        df['CabinDeck'] = df['Cabin'].str[0].fillna('U')
+        df['Embarked'] = df['Embarked'].fillna('?')
+        family = df['SibSp'] + df['Parch'] + 1
+        
+        # Perfiles discretos con su frecuencia
+        profiles = df.groupby(PROFILE_COLUMNS, dropna=False).size()
+        self.profiles = profiles.index.to_frame(index=False)
+        self.profile_weights = (profiles / profiles.sum()).to_numpy()
+        
+        # Edad por (título agrupado, clase) y faltantes por (clase, cabina conocida)
+        age_known = df['Age'].notna()
+        self.age_sampler = _GroupSampler(df.loc[age_known, 'Age'],
+                                         self._age_group(df.loc[age_known]))
+        self.age_missing = df['Age'].isna().groupby([df['Pclass'], df['CabinDeck'] != 'U']).mean()
+        
+        # Tarifa en escala logarítmica por (clase, banda familiar), con sus ceros
+        fare_group = self._fare_group(df['Pclass'], family)
+        paid = df['Fare'] > 0
+        self.fare_sampler = _GroupSampler(np.log1p(df.loc[paid, 'Fare']), fare_group[paid])
+        self.fare_zero = (~paid).groupby(df['Pclass']).mean()
+        self.fare_range = (df.loc[paid, 'Fare'].min(), df['Fare'].max())
+        
+        # Valores observados de nombres, billetes y cabinas
+        self.surnames = parts['surname'].dropna().to_numpy()
+        self.rest_by_title = {title: rest.to_numpy() for title, rest in parts['rest'].groupby(df['RawTitle'])}
+        self.tickets_by_class = {pclass: tickets.to_numpy() for pclass, tickets in df['Ticket'].groupby(df['Pclass'])}
+        self.cabins_by_deck = {deck: cabins.to_numpy() for deck, cabins in df['Cabin'].dropna().groupby(df['CabinDeck'])}
+        
+        # Supervivencia: celda fina suavizada hacia (clase, sexo) y global
+        if 'Survived' in df.columns:
+            self.survival_global = df['Survived'].mean()
+            coarse = df.groupby(['Pclass', 'Sex'])['Survived'].agg(['sum', 'count'])
+            self.survival_coarse = (coarse['sum'] + SMOOTHING * self.survival_global) / (coarse['count'] + SMOOTHING)
+            self.survival_fine = df.groupby(self._survival_cell(df['Pclass'], df['Sex'], df['Age'], family),
+                                            dropna=False)['Survived'].agg(['sum', 'count'])
+        else:
+            self.survival_fine = None
+        return self
+    
+    @staticmethod
+    def _age_group(df: pd.DataFrame) -> pd.Series:
+        """Grupo de edad de cada pasajero: título agrupado y clase."""
+        title = df['RawTitle'].map(TITLE_GROUPS).fillna('Rare')
+        return title + '-' + df['Pclass'].astype(str)
+    
+    @staticmethod
+    def _fare_group(pclass: pd.Series, family: pd.Series) -> pd.Series:
+        """Grupo de tarifa de cada pasajero: clase y banda de tamaño familiar."""
+        band = pd.cut(family, FAMILY_BANDS, labels=False)
+        return pclass.astype(str) + '-' + band.astype(str)
+    
+    @staticmethod
+    def _survival_cell(pclass, sex, age, family) -> list:
+        """Claves de la celda de supervivencia (la banda de edad puede faltar)."""
+        return [pclass, sex, pd.cut(age, AGE_BANDS, labels=False),
+                pd.cut(family, FAMILY_BANDS, labels=False)]
+    
+    def _pick(self, pools: dict, keys: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Toma al azar un valor observado del grupo de cada clave."""
+        result = np.empty(len(keys), dtype=object)
+        for key in pd.unique(keys):
+            mask = keys == key
+            pool = pools.get(key)
+            if pool is not None and len(pool):
+                result[mask] = pool[rng.integers(len(pool), size=mask.sum())]
+        return result
+    
+    def sample(self, n: int, random_state=None, start_id: int = 1) -> pd.DataFrame:
+        """
+        Genera `n` pasajeros sintéticos.
+
+        Args:
+            n (int): Número de pasajeros
+            random_state (int o np.random.SeedSequence, opcional): Semilla;
+                por defecto, la de la instancia
+            start_id (int): PassengerId del primer pasajero
+
+        Returns:
+            pd.DataFrame: Pasajeros con las columnas de train.csv
+        """
+        if self.profiles is None:
+            raise ValueError("El generador no está ajustado; llame a fit primero")
+        rng = np.random.default_rng(self.random_state if random_state is None else random_state)
+        
+        df = self.profiles.iloc[rng.choice(len(self.profiles), size=n, p=self.profile_weights)]
+        df = df.reset_index(drop=True)
+        family = df['SibSp'] + df['Parch'] + 1
+        has_cabin = df['CabinDeck'] != 'U'
+        
+        # Edad: valores de 1 año o más redondeados como en los datos
+        age = np.clip(self.age_sampler.sample(self._age_group(df).to_numpy(), rng), 0.42, 80)
+        age = np.where(age < 1, np.round(age, 2), np.round(age))
+        
+        # Tarifa: cero con la tasa de su clase, si no la del grupo
+        fare = np.expm1(self.fare_sampler.sample(self._fare_group(df['Pclass'], family).to_numpy(), rng))
+        fare = np.clip(fare, *self.fare_range).round(4)
+        fare[rng.random(n) < df['Pclass'].map(self.fare_zero).to_numpy()] = 0.0
+        
+        result = pd.DataFrame({
+            'PassengerId': np.arange(start_id, start_id + n),
+            'Pclass': df['Pclass'].to_numpy(),
+            'Name': (self.surnames[rng.integers(len(self.surnames), size=n)].astype(object)
+                     + ', ' + df['RawTitle'].to_numpy() + '. '
+                     + self._pick(self.rest_by_title, df['RawTitle'].to_numpy(), rng)),
+            'Sex': df['Sex'].to_numpy(),
+            'Age': age,
+            'SibSp': df['SibSp'].to_numpy(),
+            'Parch': df['Parch'].to_numpy(),
+            'Ticket': self._pick(self.tickets_by_class, df['Pclass'].to_numpy(), rng),
+            'Fare': fare,
+            'Cabin': np.where(has_cabin, self._pick(self.cabins_by_deck, df['CabinDeck'].to_numpy(), rng), None),
+            'Embarked': df['Embarked'].replace('?', np.nan).to_numpy()
+        })
+        
+        # Supervivencia con la edad real, antes de ocultarla
+        if self.survival_fine is not None:
+            cells = pd.MultiIndex.from_arrays(
+                self._survival_cell(result['Pclass'], result['Sex'], result['Age'], family))
+            fine = self.survival_fine.reindex(cells).fillna(0).to_numpy()
+            prior = self.survival_coarse.reindex(
+                pd.MultiIndex.from_arrays([result['Pclass'], result['Sex']])).fillna(self.survival_global).to_numpy()
+            rate = (fine[:, 0] + SMOOTHING * prior) / (fine[:, 1] + SMOOTHING)
+            result.insert(1, 'Survived', (rng.random(n) < rate).astype('int8'))
+        
+        # Faltantes de edad según clase y cabina conocida
+        missing = self.age_missing.reindex(pd.MultiIndex.from_arrays([result['Pclass'], has_cabin])).fillna(0)
+        result.loc[rng.random(n) < missing.to_numpy(), 'Age'] = np.nan
+        return result[[col for col in COLUMNS if col in result.columns]]
+    
+    def write(self, path, n_rows: int, chunk_size: int = 250_000, n_jobs: int = None,
+              random_state=None) -> dict:
+        """
+        Escribe un manifiesto de `n_rows` pasajeros en CSV o Parquet (según
+        la extensión). Los bloques se generan en paralelo, cada uno con su
+        propia semilla derivada de `random_state`, por lo que el archivo es
+        el mismo con cualquier `n_jobs`; se escriben en orden y solo hay unos
+        pocos bloques en memoria a la vez.
+
+        Args:
+            path (str o Path): Archivo de destino (.csv o .parquet)
+            n_rows (int): Número de pasajeros
+            chunk_size (int): Pasajeros por bloque
+            n_jobs (int, opcional): Procesos; por defecto, uno por CPU. Con 1
+                se genera en el proceso actual.
+            random_state (int, opcional): Semilla; por defecto, la de la instancia
+
+        Returns:
+            dict: Filas, bloques, segundos y filas por segundo
+        """
+        path = Path(path)
+        parquet = path.suffix == '.parquet'
+        if parquet and not PARQUET_DISPONIBLE:
+            raise ImportError("Escribir Parquet requiere pyarrow")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        seed = np.random.SeedSequence(self.random_state if random_state is None else random_state)
+        starts = list(range(0, n_rows, chunk_size))
+        tasks = [(min(chunk_size, n_rows - start), child, start + 1, start == 0, parquet)
+                 for start, child in zip(starts, seed.spawn(len(starts)))]
+        if n_jobs is None:
+            n_jobs = min(len(tasks), os.cpu_count() or 1)
+        
+        start_time = time.perf_counter()
+        writer = None
+        with open(path, 'wb') as f:
+            if n_jobs <= 1:
+                chunks = (_generate_chunk(self, *task) for task in tasks)
+                writer = _write_chunks(f, chunks, parquet)
+            else:
+                with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                    # Ventana acotada de bloques pendientes para limitar la memoria
+                    window = 2 * n_jobs
+                    def chunks():
+                        pending = [pool.submit(_generate_chunk, self, *task) for task in tasks[:window]]
+                        for i in range(len(tasks)):
+                            if i + window < len(tasks):
+                                pending.append(pool.submit(_generate_chunk, self, *tasks[i + window]))
+                            yield pending[i].result()
+                            pending[i] = None
+                    writer = _write_chunks(f, chunks(), parquet)
+            if writer is not None:
+                writer.close()
+        seconds = time.perf_counter() - start_time
+        
+        return {
+            'rows': n_rows,
+            'chunks': len(tasks),
+            'seconds': seconds,
+            'rows_per_second': n_rows / seconds if seconds > 0 else float('nan')
+        }
+
+def _generate_chunk(generator, n, seed, start_id, header, parquet):
+    """
+    Genera un bloque en un worker: bytes CSV o una tabla Arrow.
+
+    Args:
+        generator (TitanicSyntheticGenerator): Generador ajustado
+        n (int): Pasajeros del bloque
+        seed (np.random.SeedSequence): Semilla del bloque
+        start_id (int): PassengerId del primer pasajero
+        header (bool): Incluir la cabecera CSV
+        parquet (bool): Devolver una tabla Arrow en lugar de CSV
+
+    Returns:
+        bytes o pyarrow.Table: Bloque serializado
+    """
+    df = generator.sample(n, seed, start_id)
+    if parquet:
+        import pyarrow as pa
+        return pa.Table.from_pandas(df, preserve_index=False)
+    return df.to_csv(header=header, index=False).encode('utf-8')
+
+def _write_chunks(f, chunks, parquet):
+    """
+    Escribe los bloques en orden en el archivo abierto.
+
+    Returns:
+        pyarrow.parquet.ParquetWriter o None: Escritor Parquet a cerrar
+    """
+    writer = None
+    for chunk in chunks:
+        if parquet:
+            import pyarrow.parquet as pq
+            if writer is None:
+                writer = pq.ParquetWriter(f, chunk.schema)
+            writer.write_table(chunk)
+        else:
+            f.write(chunk)
+    return writer
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).parent.parent
+    
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    output = sys.argv[2] if len(sys.argv) > 2 else base_dir / 'datasets' / 'synthetic' / f'train_{n_rows}.csv'
+    
+    generator = TitanicSyntheticGenerator().fit(pd.read_csv(base_dir / 'datasets' / 'train.csv'))
+    metrics = generator.write(output, n_rows)
+    print(f"✅ {metrics['rows']} pasajeros sintéticos escritos en {output}")
+    print(f"⏱️ {metrics['rows_per_second']:.0f} filas/s en {metrics['chunks']} bloques")
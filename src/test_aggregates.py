@@ -0,0 +1,63 @@
+"""
+Pruebas para el cubo de agregados del Titanic.
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+def test_survival_cube_matches_groupby():
+    """Prueba que las estadísticas del cubo coinciden con groupby sobre las filas."""
+    from data_loader import cargar_datos
+    from aggregates import SurvivalCube, BANDAS_EDAD
+    
+    df = cargar_datos(usar_cache=False)
+    cubo = SurvivalCube.from_frame(df)
+    
+    assert cubo.survival()['count'].iloc[0] == len(df)
+    for dim in ['Pclass', 'Sex', 'FamilySize']:
+        esperado = df.groupby(dim, observed=True)['Survived'].mean()
+        np.testing.assert_allclose(cubo.survival(dim)['rate'], esperado)
+    esperado = df.groupby(pd.cut(df['Age'], bins=BANDAS_EDAD), observed=True)['Survived'].mean()
+    np.testing.assert_allclose(cubo.survival('AgeBand')['rate'], esperado)
+    np.testing.assert_allclose(cubo.mean('Fare', 'Pclass'), df.groupby('Pclass')['Fare'].mean(), rtol=1e-6)
+    assert np.isclose(cubo.fare_quantile(0.5), df['Fare'].median())
+    print("✅ Cubo de agregados coincide con groupby")
+
+def test_survival_cube_incremental_updates():
+    """Prueba que actualizar el cubo por lotes equivale a construirlo completo."""
+    from data_loader import cargar_datos
+    from aggregates import SurvivalCube
+    
+    df = cargar_datos(usar_cache=False)
+    completo = SurvivalCube.from_frame(df)
+    incremental = SurvivalCube.from_frame(df.iloc[:300])
+    for inicio in range(300, len(df), 250):
+        incremental = incremental.update(df.iloc[inicio:inicio + 250])
+    
+    pd.testing.assert_frame_equal(incremental.cells, completo.cells.sort_index(), check_exact=False)
+    assert incremental.fare_range() == completo.fare_range() == (df['Fare'].min(), df['Fare'].max())
+    assert np.isclose(incremental.fare_quantile(0.5), df['Fare'].median())
+    assert np.isclose(incremental.var('Age'), df['Age'].astype('float64').var())
+    np.testing.assert_allclose(incremental.std('Fare', 'Pclass'),
+                               df['Fare'].astype('float64').groupby(df['Pclass']).std())
+    
+    # Con muchas tarifas distintas el cubo guarda solo sketches de tamaño acotado
+    rng = np.random.default_rng(0)
+    grande = pd.concat([df] * 50, ignore_index=True)
+    grande['Fare'] = grande['Fare'] * rng.uniform(0.9, 1.1, len(grande))
+    cubo = SurvivalCube.from_chunks(grande.iloc[inicio:inicio + 5000] for inicio in range(0, len(grande), 5000))
+    guardados = sum(len(items) for sketch in cubo.fare_sketches.values() for items in sketch.levels)
+    assert guardados < len(grande) / 5
+    assert abs((grande['Fare'] <= cubo.fare_quantile(0.5)).mean() - 0.5) < 0.01
+    assert cubo.fare_range() == (grande['Fare'].min(), grande['Fare'].max())
+    print("✅ Actualización incremental del cubo coincide con el cubo completo")
+
+if __name__ == "__main__":
+    test_survival_cube_matches_groupby()
+    test_survival_cube_incremental_updates()
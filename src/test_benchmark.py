@@ -0,0 +1,44 @@
+"""
+Pruebas para la suite de benchmarks.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+def test_benchmark_etapas_smoke():
+    """Prueba benchmark_etapas a escala 1 y el JSON que lee comparar_benchmarks."""
+    import json
+    from benchmark import benchmark_etapas, comparar_benchmarks
+    
+    etapas = ['cargar_datos', 'preparar_datos', 'feature_engineering', 'preprocesador_fit',
+              'preprocesador_transform', 'modelado', 'reporte']
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / 'etapas.json'
+        # max_filas_memoria < 891 obliga a escribir el manifiesto reducido
+        resultados = benchmark_etapas(factores=(1,), max_filas_memoria=300, max_filas_modelado=200,
+                                      opciones_modelado={'cv': 2, 'n_jobs': 1}, ruta_salida=ruta)
+        contenido = json.loads(ruta.read_text(encoding='utf-8'))
+        comparacion = comparar_benchmarks(ruta, ruta)
+    
+    assert list(resultados['etapa']) == etapas
+    assert set(contenido) == {'commit', 'fecha', 'python', 'plataforma', 'cpus', 'parametros', 'resultados'}
+    assert contenido['parametros']['max_filas_memoria'] == 300
+    assert all(set(fila) == {'factor', 'etapa', 'filas', 'segundos', 'pico_memoria_mb'}
+               for fila in contenido['resultados'])
+    filas = {fila['etapa']: fila['filas'] for fila in contenido['resultados']}
+    assert filas['cargar_datos'] == 300 and filas['modelado'] == 200 and filas['reporte'] == 891
+    assert all(fila['segundos'] > 0 for fila in contenido['resultados'])
+    
+    assert list(comparacion.index) == [(1, etapa) for etapa in etapas]
+    assert list(comparacion.columns) == ['segundos_base', 'pico_memoria_mb_base', 'segundos_nuevo',
+                                         'pico_memoria_mb_nuevo', 'cociente_segundos', 'cociente_memoria']
+    assert (comparacion['cociente_segundos'] == 1).all()
+    print("✅ Benchmark por etapas y comparación correctos")
+
+if __name__ == "__main__":
+    test_benchmark_etapas_smoke()
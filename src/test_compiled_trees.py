@@ -0,0 +1,50 @@
+"""
+Pruebas para los ensembles de árboles compilados.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from feature_engineering import TitanicFeatureEngineering
+from preprocessor import TitanicPreprocessor
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def test_compiled_trees_match_libraries():
+    """Prueba que los ensembles compilados reproducen predict_proba de cada librería."""
+    from sklearn.ensemble import RandomForestClassifier
+    from xgboost import XGBClassifier
+    import lightgbm as lgb
+    from compiled_trees import CompiledTreeEnsemble
+    
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    X = TitanicPreprocessor().fit_transform(TitanicFeatureEngineering().fit_transform(train))
+    y = train['Survived']
+    rng = np.random.RandomState(0)
+    X_ruido = X + rng.normal(0, 0.1, X.shape)
+    X_ruido[rng.rand(*X.shape) < 0.05] = np.nan
+    
+    modelos = [
+        RandomForestClassifier(n_estimators=20, random_state=0),
+        XGBClassifier(n_estimators=20, max_depth=4),
+        lgb.LGBMClassifier(n_estimators=20, verbose=-1)
+    ]
+    for modelo in modelos:
+        modelo.fit(X, y)
+        compilado = CompiledTreeEnsemble.from_model(modelo)
+        with tempfile.TemporaryDirectory() as tmp:
+            compilado.save(Path(tmp) / 'arboles.npz')
+            compilado = CompiledTreeEnsemble.load(Path(tmp) / 'arboles.npz')
+        datos = X_ruido if not isinstance(modelo, RandomForestClassifier) else np.nan_to_num(X_ruido)
+        np.testing.assert_allclose(compilado.predict_proba(datos), modelo.predict_proba(datos), atol=1e-6)
+    print("✅ Ensembles compilados coinciden con las librerías")
+
+if __name__ == "__main__":
+    test_compiled_trees_match_libraries()
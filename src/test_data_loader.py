@@ -0,0 +1,95 @@
+"""
+Pruebas para la carga y caché de datos del Titanic.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def test_chunked_statistics_bounded():
+    """Prueba que las estadísticas por bloques son exactas en train.csv y acotadas con muchas filas."""
+    from data_loader import ESQUEMA_DTYPES, calcular_estadisticas, calcular_estadisticas_por_chunks
+    from synthetic import TitanicSyntheticGenerator
+    
+    train = pd.read_csv(DATA_DIR / 'train.csv', dtype=ESQUEMA_DTYPES)
+    exactas = calcular_estadisticas(train)
+    por_bloques = calcular_estadisticas_por_chunks(DATA_DIR / 'train.csv', chunksize=100)
+    assert por_bloques['embarked_mode'] == exactas['embarked_mode']
+    for clave in ['age_median', 'fare_median', 'fare_bins']:
+        np.testing.assert_allclose(por_bloques[clave], exactas[clave])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        TitanicSyntheticGenerator().fit(pd.read_csv(DATA_DIR / 'train.csv')).write(
+            Path(tmp) / 'grande.csv', 100_000, n_jobs=1)
+        grande = pd.read_csv(Path(tmp) / 'grande.csv', dtype=ESQUEMA_DTYPES)
+        estadisticas = calcular_estadisticas_por_chunks(Path(tmp) / 'grande.csv', chunksize=10_000)
+    # Error de rango de las medianas y de los cortes de tarifa
+    assert abs((grande['Age'].dropna() <= estadisticas['age_median']).mean() - 0.5) < 0.01
+    tarifas = grande['Fare'].fillna(estadisticas['fare_median'])
+    for q, corte in zip([0.25, 0.5, 0.75], estadisticas['fare_bins'][1:-1]):
+        assert abs((tarifas <= corte).mean() - q) < 0.01
+    print("✅ Estadísticas por bloques exactas en train.csv y acotadas en manifiestos grandes")
+
+def test_parquet_cache_invalidation():
+    """Prueba que la caché Parquet acierta, se invalida con el origen o el código y respeta otros archivos."""
+    import shutil
+    import pytest
+    import data_loader
+    
+    # Sin pyarrow la caché está desactivada: se omite en lugar de pasar sin probar nada
+    pytest.importorskip('pyarrow')
+    directorio_original = data_loader.CACHE_DIR
+    version_original = data_loader._version_preparacion
+    preparar_original = data_loader.preparar_datos
+    with tempfile.TemporaryDirectory() as tmp:
+        data_loader.CACHE_DIR = Path(tmp) / 'cache'
+        origen, vecino = Path(tmp) / 'a.csv', Path(tmp) / 'a-b.csv'
+        shutil.copy(DATA_DIR / 'train.csv', origen)
+        shutil.copy(DATA_DIR / 'train.csv', vecino)
+        try:
+            def entradas():
+                return sorted(ruta.name for ruta in data_loader.CACHE_DIR.iterdir())
+            
+            esperado = data_loader.cargar_datos(file_path=origen)
+            data_loader.cargar_datos(file_path=vecino)
+            assert len(entradas()) == 2
+            
+            # Acierto: no se vuelve a preparar
+            def sin_preparar(*args, **kwargs):
+                raise AssertionError("preparar_datos no debería ejecutarse")
+            data_loader.preparar_datos = sin_preparar
+            pd.testing.assert_frame_equal(data_loader.cargar_datos(file_path=origen), esperado)
+            data_loader.preparar_datos = preparar_original
+            
+            # Cambia el origen: nueva entrada, se elimina la de a.csv y se conserva la de a-b.csv
+            previas = entradas()
+            fila = (DATA_DIR / 'train.csv').read_text(encoding='utf-8').splitlines()[1]
+            with open(origen, 'a', encoding='utf-8') as f:
+                f.write(fila + '\n')
+            assert len(data_loader.cargar_datos(file_path=origen)) == len(esperado) + 1
+            nuevas = entradas()
+            assert len(nuevas) == 2 and nuevas != previas
+            assert [n for n in nuevas if n.startswith('a-b-')] == [n for n in previas if n.startswith('a-b-')]
+            
+            # Cambia el código de preparación: nueva entrada para el mismo origen
+            data_loader._version_preparacion = lambda: 'f' * 16
+            data_loader.cargar_datos(file_path=origen)
+            assert any(n.startswith('a-') and n.endswith('-' + 'f' * 16 + '.parquet') for n in entradas())
+            assert len(entradas()) == 2 and not any(n.endswith('.tmp') for n in entradas())
+        finally:
+            data_loader.CACHE_DIR = directorio_original
+            data_loader._version_preparacion = version_original
+            data_loader.preparar_datos = preparar_original
+    print("✅ Caché Parquet acierta e invalida correctamente")
+
+if __name__ == "__main__":
+    test_chunked_statistics_bounded()
+    test_parquet_cache_invalidation()
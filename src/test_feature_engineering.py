@@ -0,0 +1,74 @@
+"""
+Pruebas para el módulo de feature engineering del Titanic.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from feature_engineering import TitanicFeatureEngineering
+from preprocessor import TitanicPreprocessor
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def test_extract_titles_parity():
+    """Prueba que la extracción vectorizada coincide con `extract_title`."""
+    fe = TitanicFeatureEngineering()
+    for archivo in ['train.csv', 'test.csv']:
+        nombres = pd.read_csv(DATA_DIR / archivo)['Name']
+        esperado = nombres.apply(fe.extract_title)
+        pd.testing.assert_series_equal(fe.extract_titles(nombres), esperado)
+        pd.testing.assert_series_equal(fe.extract_titles(nombres.astype('category')), esperado)
+    print("✅ Extracción vectorizada de títulos coincide con extract_title")
+
+def test_fit_transform_reuses_train_bins():
+    """Prueba que los bins aprendidos en train equivalen a qcut y se reutilizan en test."""
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    test = pd.read_csv(DATA_DIR / 'test.csv')
+    fe = TitanicFeatureEngineering()
+    # Sin ajustar, transform no aprende los bins del lote que recibe
+    try:
+        fe.transform(test)
+        raise AssertionError("transform sin fit debería fallar")
+    except ValueError:
+        pass
+    
+    train_fe = fe.fit_transform(train)
+    esperado = pd.qcut(train['Fare'], q=4, labels=['Low', 'Medium', 'High', 'VeryHigh'])
+    assert (train_fe['FareBin'].astype(str) == esperado.astype(str)).all()
+    
+    test_fe = fe.transform(test)
+    esperado = pd.cut(test['Fare'], bins=fe.fare_bins, labels=['Low', 'Medium', 'High', 'VeryHigh'])
+    # La tarifa faltante de test conserva un bin vacío
+    pd.testing.assert_series_equal(test_fe['FareBin'].astype(object), esperado.astype(object), check_names=False)
+    print("✅ fit/transform reutiliza los bins de entrenamiento")
+
+def test_artifacts_roundtrip():
+    """Prueba que los artefactos guardados reproducen las transformaciones."""
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    test = pd.read_csv(DATA_DIR / 'test.csv')
+    fe = TitanicFeatureEngineering()
+    preprocessor = TitanicPreprocessor()
+    preprocessor.fit(fe.fit_transform(train))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        fe.save(Path(tmp) / 'features.json')
+        preprocessor.save(Path(tmp) / 'preprocessor.joblib')
+        fe_cargado = TitanicFeatureEngineering.load(Path(tmp) / 'features.json')
+        preprocessor_cargado = TitanicPreprocessor.load(Path(tmp) / 'preprocessor.joblib')
+    
+    pd.testing.assert_frame_equal(fe_cargado.transform(test), fe.transform(test))
+    np.testing.assert_array_equal(preprocessor_cargado.transform(fe.transform(test)),
+                                  preprocessor.transform(fe.transform(test)))
+    print("✅ Artefactos de feature engineering y preprocesamiento reproducibles")
+
+if __name__ == "__main__":
+    test_extract_titles_parity()
+    test_fit_transform_reuses_train_bins()
+    test_artifacts_roundtrip()
@@ -0,0 +1,154 @@
+"""
+Pruebas para la generación del reporte del Titanic.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+def test_figure_key_tracks_helper_code():
+    """Prueba que editar un auxiliar del módulo de una figura cambia su clave de caché."""
+    import importlib
+    from data_loader import cargar_datos
+    from aggregates import SurvivalCube
+    from generate_report import _figure_key
+    
+    cubo = SurvivalCube.from_frame(cargar_datos(usar_cache=False))
+    codigo = ("def _titulo():\n    return {titulo!r}\n\n"
+              "def plot_prueba(cubo):\n    return _titulo()\n\n"
+              "def plot_otra(cubo):\n    return _titulo()\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        modulo_path = Path(tmp) / 'figuras_prueba.py'
+        modulo_path.write_text(codigo.format(titulo='Supervivencia'), encoding='utf-8')
+        sys.path.insert(0, tmp)
+        try:
+            modulo = importlib.import_module('figuras_prueba')
+            clave = _figure_key(modulo.plot_prueba, cubo, {})
+            assert _figure_key(modulo.plot_prueba, cubo, {}) == clave
+            # Cada figura del módulo tiene su propia clave
+            assert _figure_key(modulo.plot_otra, cubo, {}) != clave
+            # Solo cambia el auxiliar; el código de plot_prueba es el mismo
+            modulo_path.write_text(codigo.format(titulo='Supervivientes'), encoding='utf-8')
+            modulo = importlib.reload(modulo)
+            assert _figure_key(modulo.plot_prueba, cubo, {}) != clave
+        finally:
+            sys.path.remove(tmp)
+            sys.modules.pop('figuras_prueba', None)
+    print("✅ La clave de las figuras cambia con el código de sus auxiliares")
+
+def test_figure_cache_hits_and_rerenders():
+    """Prueba que la caché de figuras reutiliza los PNG y vuelve a generarlos si cambia la clave."""
+    import generate_report
+    from data_loader import cargar_datos
+    from aggregates import SurvivalCube
+    
+    df = cargar_datos(usar_cache=False)
+    render_original = generate_report._render_figure
+    directorio_original = generate_report.FIGURE_CACHE_DIR
+    generadas = []
+    
+    def render_contado(plot_func, datos, filepath, rc):
+        generadas.append(filepath.stem)
+        return render_original(plot_func, datos, filepath, rc)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_report._render_figure = render_contado
+        generate_report.FIGURE_CACHE_DIR = Path(tmp) / 'figuras'
+        try:
+            analyzer = generate_report.TitanicAnalyzer(output_dir=Path(tmp) / 'output',
+                                                       aggregates_dir=Path(tmp) / 'agregados')
+            analyzer.cube = SurvivalCube.from_frame(df.iloc[:800])
+            analyzer.generate_visualizations(n_jobs=1)
+            primeras = {nombre: Path(ruta).read_bytes() for nombre, ruta in analyzer.results['plots'].items()}
+            entradas = set(generate_report.FIGURE_CACHE_DIR.glob('*.png'))
+            assert len(generadas) == 5 and len(entradas) == 5
+            
+            # Acierto: se copian los PNG en caché sin generarlos
+            for ruta in analyzer.results['plots'].values():
+                Path(ruta).unlink()
+            analyzer.generate_visualizations(n_jobs=1)
+            assert len(generadas) == 5
+            assert {nombre: Path(ruta).read_bytes() for nombre, ruta in analyzer.results['plots'].items()} == primeras
+            
+            # Otros datos cambian la clave de todas las figuras y las nuevas
+            # entradas reemplazan a las de la misma función; sin caché se
+            # generan siempre
+            analyzer.cube = analyzer.cube.update(df.iloc[800:])
+            analyzer.generate_visualizations(n_jobs=1)
+            nuevas = set(generate_report.FIGURE_CACHE_DIR.glob('*.png'))
+            assert len(generadas) == 10 and len(nuevas) == 5 and not nuevas & entradas
+            assert {ruta.name.rsplit('-', 1)[0] for ruta in nuevas} == {ruta.name.rsplit('-', 1)[0] for ruta in entradas}
+            analyzer.generate_visualizations(n_jobs=1, use_cache=False)
+            assert len(generadas) == 15
+        finally:
+            generate_report._render_figure = render_original
+            generate_report.FIGURE_CACHE_DIR = directorio_original
+    print("✅ Caché de figuras reutiliza y regenera correctamente")
+
+def test_pool_renders_same_png_as_serial():
+    """Prueba que las figuras generadas en el pool son idénticas byte a byte a las generadas en serie."""
+    import generate_report
+    from data_loader import cargar_datos
+    from aggregates import SurvivalCube
+    
+    directorio_original = generate_report.FIGURE_CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_report.FIGURE_CACHE_DIR = Path(tmp) / 'figuras'
+        try:
+            analyzer = generate_report.TitanicAnalyzer(output_dir=Path(tmp) / 'output',
+                                                       aggregates_dir=Path(tmp) / 'agregados')
+            analyzer.cube = SurvivalCube.from_frame(cargar_datos(usar_cache=False))
+            analyzer.generate_visualizations(n_jobs=1, use_cache=False)
+            en_serie = {nombre: Path(ruta).read_bytes() for nombre, ruta in analyzer.results['plots'].items()}
+            for ruta in analyzer.results['plots'].values():
+                Path(ruta).unlink()
+            analyzer.generate_visualizations(n_jobs=2, use_cache=False)
+            en_pool = {nombre: Path(ruta).read_bytes() for nombre, ruta in analyzer.results['plots'].items()}
+        finally:
+            generate_report.FIGURE_CACHE_DIR = directorio_original
+    
+    assert len(en_serie) == 5
+    for nombre, png in en_serie.items():
+        assert en_pool[nombre] == png, nombre
+    print("✅ Figuras del pool idénticas a las generadas en serie")
+
+def test_report_age_bands_without_passengers():
+    """Prueba que el reporte asigna cada tasa a su banda de edad aunque falten bandas."""
+    import io
+    import contextlib
+    import generate_report
+    from data_loader import cargar_datos
+    from aggregates import SurvivalCube
+    
+    df = cargar_datos(usar_cache=False)
+    # Sin menores de 19 años: las dos primeras bandas quedan vacías
+    adultos = df[(df['Age'] > 18) | df['Age'].isna()]
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = generate_report.TitanicAnalyzer(output_dir=Path(tmp) / 'output',
+                                                   aggregates_dir=Path(tmp) / 'agregados')
+        analyzer.cube = SurvivalCube.from_frame(adultos)
+        analyzer.calculate_statistics()
+        analyzer.results['plots'] = {
+            nombre: str(Path(tmp) / 'output' / 'images' / f'{nombre}.png')
+            for nombre in ['supervivencia_general', 'supervivencia_clase', 'piramide_edad_genero',
+                           'analisis_familias', 'analisis_tarifas']
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer.generate_report()
+        reporte = (Path(tmp) / 'output' / 'titanic_analysis_report.md').read_text(encoding='utf-8')
+    
+    jovenes = adultos[(adultos['Age'] > 18) & (adultos['Age'] <= 35)]['Survived'].mean() * 100
+    assert '**Niños (0-12 años)**: nan%' in reporte
+    assert '**Adolescentes (13-18)**: nan%' in reporte
+    assert f'**Adultos Jóvenes (19-35)**: {jovenes:.1f}%' in reporte
+    print("✅ Reporte con bandas de edad vacías correcto")
+
+if __name__ == "__main__":
+    test_figure_key_tracks_helper_code()
+    test_figure_cache_hits_and_rerenders()
+    test_pool_renders_same_png_as_serial()
+    test_report_age_bands_without_passengers()
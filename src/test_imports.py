@@ -41,6 +41,26 @@ def test_data_loader():
         print(f"❌ Error en carga de datos: {str(e)}")
         return False
 
+def test_data_loader_chunks():
+    """Prueba que la carga por bloques coincide con la carga completa."""
+    from data_loader import cargar_datos, cargar_datos_por_chunks
+    df = cargar_datos()
+    df_chunks = pd.concat(cargar_datos_por_chunks(chunksize=100), ignore_index=True)
+    pd.testing.assert_frame_equal(df_chunks, df)
+    print("✅ Carga por bloques coincide con la carga completa")
+
+def test_lazy_heavy_imports():
+    """Prueba que importar los módulos de datos y de servicio no carga dependencias pesadas."""
+    import subprocess
+    
+    codigo = ("import sys, data_loader, aggregates, eda, compiled_trees, serving; "
+              "print(','.join(m for m in ['matplotlib', 'seaborn', 'xgboost', 'lightgbm', 'IPython'] "
+              "if m in sys.modules))")
+    salida = subprocess.run([sys.executable, '-c', codigo], cwd=Path(__file__).parent,
+                            capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == ''
+    print("✅ Las dependencias pesadas se importan al usarse")
+
 def test_visualization():
     """Prueba las funciones de visualización."""
     try:
@@ -0,0 +1,77 @@
+"""
+Pruebas para la inferencia por lotes del Titanic.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from feature_engineering import TitanicFeatureEngineering
+from preprocessor import TitanicPreprocessor
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def _predictor_logistico(train):
+    """Entrena una regresión logística sobre `train` y la envuelve en un TitanicPredictor."""
+    from sklearn.dummy import DummyClassifier
+    from sklearn.linear_model import LogisticRegression
+    from data_loader import aplicar_esquema
+    from inference import TitanicPredictor
+    
+    preparado = aplicar_esquema(train)
+    fe = TitanicFeatureEngineering().fit(preparado)
+    X = TitanicPreprocessor(imputer='group_median').fit_transform(fe.transform(preparado))
+    modelo = LogisticRegression(solver='liblinear').fit(X, train['Survived'])
+    results = {'constante': {'model': DummyClassifier().fit(X, train['Survived']), 'best_score': 0.6},
+               'logistic': {'model': modelo, 'best_score': 0.8}}
+    predictor = TitanicPredictor.from_results(results, train,
+                                              preprocessor=TitanicPreprocessor(imputer='group_median'))
+    return predictor, modelo.predict_proba(X)[:, 1]
+
+def test_predictor_from_results():
+    """Prueba que from_results elige el mejor modelo y reproduce el pipeline de entrenamiento."""
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    predictor, esperado = _predictor_logistico(train)
+    
+    assert predictor.model_name == 'logistic' and predictor.preprocessor.pipeline is not None
+    np.testing.assert_allclose(predictor.predict_proba_frame(train), esperado)
+    print("✅ TitanicPredictor.from_results correcto")
+
+def test_predictor_batches_and_roundtrip():
+    """Prueba que la puntuación por lotes y el predictor guardado coinciden con una pasada única."""
+    from inference import TitanicPredictor
+    
+    predictor, _ = _predictor_logistico(pd.read_csv(DATA_DIR / 'train.csv'))
+    test = pd.read_csv(DATA_DIR / 'test.csv')
+    esperado = predictor.predict_proba_frame(test)
+    
+    desde_csv = pd.concat(predictor.predict_batches(DATA_DIR / 'test.csv', batch_size=100))
+    bloques = (test.iloc[inicio:inicio + 37] for inicio in range(0, len(test), 37))
+    reagrupado = list(predictor.predict_batches(bloques, batch_size=128))
+    assert [len(lote) for lote in reagrupado] == [128, 128, 128, 34]
+    for predicciones in [desde_csv, pd.concat(reagrupado)]:
+        np.testing.assert_allclose(predicciones['Probability'], esperado)
+        np.testing.assert_array_equal(predicciones['PassengerId'], test['PassengerId'])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        metricas = predictor.predict(DATA_DIR / 'test.csv', Path(tmp) / 'pred.csv', batch_size=100)
+        escrito = pd.read_csv(Path(tmp) / 'pred.csv')
+        predictor.save(Path(tmp) / 'modelo')
+        cargado = TitanicPredictor.load(Path(tmp) / 'modelo')
+    assert metricas['rows'] == len(test) and metricas['batches'] == 5
+    assert np.isnan(metricas['peak_memory_mb']) or metricas['peak_memory_mb'] > 0
+    assert list(escrito.columns) == ['PassengerId', 'Survived']
+    np.testing.assert_array_equal(escrito['Survived'], (esperado >= 0.5).astype(int))
+    assert cargado.model_name == 'logistic'
+    np.testing.assert_allclose(cargado.predict_proba_frame(test), esperado)
+    print("✅ Predicción por lotes y guardado de TitanicPredictor correctos")
+
+if __name__ == "__main__":
+    test_predictor_from_results()
+    test_predictor_batches_and_roundtrip()
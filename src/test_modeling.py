@@ -0,0 +1,218 @@
+"""
+Pruebas para el modelado del Titanic.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from feature_engineering import TitanicFeatureEngineering
+from preprocessor import TitanicPreprocessor
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def test_memmapped_folds_match_in_memory():
+    """Prueba que los folds en memmap puntúan igual que en memoria y se borran tras la búsqueda."""
+    import io
+    import warnings
+    import contextlib
+    from sklearn.model_selection import ParameterGrid, StratifiedKFold
+    from modeling import TitanicModeling
+    
+    df = pd.read_csv(DATA_DIR / 'train.csv')
+    X = TitanicPreprocessor(imputer='group_median').fit_transform(TitanicFeatureEngineering().fit_transform(df))
+    y = df['Survived'].to_numpy()
+    modeling = TitanicModeling()
+    modeling.param_grids = {
+        'logistic': {'C': [0.1, 1], 'solver': ['liblinear']},
+        'random_forest': {'n_estimators': [20], 'max_depth': [3, None]},
+        'xgboost': {'n_estimators': [20], 'max_depth': [3]},
+        'lightgbm': {'n_estimators': [20], 'max_depth': [3], 'verbose': [-1]}
+    }
+    candidates = {name: list(ParameterGrid(grid)) for name, grid in modeling.param_grids.items()}
+    splitter = StratifiedKFold(n_splits=3, shuffle=True, random_state=0)
+    with warnings.catch_warnings(), tempfile.TemporaryDirectory() as tmp:
+        warnings.simplefilter('ignore')
+        folds = modeling._prepare_folds(X, y, splitter, None, Path(tmp))
+        assert all(isinstance(matriz, np.memmap) for fold in folds for matriz in fold.values())
+        en_memoria = [{clave: np.array(matriz) for clave, matriz in fold.items()} for fold in folds]
+        esperado = modeling._score_candidates(candidates, en_memoria, n_jobs=2)
+        obtenido = modeling._score_candidates(candidates, folds, n_jobs=2)
+        del folds
+    
+        # Los volcados de joblib viven en un TemporaryDirectory dentro de work_dir
+        # que se borra al terminar
+        directorios = []
+        preparar_folds = modeling._prepare_folds
+        def registrar_folds(X, y, splitter, preprocessor, cache_dir, **kwargs):
+            directorios.append(cache_dir)
+            return preparar_folds(X, y, splitter, preprocessor, cache_dir, **kwargs)
+        modeling._prepare_folds = registrar_folds
+        for search in ['shared', 'halving']:
+            with contextlib.redirect_stdout(io.StringIO()):
+                modeling.train_and_evaluate(X, y, cv=2, search=search, n_jobs=2, work_dir=tmp)
+            assert directorios[-1].parent == Path(tmp) and directorios[-1].name.startswith('titanic_folds_')
+            assert not directorios[-1].exists(), search
+    
+    for name in candidates:
+        np.testing.assert_array_equal(obtenido[name], esperado[name])
+    print("✅ Folds en memmap equivalentes a los de memoria y borrados tras la búsqueda")
+
+def test_shared_search_matches_grid():
+    """Prueba que la búsqueda compartida elige los mismos parámetros y puntuaciones que GridSearchCV."""
+    import io
+    import warnings
+    import contextlib
+    from modeling import TitanicModeling
+    
+    df = pd.read_csv(DATA_DIR / 'train.csv')
+    X = TitanicPreprocessor(imputer='group_median').fit_transform(TitanicFeatureEngineering().fit_transform(df))
+    y = df['Survived'].to_numpy()
+    modeling = TitanicModeling()
+    modeling.param_grids = {
+        'logistic': {'C': [0.01, 0.1, 1, 10], 'solver': ['liblinear']},
+        'random_forest': {'n_estimators': [20], 'max_depth': [2, 4, 8, None]},
+        'xgboost': {'n_estimators': [20], 'max_depth': [2, 4, 6]},
+        'lightgbm': {'n_estimators': [20], 'max_depth': [2, 4], 'verbose': [-1]}
+    }
+    # Mismo random_state y cv: ambas estrategias ven los mismos folds
+    with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter('ignore')
+        shared = modeling.train_and_evaluate(X, y, cv=3, search='shared', n_jobs=2)
+        grid = modeling.train_and_evaluate(X, y, cv=3, search='grid', n_jobs=2)
+    
+    for name in modeling.models:
+        assert shared[name]['best_params'] == grid[name]['best_params'], name
+        assert np.isclose(shared[name]['best_score'], grid[name]['best_score']), name
+    print("✅ Búsqueda compartida equivalente a GridSearchCV")
+
+def test_halving_prunes_to_grid_best():
+    """Prueba que halving descarta candidatos por ronda y llega al mejor de la rejilla."""
+    import io
+    import warnings
+    import contextlib
+    from modeling import TitanicModeling
+    
+    df = pd.read_csv(DATA_DIR / 'train.csv')
+    X = TitanicPreprocessor(imputer='group_median').fit_transform(TitanicFeatureEngineering().fit_transform(df))
+    y = df['Survived'].to_numpy()
+    modeling = TitanicModeling()
+    modeling.models = {'logistic': modeling.models['logistic']}
+    # Ocho regularizaciones que se quedan en la clase mayoritaria y una buena
+    modeling.param_grids = {
+        'logistic': {'C': [1e-8, 1e-7, 1e-6, 1e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1], 'solver': ['liblinear']}
+    }
+    
+    rondas = []
+    puntuar_candidatos = modeling._score_candidates
+    def registrar_ronda(candidates, folds, n_jobs, early_stopping_rounds=None, n_samples=None):
+        rondas.append((len(candidates['logistic']), n_samples))
+        return puntuar_candidatos(candidates, folds, n_jobs, early_stopping_rounds, n_samples)
+    modeling._score_candidates = registrar_ronda
+    
+    with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter('ignore')
+        halving = modeling.train_and_evaluate(X, y, cv=3, search='halving', n_jobs=2, factor=3)
+        grid = modeling.train_and_evaluate(X, y, cv=3, search='grid', n_jobs=2)
+    
+    # 9 -> 3 -> 1 candidatos con el triple de filas en cada ronda; la última usa los folds completos
+    assert [candidatos for candidatos, _ in rondas] == [9, 3, 1]
+    assert rondas[0][1] * 9 == rondas[-1][1] == 594
+    assert halving['logistic']['best_params'] == grid['logistic']['best_params']
+    assert np.isclose(halving['logistic']['best_score'], grid['logistic']['best_score'])
+    print("✅ Halving descarta candidatos y coincide con el mejor de la rejilla")
+
+def test_out_of_core_boosting():
+    """Prueba que XGBoost y LightGBM entrenan por bloques desde disco."""
+    import warnings
+    from modeling import TitanicModeling
+    from data_loader import ESQUEMA_DTYPES
+    
+    bloques = pd.read_csv(DATA_DIR / 'train.csv', dtype=ESQUEMA_DTYPES, chunksize=300)
+    with warnings.catch_warnings(), tempfile.TemporaryDirectory() as tmp:
+        warnings.simplefilter('ignore')
+        results = TitanicModeling().train_out_of_core(bloques, validation_fraction=0.2, n_jobs=1,
+                                                      work_dir=tmp)
+        tamanos = {archivo.name: archivo.stat().st_size for archivo in Path(tmp).glob('*.bin')}
+    
+    assert tamanos['y_train.bin'] + tamanos['y_valid.bin'] == 891
+    df = pd.read_csv(DATA_DIR / 'train.csv', dtype=ESQUEMA_DTYPES)
+    for name in ['xgboost', 'lightgbm']:
+        result = results[name]
+        assert result['best_score'] > 0.7
+        assert 1 <= result['best_params']['n_estimators'] <= 200
+        X = result['preprocessor'].transform(result['feature_engineering'].transform(df))
+        assert (result['model'].predict(X) == df['Survived']).mean() > 0.75
+    print("✅ Entrenamiento fuera de memoria correcto")
+
+def test_out_of_core_requires_external_memory_xgboost():
+    """Prueba que sin ExtMemQuantileDMatrix el entrenamiento de XGBoost falla con ImportError."""
+    import types
+    import modeling
+    from modeling import TitanicModeling
+    
+    modelado = TitanicModeling()
+    xgb_original = modeling.xgb
+    modeling.xgb = types.SimpleNamespace(__version__='1.7.6')
+    try:
+        modelado.train_out_of_core(iter([]), models=('xgboost',))
+        raise AssertionError("train_out_of_core debería fallar sin ExtMemQuantileDMatrix")
+    except ImportError as error:
+        assert 'xgboost>=3.0' in str(error) and '1.7.6' in str(error)
+    finally:
+        modeling.xgb = xgb_original
+    print("✅ El entrenamiento fuera de memoria exige xgboost con memoria externa")
+
+def test_incremental_model_updates():
+    """Prueba que update_models continúa los modelos anteriores sin modificarlos."""
+    import warnings
+    from modeling import TitanicModeling
+    
+    df = pd.read_csv(DATA_DIR / 'train.csv')
+    fe = TitanicFeatureEngineering().fit(df)
+    X = TitanicPreprocessor(imputer='group_median').fit_transform(fe.transform(df))
+    y = df['Survived'].to_numpy()
+    modeling = TitanicModeling()
+    best_params = {
+        'logistic': {'C': 1, 'penalty': 'l2', 'solver': 'liblinear'},
+        'random_forest': {'n_estimators': 20, 'max_depth': 5},
+        'xgboost': {'n_estimators': 20, 'max_depth': 3, 'learning_rate': 0.1},
+        'lightgbm': {'n_estimators': 20, 'max_depth': 3, 'learning_rate': 0.1, 'verbose': -1}
+    }
+    results = {
+        name: {'best_score': 0.8, 'best_params': params,
+               'model': modeling._task_estimator(name, params).fit(X[:600], y[:600])}
+        for name, params in best_params.items()
+    }
+    
+    with warnings.catch_warnings(), tempfile.TemporaryDirectory() as tmp:
+        warnings.simplefilter('ignore')
+        TitanicModeling.save_results(results, Path(tmp) / 'resultados.joblib')
+        previos = TitanicModeling.load_results(Path(tmp) / 'resultados.joblib')
+        updated = modeling.update_models(previos, X, y, steps={'random_forest': 5, 'xgboost': 5, 'lightgbm': 5},
+                                         X_eval=X[600:], y_eval=y[600:])
+    
+    assert len(updated['random_forest']['model'].estimators_) == 25
+    assert updated['xgboost']['model'].get_booster().num_boosted_rounds() == 25
+    assert updated['lightgbm']['model'].booster_.current_iteration() == 25
+    assert updated['logistic']['best_params']['solver'] == 'saga'
+    assert len(previos['random_forest']['model'].estimators_) == 20
+    # Los árboles anteriores se conservan: solo se añaden nuevos
+    anterior = previos['random_forest']['model'].estimators_[0].tree_.threshold
+    np.testing.assert_array_equal(updated['random_forest']['model'].estimators_[0].tree_.threshold, anterior)
+    assert all(result['eval_score'] > 0.75 for result in updated.values())
+    print("✅ Actualización incremental de modelos correcta")
+
+if __name__ == "__main__":
+    test_memmapped_folds_match_in_memory()
+    test_shared_search_matches_grid()
+    test_halving_prunes_to_grid_best()
+    test_out_of_core_boosting()
+    test_out_of_core_requires_external_memory_xgboost()
+    test_incremental_model_updates()
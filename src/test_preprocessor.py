@@ -0,0 +1,103 @@
+"""
+Pruebas para el preprocesador del Titanic.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from feature_engineering import TitanicFeatureEngineering
+from preprocessor import TitanicPreprocessor, TreeKNNImputer
+from sklearn.impute import KNNImputer
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def test_preprocessor_owns_imputation():
+    """Prueba que el feature engineering conserva los faltantes y el preprocesador los imputa."""
+    from preprocessor import IMPUTERS
+    
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    features = TitanicFeatureEngineering().fit_transform(train)
+    faltantes = train['Age'].isna().to_numpy()
+    for col in ['Age', 'Fare', 'Embarked']:
+        np.testing.assert_array_equal(features[col].isna(), train[col].isna())
+    np.testing.assert_array_equal(features['AgeBin'].isna(), faltantes)
+    
+    edades = {}
+    for imputer in IMPUTERS:
+        X = TitanicPreprocessor(imputer=imputer).fit_transform(features)
+        assert not np.isnan(X).any()
+        edades[imputer] = X[faltantes, 0]
+    # Cada imputador rellena las edades faltantes a su manera
+    assert len(np.unique(edades['group_median'])) > 1
+    assert not np.allclose(edades['knn'], edades['group_median'])
+    print("✅ El preprocesador imputa los faltantes que conserva el feature engineering")
+
+def test_tree_imputer_matches_knn():
+    """Prueba que la imputación en árbol coincide con KNNImputer sin empates."""
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(500, 3))
+    X[rng.choice(500, 100, replace=False), 0] = np.nan
+    esperado = KNNImputer(n_neighbors=5).fit_transform(X)
+    for algorithm in ['kd_tree', 'ball_tree']:
+        np.testing.assert_allclose(TreeKNNImputer(algorithm=algorithm).fit_transform(X), esperado)
+    print("✅ Imputación por árbol coincide con KNNImputer")
+
+def test_sparse_output_matches_dense():
+    """Prueba que la salida dispersa contiene los mismos valores que la densa."""
+    train = TitanicFeatureEngineering().fit_transform(pd.read_csv(DATA_DIR / 'train.csv'))
+    densa = TitanicPreprocessor().fit_transform(train)
+    dispersa = TitanicPreprocessor(sparse=True).fit_transform(train)
+    assert dispersa.format == 'csr'
+    np.testing.assert_allclose(dispersa.toarray(), densa)
+    print("✅ Salida dispersa coincide con la densa")
+
+
+def test_artifact_rebuilds_pipeline():
+    """Prueba que el artefacto reconstruye el pipeline sin guardar objetos de scikit-learn."""
+    import pickle
+    import warnings
+    import joblib
+    from preprocessor import IMPUTERS
+    
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    test = pd.read_csv(DATA_DIR / 'test.csv')
+    fe = TitanicFeatureEngineering().fit(train)
+    features, features_test = fe.transform(train), fe.transform(test)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / 'preprocessor.joblib'
+        for imputer in IMPUTERS:
+            preprocessor = TitanicPreprocessor(imputer=imputer, n_neighbors=3, max_donors=500).fit(features)
+            preprocessor.save(ruta)
+            cargado = TitanicPreprocessor.load(ruta)
+            assert (cargado.n_neighbors, cargado.max_donors) == (3, 500)
+            np.testing.assert_array_equal(cargado.transform(features_test), preprocessor.transform(features_test))
+            assert b'sklearn.' not in pickle.dumps(joblib.load(ruta)), imputer
+        
+        # Las medianas por grupo no crecen con las filas de entrenamiento
+        pequeno = TitanicPreprocessor(imputer='group_median').fit(features)
+        pequeno.save(ruta)
+        tamano = ruta.stat().st_size
+        TitanicPreprocessor(imputer='group_median').fit(pd.concat([features] * 20)).save(ruta)
+        assert ruta.stat().st_size < tamano * 1.2
+        
+        artefacto = joblib.load(ruta)
+        artefacto['sklearn_version'] = '0.0'
+        joblib.dump(artefacto, ruta)
+        with warnings.catch_warnings(record=True) as avisos:
+            warnings.simplefilter('always')
+            TitanicPreprocessor.load(ruta)
+        assert any('scikit-learn 0.0' in str(aviso.message) for aviso in avisos)
+    print("✅ El artefacto del preprocesador reconstruye el pipeline")
+
+if __name__ == "__main__":
+    test_preprocessor_owns_imputation()
+    test_tree_imputer_matches_knn()
+    test_sparse_output_matches_dense()
+    test_artifact_rebuilds_pipeline()
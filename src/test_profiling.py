@@ -0,0 +1,69 @@
+"""
+Pruebas para la instrumentación por etapas.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+def test_stage_profiler_trace():
+    """Prueba que el perfilador mide etapas anidadas y escribe una traza de Chrome."""
+    import json
+    from profiling import StageProfiler
+    
+    profiler = StageProfiler()
+    with profiler.stage('analisis'):
+        for _ in range(3):
+            with profiler.stage('bloque', filas=10):
+                sum(range(10_000))
+    resumen = profiler.summary()
+    assert list(resumen) == ['analisis', 'bloque'] and resumen['bloque']['calls'] == 3
+    assert resumen['analisis']['wall_seconds'] >= resumen['bloque']['wall_seconds']
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        traza = json.loads(profiler.write_trace(Path(tmp) / 'traza.json').read_text(encoding='utf-8'))
+    padre, hijo = traza['traceEvents'][0], traza['traceEvents'][1]
+    assert all(evento['ph'] == 'X' for evento in traza['traceEvents'])
+    assert padre['ts'] <= hijo['ts'] and hijo['ts'] + hijo['dur'] <= padre['ts'] + padre['dur'] + 1
+    assert hijo['args']['filas'] == 10 and 'cpu_ms' in hijo['args']
+    print("✅ Traza de etapas correcta")
+
+def test_nested_peak_rss_windows():
+    """Prueba que una etapa anidada no borra el pico de la medición que la contiene."""
+    import mmap
+    import profiling
+    from profiling import StageProfiler, peak_rss_window
+    
+    profiler = StageProfiler()
+    with peak_rss_window() as exterior:
+        with profiler.stage('grande'):
+            # Páginas anónimas nuevas: un array podría reutilizar memoria ya
+            # residente del asignador tras otras pruebas
+            bloque = mmap.mmap(-1, 100 * 1024 ** 2)
+            np.frombuffer(bloque, dtype=np.uint8).fill(1)
+            bloque.close()
+        # Esta etapa reinicia el pico del proceso al abrirse
+        with profiler.stage('pequena'):
+            sum(range(1000))
+    # Ventanas con el mismo contenido se cierran cada una la suya
+    with peak_rss_window() as primera:
+        with peak_rss_window() as segunda:
+            segunda.update(primera)
+        assert any(ventana is primera for ventana in profiling._OPEN_WINDOWS)
+    if exterior['peak_rss_mb'] is None:
+        return
+    grande, pequena = profiler.events
+    assert exterior['peak_rss_mb'] >= grande['peak_rss_mb']
+    if exterior['start_rss_mb'] is not None:
+        assert exterior['peak_rss_mb'] - exterior['start_rss_mb'] > 90
+        assert pequena['peak_rss_mb'] < grande['peak_rss_mb'] - 90
+    print("✅ Picos de memoria anidados correctos")
+
+if __name__ == "__main__":
+    test_stage_profiler_trace()
+    test_nested_peak_rss_windows()
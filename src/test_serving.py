@@ -0,0 +1,87 @@
+"""
+Pruebas para el servicio de puntuación del Titanic.
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from feature_engineering import TitanicFeatureEngineering
+from preprocessor import TitanicPreprocessor
+from test_inference import _predictor_logistico
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def test_fast_features_match_pipeline():
+    """Prueba que la ruta rápida sin pandas reproduce el pipeline completo."""
+    from data_loader import aplicar_esquema
+    from serving import FastFeatureBuilder
+    
+    train = aplicar_esquema(pd.read_csv(DATA_DIR / 'train.csv'))
+    test = pd.read_csv(DATA_DIR / 'test.csv')
+    # Valores fuera de las categorías del esquema, que el pipeline trata como faltantes
+    test.loc[0, 'Embarked'] = 'X'
+    test.loc[1, 'Sex'] = 'desconocido'
+    fe = TitanicFeatureEngineering().fit(train)
+    registros = test.astype(object).where(test.notna(), None).to_dict('records')
+    for imputer in ['knn', 'group_median']:
+        preprocessor = TitanicPreprocessor(imputer=imputer).fit(fe.transform(train))
+        builder = FastFeatureBuilder(fe, preprocessor.pipeline)
+        esperado = preprocessor.transform(fe.transform(aplicar_esquema(test)))
+        # El pipeline escala Age y Fare en float32; la ruta rápida, en float64
+        np.testing.assert_allclose(builder.transform_records(registros), esperado, atol=1e-5)
+    print("✅ Ruta rápida de características coincide con el pipeline")
+
+def test_scoring_server_status_codes():
+    """Prueba que el servidor responde 200 a registros válidos, 400 a inválidos y 500 si falla el modelo."""
+    import json
+    import threading
+    import http.client
+    from serving import ScoringService, crear_servidor
+    
+    class ModeloFallido:
+        def predict_proba(self, X):
+            raise RuntimeError("modelo no disponible")
+    
+    predictor, _ = _predictor_logistico(pd.read_csv(DATA_DIR / 'train.csv'))
+    test = pd.read_csv(DATA_DIR / 'test.csv')
+    registros = test.astype(object).where(test.notna(), None).to_dict('records')
+    servicio = ScoringService(predictor)
+    servidor = crear_servidor(servicio, puerto=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    conexion = http.client.HTTPConnection('127.0.0.1', servidor.server_address[1], timeout=10)
+    
+    def enviar(cuerpo):
+        conexion.request('POST', '/predict', body=cuerpo, headers={'Content-Type': 'application/json'})
+        respuesta = conexion.getresponse()
+        return respuesta.status, json.loads(respuesta.read())
+    
+    try:
+        estado, prediccion = enviar(json.dumps(registros[0]))
+        assert estado == 200 and prediccion['PassengerId'] == registros[0]['PassengerId']
+        assert np.isclose(prediccion['Probability'], predictor.predict_proba_frame(test.iloc[:1])[0])
+        estado, predicciones = enviar(json.dumps(registros[:3]))
+        assert estado == 200 and len(predicciones) == 3
+        for cuerpo in ['{"Name": ', '42', '"pasajero"', '[1, 2]', json.dumps({'Name': 'Sin, Mr. Familia'})]:
+            estado, respuesta = enviar(cuerpo)
+            assert estado == 400 and 'error' in respuesta, cuerpo
+        
+        servicio.estimator = ModeloFallido()
+        for cuerpo in [json.dumps(registros[0]), json.dumps(registros[:3])]:
+            estado, respuesta = enviar(cuerpo)
+            assert estado == 500 and 'modelo no disponible' in respuesta['error']
+    finally:
+        conexion.close()
+        servidor.shutdown()
+        servidor.server_close()
+        servicio.close()
+    print("✅ Códigos de estado del servidor de puntuación correctos")
+
+if __name__ == "__main__":
+    test_fast_features_match_pipeline()
+    test_scoring_server_status_codes()
@@ -0,0 +1,41 @@
+"""
+Pruebas para los sketches de cuantiles e histogramas.
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+def test_kll_sketch_quantiles():
+    """Prueba que el sketch KLL es exacto con pocos valores y acotado con muchos."""
+    from sketches import KLLSketch, contar_en_bins
+    
+    rng = np.random.default_rng(0)
+    pocos = rng.lognormal(3, 1, 500)
+    sketch = KLLSketch().update(pocos)
+    for q in [0.1, 0.25, 0.5, 0.75, 0.9]:
+        assert np.isclose(sketch.quantile(q), np.quantile(pocos, q))
+    
+    muchos = rng.lognormal(3, 1, 200_000)
+    partes = [KLLSketch().update(parte) for parte in np.array_split(muchos, 7)]
+    combinado = partes[0]
+    for parte in partes[1:]:
+        combinado = combinado.merge(parte)
+    assert combinado.n == len(muchos)
+    assert sum(len(items) for items in combinado.levels) < 4 * combinado.k
+    ordenados = np.sort(muchos)
+    for q in [0.1, 0.25, 0.5, 0.75, 0.9]:
+        rango = np.searchsorted(ordenados, combinado.quantile(q)) / len(muchos)
+        assert abs(rango - q) < 0.01
+    
+    bins = list(range(0, 81, 10))
+    edades = rng.uniform(-5, 90, 1000)
+    np.testing.assert_array_equal(contar_en_bins(edades, bins), np.histogram(edades, bins)[0])
+    print("✅ Sketch KLL y conteo por intervalos correctos")
+
+if __name__ == "__main__":
+    test_kll_sketch_quantiles()
@@ -0,0 +1,43 @@
+"""
+Pruebas para el generador de manifiestos sintéticos.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import pandas as pd
+
+src_path = Path(__file__).parent.absolute()
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+DATA_DIR = Path(__file__).parent.parent / 'datasets'
+
+def test_synthetic_manifest_matches_train():
+    """Prueba que el manifiesto sintético se carga como train.csv y conserva sus distribuciones."""
+    from synthetic import TitanicSyntheticGenerator
+    from data_loader import cargar_datos
+    
+    train = pd.read_csv(DATA_DIR / 'train.csv')
+    generador = TitanicSyntheticGenerator().fit(train)
+    with tempfile.TemporaryDirectory() as tmp:
+        serie = generador.write(Path(tmp) / 'a.csv', 60_000, chunk_size=20_000, n_jobs=1)
+        paralelo = generador.write(Path(tmp) / 'b.csv', 60_000, chunk_size=20_000, n_jobs=2)
+        assert serie['rows'] == paralelo['rows'] == 60_000
+        assert (Path(tmp) / 'a.csv').read_bytes() == (Path(tmp) / 'b.csv').read_bytes()
+        sintetico = pd.read_csv(Path(tmp) / 'a.csv')
+        cargado = cargar_datos(usar_cache=False, file_path=Path(tmp) / 'a.csv')
+    
+    assert list(sintetico.columns) == list(train.columns)
+    assert sintetico['PassengerId'].is_unique and len(cargado) == 60_000
+    for columna in ['Age', 'Cabin', 'Embarked']:
+        assert abs(sintetico[columna].isna().mean() - train[columna].isna().mean()) < 0.01
+    for columnas in [['Pclass'], ['Sex'], ['Pclass', 'Sex']]:
+        real = train.groupby(columnas)['Survived'].mean()
+        generado = sintetico.groupby(columnas)['Survived'].mean()
+        assert (generado - real).abs().max() < 0.05
+    assert abs(sintetico['Fare'].median() - train['Fare'].median()) < 1
+    print("✅ Manifiesto sintético compatible con train.csv")
+
+if __name__ == "__main__":
+    test_synthetic_manifest_matches_train()
@@ -3,13 +3,59 @@ Módulo de utilidades para el análisis del Titanic.
 Contiene funciones auxiliares para la configuración y verificación del entorno.
 """
 
-import pkg_resources
+import sys
+import types
+import importlib
 import subprocess
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from IPython.display import display, Markdown
+
+class _ModuloDiferido(types.ModuleType):
+    """
+    Módulo que se importa al acceder al primero de sus atributos. Después
+    del primer acceso copia el contenido del módulo real, de modo que los
+    accesos siguientes no pasan por `__getattr__`.
+    """
+    
+    def __getattr__(self, nombre):
+        modulo = importlib.import_module(self.__name__)
+        self.__dict__.update(modulo.__dict__)
+        return getattr(modulo, nombre)
+
+def importar_diferido(nombre):
+    """
+    Devuelve un módulo que solo se importa cuando se usa por primera vez.
+    Si ya estaba importado, se devuelve el módulo real.
+    
+    Args:
+        nombre (str): Nombre completo del módulo (por ejemplo, 'matplotlib.pyplot')
+        
+    Returns:
+        module: Módulo real o diferido
+    """
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    return _ModuloDiferido(nombre)
+
+def es_instancia_de(objeto, nombre, clase):
+    """
+    Comprueba si un objeto es instancia de una clase de un módulo sin
+    importarlo: si el módulo no está cargado, el objeto no puede serlo.
+    
+    Args:
+        objeto: Objeto a comprobar
+        nombre (str): Nombre del módulo (por ejemplo, 'xgboost')
+        clase (str): Nombre de la clase dentro del módulo
+        
+    Returns:
+        bool: True si el objeto es instancia de la clase
+    """
+    modulo = sys.modules.get(nombre)
+    return modulo is not None and isinstance(objeto, getattr(modulo, clase))
+
+# Dependencias pesadas: se importan al usarlas por primera vez
+pd = importar_diferido('pandas')
+plt = importar_diferido('matplotlib.pyplot')
+sns = importar_diferido('seaborn')
+pkg_resources = importar_diferido('pkg_resources')
 
 def configurar_visualizacion():
     """